@@ -101,12 +101,93 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # OpenAI Configuration
 AIPROXY_TOKEN = os.environ.get("AIPROXY_TOKEN", "")
+# Chat completions endpoint; point at solver/perf/aiproxy_stub.py for offline load tests
+AIPROXY_URL = os.environ.get("AIPROXY_URL", "https://aiproxy.sanand.workers.dev/openai/v1/chat/completions")
+# Maximum estimated tokens of file content sent to the LLM per request
+AIPROXY_PROMPT_TOKEN_BUDGET = int(os.environ.get("AIPROXY_PROMPT_TOKEN_BUDGET", "4000"))
+# Start the LLM call while repository matching and local solvers are still running
+SPECULATIVE_LLM = os.environ.get("SPECULATIVE_LLM", "false").lower() in ("1", "true", "yes")
+SPECULATIVE_LLM_WORKERS = int(os.environ.get("SPECULATIVE_LLM_WORKERS", "8"))
+# Threads matching questions against the repository while the upload is extracted
+REPOSITORY_MATCH_WORKERS = int(os.environ.get("REPOSITORY_MATCH_WORKERS", "4"))
+# Threads extracting the files of multi-file uploads, kept apart from the speculative LLM calls
+EXTRACT_WORKERS = int(os.environ.get("EXTRACT_WORKERS", "4"))
+# Pause speculation while more than this share of recent speculative calls went unused
+SPECULATIVE_LLM_MAX_WASTE_RATE = float(os.environ.get("SPECULATIVE_LLM_MAX_WASTE_RATE", "0.3"))
+# Send one duplicate AI Proxy request when a call is slower than the recent p90
+AIPROXY_HEDGE = os.environ.get("AIPROXY_HEDGE", "true").lower() in ("1", "true", "yes")
+AIPROXY_HEDGE_PERCENTILE = float(os.environ.get("AIPROXY_HEDGE_PERCENTILE", "90"))
+# At most this share of calls is hedged, which bounds the extra upstream cost
+AIPROXY_HEDGE_MAX_RATE = float(os.environ.get("AIPROXY_HEDGE_MAX_RATE", "0.1"))
+AIPROXY_HEDGE_MIN_DELAY = float(os.environ.get("AIPROXY_HEDGE_MIN_DELAY", "0.2"))
+# Models used by the LLM router; requests move to the fallback while a route is degraded
+AIPROXY_MODEL = os.environ.get("AIPROXY_MODEL", "gpt-4o-mini")
+AIPROXY_FALLBACK_MODEL = os.environ.get("AIPROXY_FALLBACK_MODEL", "gpt-4o-mini")
+# Model and completion token limit of each route, e.g. AIPROXY_CODE_MODEL and AIPROXY_LOOKUP_MAX_TOKENS;
+# unset, the model is AIPROXY_MODEL and the limit is left to the model
+AIPROXY_ROUTES = {
+    route: {
+        "model": os.environ.get(f"AIPROXY_{route.upper()}_MODEL") or AIPROXY_MODEL,
+        "max_tokens": int(os.environ.get(f"AIPROXY_{route.upper()}_MAX_TOKENS") or 0) or None,
+    }
+    for route in ("lookup", "file", "code", "long")
+}
+AIPROXY_ROUTE_MAX_ERROR_RATE = float(os.environ.get("AIPROXY_ROUTE_MAX_ERROR_RATE", "0.2"))
+AIPROXY_ROUTE_MAX_P90 = float(os.environ.get("AIPROXY_ROUTE_MAX_P90", "20"))
+# Per-template LLM token and latency totals, appended by every worker (see llm_usage_report)
+# Runtime files go under var/, which is kept out of git
+LLM_USAGE_PATH = os.environ.get("LLM_USAGE_PATH", os.path.join(BASE_DIR, 'var', 'llm_usage.jsonl'))
+LLM_USAGE_FLUSH_INTERVAL = int(os.environ.get("LLM_USAGE_FLUSH_INTERVAL", "60"))
+# Overall time budget per API request, in seconds (0 disables it)
+REQUEST_DEADLINE = float(os.environ.get("REQUEST_DEADLINE", "25"))
+# Local stages stop early to leave this much of the budget for the AI Proxy call
+REQUEST_DEADLINE_LLM_RESERVE = float(os.environ.get("REQUEST_DEADLINE_LLM_RESERVE", "10"))
 
 # File Upload Settings
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 FILE_UPLOAD_MAX_MEMORY_SIZE = 104857600  # 100MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 104857600  # 100MB
+# Hash uploads as they stream in so cached responses skip the temp-file write
+FILE_UPLOAD_HANDLERS = [
+    'solver.upload_handlers.HashingUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+# Whole API responses for identical (question, files) requests
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "1000"))
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", "3600"))
+# Uncompressed bytes read from one ZIP member and from one whole archive
+ZIP_MAX_MEMBER_SIZE = int(os.environ.get("ZIP_MAX_MEMBER_SIZE", str(50 * 1024 * 1024)))
+ZIP_MAX_TOTAL_SIZE = int(os.environ.get("ZIP_MAX_TOTAL_SIZE", str(200 * 1024 * 1024)))
+# Parsed uploads on local disk, keyed by content SHA-256 and shared by all workers
+PARSE_CACHE = os.environ.get("PARSE_CACHE", "true").lower() in ("1", "true", "yes")
+PARSE_CACHE_DIR = os.environ.get("PARSE_CACHE_DIR", os.path.join(BASE_DIR, 'var', 'parse_cache'))
+PARSE_CACHE_MAX_BYTES = int(os.environ.get("PARSE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+PARSE_CACHE_MIN_BYTES = int(os.environ.get("PARSE_CACHE_MIN_BYTES", str(16 * 1024)))
+# CSV parsing: pandas engine ('c' or 'pyarrow'), and chunked reads for large files
+CSV_ENGINE = os.environ.get("CSV_ENGINE", "c")
+CSV_CHUNK_BYTES = int(os.environ.get("CSV_CHUNK_BYTES", str(64 * 1024 * 1024)))
+CSV_CHUNK_ROWS = int(os.environ.get("CSV_CHUNK_ROWS", "200000"))
+CSV_SAMPLE_ROWS = int(os.environ.get("CSV_SAMPLE_ROWS", "10000"))
+# Bytes of an upload given to charset-normalizer, and detected encodings kept by content hash
+ENCODING_SAMPLE_BYTES = int(os.environ.get("ENCODING_SAMPLE_BYTES", str(16 * 1024)))
+ENCODING_CACHE_SIZE = int(os.environ.get("ENCODING_CACHE_SIZE", "10000"))
+# PDF pages are split across this many worker processes (default: one per CPU) once a document has enough pages
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", "0")) or None
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "8"))
+# Threads encoding lossless image candidates side by side
+IMAGE_ENCODER_WORKERS = int(os.environ.get("IMAGE_ENCODER_WORKERS", "4"))
+# Queries on uploaded SQLite databases: seconds before a query is interrupted, and rows returned at most
+SQLITE_QUERY_TIMEOUT = float(os.environ.get("SQLITE_QUERY_TIMEOUT", "5"))
+SQLITE_MAX_ROWS = int(os.environ.get("SQLITE_MAX_ROWS", "10000"))
+# SQL on uploaded CSV/JSON/Parquet files with DuckDB: threads and memory per query (larger
+# operators spill to DUCKDB_TEMP_DIRECTORY, the system temp directory by default)
+DUCKDB_THREADS = int(os.environ.get("DUCKDB_THREADS", "1"))
+DUCKDB_MEMORY_LIMIT = os.environ.get("DUCKDB_MEMORY_LIMIT", "1GB")
+DUCKDB_TEMP_DIRECTORY = os.environ.get("DUCKDB_TEMP_DIRECTORY") or None
+DUCKDB_QUERY_TIMEOUT = float(os.environ.get("DUCKDB_QUERY_TIMEOUT", "10"))
+DUCKDB_MAX_ROWS = int(os.environ.get("DUCKDB_MAX_ROWS", "10000"))
 
 # REST Framework settings
 REST_FRAMEWORK = {
@@ -0,0 +1,200 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from solver.models import Assignment, Solution
+from solver.services.metrics import pipeline_metrics
+from solver.services.question_matcher import QUESTIONS_JSON_PATH
+from solver.services.request_handler import RequestHandler
+from solver.services.usage import usage_accountant
+
+
+class Command(BaseCommand):
+    help = (
+        "Answer a batch of questions from a JSONL or CSV file through the full "
+        "RequestHandler pipeline. Rows need a 'question' field and may have 'id', "
+        "'file', 'assignment_number' and 'question_number'."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="JSONL or CSV file of questions")
+        parser.add_argument('--workers', type=int, default=8,
+                            help="Maximum number of questions solved concurrently")
+        parser.add_argument('--checkpoint', help="Checkpoint file (default: <input>.checkpoint.jsonl)")
+        parser.add_argument('--target', choices=['solutions', 'repository', 'none'], default='solutions',
+                            help="Where to store answers: Solution rows, the question repository JSON, or nowhere")
+        parser.add_argument('--assignment', default=None,
+                            help="Assignment title for Solution rows (default: input file name)")
+    
+    def handle(self, *args, **options):
+        input_path = options['input']
+        if not os.path.exists(input_path):
+            raise CommandError(f"Input file not found: {input_path}")
+        
+        rows = self._read_rows(input_path)
+        checkpoint_path = options['checkpoint'] or f"{input_path}.checkpoint.jsonl"
+        done = self._read_checkpoint(checkpoint_path)
+        pending = [row for row in rows if row['id'] not in done]
+        self.stdout.write(
+            f"{len(rows)} questions, {len(rows) - len(pending)} already solved, {len(pending)} to solve "
+            f"with {options['workers']} workers"
+        )
+        
+        assignment = None
+        if options['target'] == 'solutions':
+            title = options['assignment'] or os.path.splitext(os.path.basename(input_path))[0]
+            assignment, _ = Assignment.objects.get_or_create(
+                title=title, defaults={'description': f"Bulk solved from {input_path}"}
+            )
+        
+        handlers = threading.local()
+        
+        def solve(row):
+            # QuestionMatcher loads the repository on init, so reuse one handler per worker
+            if not hasattr(handlers, 'handler'):
+                handlers.handler = RequestHandler()
+            start = time.perf_counter()
+            file_obj = None
+            try:
+                if row.get('file'):
+                    file_obj = File(open(row['file'], 'rb'), name=os.path.basename(row['file']))
+                result = handlers.handler.process_request(row['question'], file_obj)
+            finally:
+                if file_obj:
+                    file_obj.close()
+            return row, result.get('answer', ''), time.perf_counter() - start
+        
+        counters_before = pipeline_metrics.snapshot()['counters']
+        usage_before = usage_accountant.stats()
+        start = time.perf_counter()
+        solved = failed = 0
+        with open(checkpoint_path, 'a', encoding='utf-8') as checkpoint, \
+                ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = [pool.submit(solve, row) for row in pending]
+            for future in as_completed(futures):
+                try:
+                    row, answer, elapsed = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Failed: {str(e)}")
+                    continue
+                if answer.startswith("Error:"):
+                    # Leave errors out of the checkpoint so a rerun retries them
+                    failed += 1
+                    self.stderr.write(f"[{row['id']}] {answer}")
+                    continue
+                
+                if assignment is not None:
+                    Solution.objects.create(assignment=assignment, question=row['question'], answer=answer)
+                entry = {**row, 'answer': answer, 'elapsed_s': round(elapsed, 3)}
+                checkpoint.write(json.dumps(entry) + "\n")
+                checkpoint.flush()
+                done[row['id']] = entry
+                solved += 1
+                self.stdout.write(f"[{solved + failed}/{len(pending)}] {row['id']} ({elapsed:.1f}s)")
+        elapsed = time.perf_counter() - start
+        
+        if options['target'] == 'repository':
+            added = self._write_repository(done.values())
+            self.stdout.write(f"Wrote {added} answers to {QUESTIONS_JSON_PATH}")
+        
+        self._report(solved, failed, elapsed, counters_before, usage_before)
+    
+    def _read_rows(self, input_path):
+        if input_path.endswith('.csv'):
+            with open(input_path, newline='', encoding='utf-8') as f:
+                raw_rows = list(csv.DictReader(f))
+        else:
+            with open(input_path, encoding='utf-8') as f:
+                raw_rows = [json.loads(line) for line in f if line.strip()]
+        
+        rows = []
+        base_dir = os.path.dirname(os.path.abspath(input_path))
+        for raw in raw_rows:
+            question = (raw.get('question') or '').strip()
+            if not question:
+                raise CommandError(f"Row without a question: {raw}")
+            row = {'question': question}
+            if raw.get('file'):
+                # File paths are relative to the input file
+                row['file'] = os.path.join(base_dir, raw['file'])
+                if not os.path.exists(row['file']):
+                    raise CommandError(f"File not found: {row['file']}")
+            for key in ('assignment_number', 'question_number'):
+                if raw.get(key) not in (None, ''):
+                    row[key] = int(raw[key])
+            row['id'] = str(raw.get('id') or hashlib.sha256(
+                f"{question}\0{raw.get('file', '')}".encode('utf-8')).hexdigest()[:16])
+            rows.append(row)
+        return rows
+    
+    def _read_checkpoint(self, checkpoint_path):
+        done = {}
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        done[entry['id']] = entry
+        return done
+    
+    def _write_repository(self, entries):
+        """Add or update repository questions that have assignment and question numbers."""
+        with open(QUESTIONS_JSON_PATH, encoding='utf-8') as f:
+            questions = json.load(f)
+        by_key = {(q['assignment_number'], q['question_number']): q for q in questions}
+        
+        added = 0
+        for entry in entries:
+            if 'assignment_number' not in entry or 'question_number' not in entry:
+                continue
+            key = (entry['assignment_number'], entry['question_number'])
+            if key in by_key:
+                by_key[key]['answer_text'] = entry['answer']
+            else:
+                question = {
+                    'assignment_number': key[0],
+                    'question_number': key[1],
+                    'question_text': entry['question'],
+                    'answer_text': entry['answer'],
+                    'keywords': [],
+                }
+                questions.append(question)
+                by_key[key] = question
+            added += 1
+        
+        questions.sort(key=lambda q: (q['assignment_number'], q['question_number']))
+        tmp_path = f"{QUESTIONS_JSON_PATH}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(questions, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, QUESTIONS_JSON_PATH)
+        return added
+    
+    def _report(self, solved, failed, elapsed, counters_before, usage_before):
+        counters = pipeline_metrics.snapshot()['counters']
+        delta = {key: counters.get(key, 0) - counters_before.get(key, 0) for key in counters}
+        usage = usage_accountant.stats()
+        tokens = {key: usage[key] - usage_before[key] for key in ('calls', 'prompt_tokens', 'completion_tokens')}
+        total = solved + failed
+        self.stdout.write(self.style.SUCCESS(
+            f"Solved {solved} of {total} questions in {elapsed:.1f}s "
+            f"({total / elapsed if elapsed else 0:.2f} questions/s), {failed} failed"
+        ))
+        self.stdout.write(
+            f"Answered by repository: {delta.get('answered.repository', 0)}, "
+            f"local solvers: {delta.get('answered.local_solver', 0)}, "
+            f"LLM calls: {delta.get('answered.llm', 0)}"
+        )
+        # Cost in tokens, from the usage block of every AI Proxy call the run made
+        self.stdout.write(
+            f"AI Proxy requests: {tokens['calls']}, prompt tokens: {tokens['prompt_tokens']}, "
+            f"completion tokens: {tokens['completion_tokens']}, "
+            f"total tokens: {tokens['prompt_tokens'] + tokens['completion_tokens']}"
+        )
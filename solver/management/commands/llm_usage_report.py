@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from solver.services.usage import read_usage, usage_accountant
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the question templates that cost the most AI Proxy tokens, and the "
+        "tokens a local solver or repository answer for each would save."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=None, help="Usage store (default: settings.LLM_USAGE_PATH)")
+        parser.add_argument('--top', type=int, default=10, help="Number of templates to show")
+        parser.add_argument('--prompt-price', type=float, default=0.15,
+                            help="USD per million prompt tokens (default: gpt-4o-mini)")
+        parser.add_argument('--completion-price', type=float, default=0.60,
+                            help="USD per million completion tokens (default: gpt-4o-mini)")
+    
+    def handle(self, *args, **options):
+        # Include anything this process has not written yet
+        usage_accountant.flush()
+        path = options['path'] or settings.LLM_USAGE_PATH
+        groups = read_usage(path)
+        if not groups:
+            self.stdout.write(f"No LLM usage recorded in {path}")
+            return
+        
+        # Combine routes and file types per template
+        templates = {}
+        for (digest, file_type, route), group in groups.items():
+            entry = templates.setdefault(digest, {
+                'template': group['template'], 'file_types': set(), 'routes': set(),
+                'calls': 0, 'errors': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'total_ms': 0.0,
+            })
+            entry['file_types'].add(file_type)
+            entry['routes'].add(route)
+            for field in ('calls', 'errors', 'prompt_tokens', 'completion_tokens', 'total_ms'):
+                entry[field] += group[field]
+        
+        def cost(entry):
+            return (entry['prompt_tokens'] * options['prompt_price']
+                    + entry['completion_tokens'] * options['completion_price']) / 1_000_000
+        
+        ranked = sorted(templates.items(), key=lambda item: cost(item[1]), reverse=True)
+        total_tokens = sum(e['prompt_tokens'] + e['completion_tokens'] for e in templates.values())
+        total_calls = sum(e['calls'] for e in templates.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"{total_calls} LLM calls, {total_tokens} tokens, ${sum(cost(e) for e in templates.values()):.4f} "
+            f"across {len(templates)} question templates"
+        ))
+        
+        for rank, (digest, entry) in enumerate(ranked[:options['top']], start=1):
+            tokens = entry['prompt_tokens'] + entry['completion_tokens']
+            self.stdout.write(
+                f"\n{rank}. [{digest}] {entry['template'][:100]}\n"
+                f"   calls: {entry['calls']} ({entry['errors']} errors), "
+                f"mean latency: {entry['total_ms'] / entry['calls']:.0f} ms, "
+                f"file types: {', '.join(sorted(entry['file_types']))}, routes: {', '.join(sorted(entry['routes']))}\n"
+                f"   tokens: {entry['prompt_tokens']} prompt + {entry['completion_tokens']} completion, "
+                f"${cost(entry):.4f}\n"
+                # Answering the template locally removes every one of its calls
+                f"   saved if answered locally: {tokens} tokens "
+                f"({tokens / total_tokens if total_tokens else 0:.1%} of all LLM tokens)"
+            )
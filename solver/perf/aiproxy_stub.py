@@ -0,0 +1,237 @@
+"""
+Local stand-in for the AI Proxy chat completions endpoint.
+
+Serves an OpenAI-compatible POST /openai/v1/chat/completions with a configurable
+latency distribution and error rate, so the solver can be load-tested with no
+network. Point the solver at it with AIPROXY_URL:
+
+    python -m solver.perf.aiproxy_stub --port 8765 --latency lognormal:0.8,0.5
+    AIPROXY_URL=http://127.0.0.1:8765/openai/v1/chat/completions python manage.py runserver
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+
+class LatencyModel:
+    """
+    Samples response latencies in seconds.
+    
+    Spec formats:
+        fixed:SECONDS
+        uniform:LOW,HIGH
+        lognormal:MEDIAN,SIGMA
+    A slow_rate fraction of requests additionally take slow_latency seconds,
+    which is how tail stalls are injected. With slow_every=N, every Nth request
+    stalls instead, which makes stalls deterministic for tests.
+    """
+    def __init__(self, spec="fixed:0", slow_rate=0.0, slow_latency=0.0, seed=None, slow_every=0):
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.slow_every = slow_every
+        self._count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def sample(self):
+        with self._lock:
+            if self.kind == "fixed":
+                latency = self.params[0] if self.params else 0.0
+            elif self.kind == "uniform":
+                latency = self._random.uniform(self.params[0], self.params[1])
+            else:
+                median, sigma = self.params
+                latency = self._random.lognormvariate(0, sigma) * median
+            self._count += 1
+            if self.slow_every:
+                if self._count % self.slow_every == 0:
+                    latency += self.slow_latency
+            elif self.slow_rate and self._random.random() < self.slow_rate:
+                latency += self.slow_latency
+            return latency
+    
+    def should_fail(self, error_rate):
+        with self._lock:
+            return self._random.random() < error_rate
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+    
+    def do_POST(self):
+        if self.path.split("?")[0] != COMPLETIONS_PATH:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+        
+        server = self.server
+        with server.stats_lock:
+            server.stats["requests"] += 1
+        
+        latency = server.latency.sample()
+        if server.latency.should_fail(server.error_rate):
+            time.sleep(latency)
+            with server.stats_lock:
+                server.stats["errors"] += 1
+            self._send_json(server.error_status, {"error": {"message": "Injected upstream error"}})
+            return
+        
+        answer = server.answer
+        prompt_tokens = sum(len(m.get("content") or "") for m in payload.get("messages", [])) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": max(1, len(answer) // 4),
+            "total_tokens": prompt_tokens + max(1, len(answer) // 4),
+        }
+        model = payload.get("model", "gpt-4o-mini")
+        
+        if payload.get("stream"):
+            self._send_stream(answer, model, latency)
+            return
+        
+        time.sleep(latency)
+        self._send_json(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": server.finish_reason,
+            }],
+            "usage": usage,
+        })
+    
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _send_stream(self, answer, model, latency):
+        """Send the answer as SSE chunks: first token after `latency`, the rest spread out."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        
+        words = answer.split(" ")
+        time.sleep(latency)
+        for index, word in enumerate(words):
+            delta = word if index == 0 else " " + word
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.server.token_interval)
+        chunk = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": self.server.finish_reason}],
+        }
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Threaded stub server; use start()/stop() to run it in the background.
+    """
+    daemon_threads = True
+    
+    def __init__(self, host="127.0.0.1", port=0, latency=None, error_rate=0.0,
+                 error_status=500, answer="42", token_interval=0.0, verbose=False, finish_reason="stop"):
+        super().__init__((host, port), StubHandler)
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.answer = answer
+        self.token_interval = token_interval
+        self.finish_reason = finish_reason
+        self.verbose = verbose
+        self.stats = {"requests": 0, "errors": 0}
+        self.stats_lock = threading.Lock()
+        self._thread = None
+    
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{COMPLETIONS_PATH}"
+    
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:0.8,0.5",
+                        help="fixed:S, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA (seconds)")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests that stall")
+    parser.add_argument("--slow-latency", type=float, default=5.0, help="Extra seconds for stalled requests")
+    parser.add_argument("--slow-every", type=int, default=0, help="Stall every Nth request instead of at random")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--answer", default="42", help="Answer returned for every completion")
+    parser.add_argument("--token-interval", type=float, default=0.02,
+                        help="Seconds between streamed chunks")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    
+    latency = LatencyModel(args.latency, args.slow_rate, args.slow_latency, seed=args.seed,
+                           slow_every=args.slow_every)
+    server = StubServer(args.host, args.port, latency=latency, error_rate=args.error_rate,
+                        error_status=args.error_status, answer=args.answer,
+                        token_interval=args.token_interval, verbose=args.verbose)
+    print(f"AI Proxy stub listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {server.stats['requests']} requests ({server.stats['errors']} injected errors)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Peak memory and parse time of CSV ingestion for large inputs.
+
+A CSV of each size (in MB) is generated in a temporary directory. Each read
+mode runs in a fresh process so its peak RSS is not shared with the others:
+
+    eager      read the upload into memory and parse it whole (the old path)
+    chunked    CsvSource.read(): chunks with dtypes sampled from the start
+    projected  CsvSource.read(usecols=['answer']), as a declared solver does
+    pyarrow    CsvSource with the pyarrow engine, if pyarrow is installed
+    
+    python -m solver.perf.bench_csv --sizes 10,100,1000
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ("eager", "chunked", "projected", "pyarrow")
+
+
+def write_csv(path, megabytes):
+    """Write a CSV of about `megabytes` MB with numeric, text and answer columns."""
+    target = megabytes * 1024 * 1024
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,category,value,price,answer\n")
+        written = 0
+        row = 0
+        while written < target:
+            block = "".join(
+                f"{i},cat-{i % 11},{i * 0.5},{(i * 7) % 1000 / 10},ans-{i}\n" for i in range(row, row + 10000)
+            )
+            f.write(block)
+            written += len(block)
+            row += 10000
+    return row
+
+
+def peak_rss_kb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_mode(mode, path):
+    """Read path in one mode in this process and return its measurements."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+    import django
+    django.setup()
+    import pandas as pd
+    from solver.services.processors.csv_reader import CsvSource, available_engine
+    
+    if mode == "pyarrow" and available_engine("pyarrow") != "pyarrow":
+        return {"skipped": "pyarrow is not installed"}
+    
+    baseline = peak_rss_kb()
+    start = time.perf_counter()
+    if mode == "eager":
+        with open(path, "rb") as f:
+            raw = f.read()
+        df = pd.read_csv(io.BytesIO(raw))
+    elif mode == "chunked":
+        df = CsvSource(path).read()
+    elif mode == "projected":
+        df = CsvSource(path).read(usecols=["answer"])
+    else:
+        df = CsvSource(path, engine="pyarrow").read()
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "peak_rss_mb": round((peak_rss_kb() - baseline) / 1024, 1),
+        "result_mb": round(df.memory_usage(deep=True).sum() / 1024 / 1024, 1),
+        "rows": len(df),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100", help="Comma-separated CSV sizes in MB")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--run", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    if args.run:
+        print(json.dumps(run_mode(*args.run)))
+        return
+    
+    report = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in args.sizes.split(","):
+            path = os.path.join(temp_dir, f"data_{size}mb.csv")
+            write_csv(path, int(size))
+            report[f"{size}MB"] = {}
+            for mode in args.modes.split(","):
+                output = subprocess.run(
+                    [sys.executable, "-m", "solver.perf.bench_csv", "--run", mode, path],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                report[f"{size}MB"][mode] = json.loads(output.strip().splitlines()[-1])
+            os.remove(path)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
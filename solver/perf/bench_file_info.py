@@ -0,0 +1,73 @@
+"""
+Measure what lazy file_info saves for requests that never look at the file.
+
+For each file type, an upload is extracted and left untouched (a repository
+or solver hit that does not need it), then extracted and fully materialized,
+which is what every request paid when extract_file_info parsed eagerly. Mean
+time and peak traced memory per extraction are printed:
+
+    python -m solver.perf.bench_file_info --rows 50000 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+import django
+
+from .bench_uploads import make_samples
+
+
+def materialize(file_info):
+    """Touch every entry, archive members included."""
+    values = dict(file_info)
+    for member in (file_info.get('extracted_content') or {}).values():
+        materialize(member)
+    return values
+
+
+def measure(processor, name, data, repeat, touch):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        file_info = processor.extract_file_info(data, name=name)
+        if touch:
+            materialize(file_info)
+    elapsed = time.perf_counter() - start
+    
+    tracemalloc.start()
+    file_info = processor.extract_file_info(data, name=name)
+    if touch:
+        materialize(file_info)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"mean_ms": round(elapsed / repeat * 1000, 3), "peak_kb": round(peak / 1024, 1)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--types", default="csv,json,text,zip,sqlite")
+    args = parser.parse_args(argv)
+    
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+    django.setup()
+    from solver.services.processors.file_processor import FileProcessor
+    
+    processor = FileProcessor()
+    samples = make_samples(args.rows)
+    report = {}
+    for file_type in args.types.split(","):
+        name, data = samples[file_type]
+        report[file_type] = {
+            "size_bytes": len(data),
+            "untouched": measure(processor, name, data, args.repeat, touch=False),
+            "materialized": measure(processor, name, data, args.repeat, touch=True),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Parse time, peak memory and query time of the Apache log engine.
+
+A gzipped access log with the given number of lines (in millions) is
+generated in a temporary directory and parsed in a fresh process, so the
+peak RSS is that of one parse. The two GA5 question families are then
+answered from the parsed columns:
+
+    python -m solver.perf.bench_logs --lines 1,5
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SECTIONS = ["telugu", "kannada", "tamil", "hindi", "malayalam"]
+
+
+def write_log(path, lines, seed=1):
+    """Write a gzipped May 2024 access log of `lines` lines."""
+    rnd = random.Random(seed)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for start in range(0, lines, 10000):
+            block = []
+            for i in range(start, min(start + 10000, lines)):
+                day = 1 + i * 31 // lines
+                status = rnd.choice([200] * 7 + [206, 304, 404])
+                size = rnd.randrange(100, 5000000) if status != 304 else "-"
+                block.append(
+                    f"10.0.{rnd.randrange(50)}.{rnd.randrange(256)} - - "
+                    f"[{day:02d}/May/2024:{rnd.randrange(24):02d}:{rnd.randrange(60):02d}:{rnd.randrange(60):02d} -0500] "
+                    f'"{rnd.choice(["GET"] * 8 + ["POST", "HEAD"])} /{rnd.choice(SECTIONS)}/song{rnd.randrange(500)}.mp3 HTTP/1.1" '
+                    f'{status} {size} "-" "Mozilla/5.0" s-anand.net 192.168.1.1\n'
+                )
+            f.write("".join(block))
+
+
+def peak_rss_kb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run(path):
+    """Parse path in this process and answer both question families."""
+    from solver.services.processors.apache_log import ApacheLog
+    
+    baseline = peak_rss_kb()
+    start = time.perf_counter()
+    log = ApacheLog.parse(path)
+    parse_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    requests = log.where(method="GET", status_range=(200, 300), path_prefix="/telugu/", weekday=6, hours=(12, 21))
+    top = log.total_by("ip", "bytes", log.where(path_prefix="/kannada/", date="2024-05-04"))
+    query_seconds = time.perf_counter() - start
+    return {
+        "parse_seconds": round(parse_seconds, 2),
+        "lines_per_second": int(len(log) / parse_seconds),
+        "peak_rss_mb": round((peak_rss_kb() - baseline) / 1024, 1),
+        "query_ms": round(query_seconds * 1000, 1),
+        "requests": int(requests.sum()),
+        "top_ip_bytes": next(iter(top.values()), 0),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", default="1", help="Comma-separated log sizes in millions of lines")
+    parser.add_argument("--run", metavar="PATH", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    if args.run:
+        print(json.dumps(run(args.run)))
+        return
+    
+    report = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for millions in args.lines.split(","):
+            path = os.path.join(temp_dir, f"access_{millions}m.log.gz")
+            write_log(path, int(float(millions) * 1000000))
+            output = subprocess.run(
+                [sys.executable, "-m", "solver.perf.bench_logs", "--run", path],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            report[f"{millions}M lines"] = {
+                "gzip_mb": round(os.path.getsize(path) / 1024 / 1024, 1),
+                **json.loads(output.strip().splitlines()[-1]),
+            }
+            os.remove(path)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Measure the latency effect of speculative LLM calls against the local AI Proxy stub.
+
+Runs the GA workload through RequestHandler in-process, once with the sequential
+pipeline and once with speculation enabled, and prints latency percentiles and
+the number of wasted upstream calls for each:
+
+    python -m solver.perf.bench_speculation --latency lognormal:0.8,0.5 --rounds 3
+"""
+
+import argparse
+import json
+import os
+import time
+
+import django
+
+
+def run_mode(speculative, cases, rounds, stub):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    
+    from solver.services.answer_cache import llm_answer_cache
+    from solver.services.metrics import pipeline_metrics
+    from solver.services.request_handler import RequestHandler
+    from solver.services.speculation import speculation_policy
+    
+    from .load_test import latency_summary
+    
+    # Start every mode from a fresh policy so earlier outcomes do not carry over
+    speculation_policy.enabled = speculative
+    speculation_policy.reset()
+    pipeline_metrics.reset()
+    upstream_before = stub.stats["requests"]
+    
+    latencies = []
+    for _ in range(rounds):
+        for case in cases:
+            llm_answer_cache.clear()
+            upload = None
+            if case.file_path and not case.missing_file:
+                upload = SimpleUploadedFile(case.file_name, case.file_path.read_bytes())
+            handler = RequestHandler()
+            start = time.perf_counter()
+            handler.process_request(case.question, upload)
+            latencies.append(time.perf_counter() - start)
+    
+    # Let discarded speculative calls finish before counting upstream requests
+    time.sleep(stub.latency.sample() * 2)
+    counters = pipeline_metrics.snapshot()["counters"]
+    return {
+        "requests": len(latencies),
+        "latency": latency_summary(latencies),
+        "upstream_calls": stub.stats["requests"] - upstream_before,
+        "speculation_started": counters.get("speculation.started", 0),
+        "speculation_wasted": counters.get("speculation.wasted", 0),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", default="lognormal:0.8,0.5")
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=3.0)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--assignments", default="1,2,3,4,5")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+    django.setup()
+    from django.conf import settings
+    
+    from .aiproxy_stub import LatencyModel, StubServer
+    from .workload import load_workload
+    
+    latency = LatencyModel(args.latency, args.slow_rate, args.slow_latency, seed=args.seed)
+    stub = StubServer(latency=latency).start()
+    settings.AIPROXY_URL = stub.url
+    settings.AIPROXY_TOKEN = settings.AIPROXY_TOKEN or "stub-token"
+    
+    cases = load_workload({int(a) for a in args.assignments.split(",") if a})
+    try:
+        report = {
+            "sequential": run_mode(False, cases, args.rounds, stub),
+            "speculative": run_mode(True, cases, args.rounds, stub),
+        }
+    finally:
+        stub.stop()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
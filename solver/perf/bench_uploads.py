@@ -0,0 +1,125 @@
+"""
+Compare extracting uploads from memory with the old save-to-temp-dir round trip.
+
+For each file type, the same upload is extracted both ways and the mean time
+and the disk writes and reads (from /proc/self/io, on Linux) per extraction
+are printed:
+
+    python -m solver.perf.bench_uploads --rows 50000 --repeat 20
+"""
+
+import argparse
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import zipfile
+
+import django
+
+
+def make_samples(rows):
+    """Synthetic uploads of each supported type, as (name, bytes) pairs."""
+    csv_bytes = "id,category,value,answer\n".encode("utf-8") + "".join(
+        f"{i},cat-{i % 7},{i * 0.5},ans-{i}\n" for i in range(rows)
+    ).encode("utf-8")
+    json_bytes = json.dumps([{"id": i, "value": i * 0.5} for i in range(rows)]).encode("utf-8")
+    text_bytes = "".join(f"line {i}: IITM sample text\n" for i in range(rows)).encode("utf-8")
+    
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("data.csv", csv_bytes)
+        zf.writestr("notes.txt", text_bytes)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "tickets.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE tickets (type TEXT, units INTEGER, price REAL)")
+        conn.executemany("INSERT INTO tickets VALUES (?, ?, ?)",
+                         ((("Gold", "Silver", "Bronze")[i % 3], i % 10, i * 0.1) for i in range(rows)))
+        conn.commit()
+        conn.close()
+        with open(db_path, "rb") as f:
+            db_bytes = f.read()
+    
+    return {
+        "csv": ("data.csv", csv_bytes),
+        "json": ("data.json", json_bytes),
+        "text": ("notes.txt", text_bytes),
+        "zip": ("archive.zip", zip_buffer.getvalue()),
+        "sqlite": ("tickets.db", db_bytes),
+    }
+
+
+def read_io_counters():
+    """Bytes and syscalls for this process from /proc/self/io, or None elsewhere."""
+    try:
+        with open("/proc/self/io") as f:
+            return {key: int(value) for key, value in (line.split(": ") for line in f)}
+    except OSError:
+        return None
+
+
+def extract_via_disk(processor, upload):
+    """The previous pipeline: copy every chunk to a temp dir, then parse by path."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, upload.name)
+        with open(file_path, "wb+") as destination:
+            for chunk in upload.chunks():
+                destination.write(chunk)
+        return processor.extract_file_info(file_path)
+
+
+def extract_in_memory(processor, upload):
+    from solver.services.processors.file_processor import SpillDirectory
+    
+    with SpillDirectory() as spill_dir:
+        return processor.extract_file_info(upload, name=upload.name, spill_dir=spill_dir)
+
+
+def measure(extract, processor, name, data, repeat):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    
+    uploads = [SimpleUploadedFile(name, data) for _ in range(repeat)]
+    before = read_io_counters()
+    start = time.perf_counter()
+    for upload in uploads:
+        extract(processor, upload)
+    elapsed = time.perf_counter() - start
+    after = read_io_counters()
+    
+    result = {"mean_ms": round(elapsed / repeat * 1000, 3)}
+    if before and after:
+        for key in ("wchar", "rchar", "syscw", "syscr"):
+            result[f"{key}_per_file"] = (after[key] - before[key]) // repeat
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--types", default="csv,json,text,zip,sqlite")
+    args = parser.parse_args(argv)
+    
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+    django.setup()
+    from solver.services.processors.file_processor import FileProcessor
+    
+    processor = FileProcessor()
+    samples = make_samples(args.rows)
+    report = {}
+    for file_type in args.types.split(","):
+        name, data = samples[file_type]
+        report[file_type] = {
+            "size_bytes": len(data),
+            "disk": measure(extract_via_disk, processor, name, data, args.repeat),
+            "memory": measure(extract_in_memory, processor, name, data, args.repeat),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
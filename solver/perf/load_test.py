@@ -0,0 +1,153 @@
+"""
+Replay the GA1-GA5 question and file mix against a running solver.
+
+Start the AI Proxy stub and a local server pointed at it, then run:
+
+    python -m solver.perf.load_test --url http://127.0.0.1:8000/api/ --concurrency 8 --requests 200
+
+Reports throughput, latency percentiles and error rates.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .workload import load_workload
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies):
+    """Summarize a list of latencies (seconds) as milliseconds."""
+    values = sorted(latencies)
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 1),
+        "p90_ms": round(percentile(values, 90) * 1000, 1),
+        "p95_ms": round(percentile(values, 95) * 1000, 1),
+        "p99_ms": round(percentile(values, 99) * 1000, 1),
+        "max_ms": round((values[-1] if values else 0.0) * 1000, 1),
+    }
+
+
+class LoadTest:
+    """
+    Sends workload cases to the solver API at a fixed concurrency.
+    """
+    def __init__(self, url, cases, concurrency=4, timeout=60, missing_files="question-only", seed=0):
+        self.url = url
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._random = random.Random(seed)
+        self._local = threading.local()
+        
+        self.cases = []
+        self.skipped = 0
+        for case in cases:
+            if case.missing_file and missing_files == "skip":
+                self.skipped += 1
+                continue
+            self.cases.append(case)
+        # Read each file once so disk I/O on the client does not skew latencies
+        self._file_bytes = {
+            case.file_path: case.file_path.read_bytes()
+            for case in self.cases if case.file_path and not case.missing_file
+        }
+    
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+    
+    def _send(self, case):
+        files = {"question": (None, case.question)}
+        if case.file_path and not case.missing_file:
+            files["file"] = (case.file_name, self._file_bytes[case.file_path])
+        
+        start = time.perf_counter()
+        try:
+            response = self._session().post(self.url, files=files, timeout=self.timeout)
+            elapsed = time.perf_counter() - start
+            ok = response.status_code == 200
+            if ok:
+                answer = str(response.json().get("answer", ""))
+                ok = not answer.startswith("Error:")
+            return case, elapsed, ok, response.status_code
+        except requests.RequestException:
+            return case, time.perf_counter() - start, False, None
+    
+    def run(self, total_requests):
+        """
+        Send total_requests requests, sampling cases uniformly at random.
+        
+        Returns:
+            dict: Throughput, latency percentiles and error rates
+        """
+        schedule = [self._random.choice(self.cases) for _ in range(total_requests)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(self._send, schedule))
+        return self.summarize(results, time.perf_counter() - start)
+    
+    def summarize(self, results, elapsed):
+        latencies = [latency for _, latency, _, _ in results]
+        errors = sum(1 for _, _, ok, _ in results if not ok)
+        statuses = defaultdict(int)
+        by_assignment = defaultdict(list)
+        for case, latency, ok, status in results:
+            statuses[str(status)] += 1
+            by_assignment[f"GA{case.assignment}"].append((latency, ok))
+        
+        return {
+            "requests": len(results),
+            "concurrency": self.concurrency,
+            "elapsed_s": round(elapsed, 2),
+            "throughput_rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / len(results), 4) if results else 0.0,
+            "status_codes": dict(statuses),
+            "latency": latency_summary(latencies),
+            "skipped_cases": self.skipped,
+            "by_assignment": {
+                name: {
+                    "requests": len(items),
+                    "error_rate": round(sum(1 for _, ok in items if not ok) / len(items), 4),
+                    "latency": latency_summary([latency for latency, _ in items]),
+                }
+                for name, items in sorted(by_assignment.items())
+            },
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000/api/")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--assignments", default="1,2,3,4,5", help="Comma-separated GA numbers")
+    parser.add_argument("--missing-files", choices=["question-only", "skip"], default="question-only",
+                        help="What to do with cases whose test data file is not on disk")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    
+    assignments = {int(a) for a in args.assignments.split(",") if a}
+    load_test = LoadTest(args.url, load_workload(assignments), concurrency=args.concurrency,
+                         timeout=args.timeout, missing_files=args.missing_files, seed=args.seed)
+    if not load_test.cases:
+        parser.error("No workload cases to send")
+    print(json.dumps(load_test.run(args.requests), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+GA1-GA5 question and file mix for load tests.
+
+The questions are taken from the test_tds_solver_GA*.py scripts by replaying
+their test functions with call_api swapped for a recorder, so the workload
+stays in sync with the tests without copying the question text.
+"""
+
+import contextlib
+import importlib
+import io
+from dataclasses import dataclass
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+
+GA_MODULES = {
+    1: "solver.tests.test_tds_solver_GA1",
+    2: "solver.tests.test_tds_solver_GA2",
+    3: "solver.tests.test_tds_solver_GA3",
+    4: "solver.tests.test_tds_solver_GA4",
+    5: "solver.tests.test_tds_solver_GA5",
+}
+
+
+@dataclass
+class WorkloadCase:
+    assignment: int
+    name: str
+    question: str
+    file_path: Path = None
+    file_name: str = None
+    missing_file: bool = False
+
+
+def _resolve_file(file_path):
+    """Find a test data file the same way the test scripts' call_api does."""
+    path = Path(file_path)
+    candidates = [
+        REPO_ROOT / path,
+        REPO_ROOT / "solver" / "tests" / path,
+        REPO_ROOT / "test_data" / path.name,
+    ]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def load_workload(assignments=None):
+    """
+    Collect the question/file mix from the GA test scripts.
+    
+    Args:
+        assignments (iterable, optional): Assignment numbers to include (default all)
+    
+    Returns:
+        list: WorkloadCase objects
+    """
+    cases = []
+    for number, module_name in GA_MODULES.items():
+        if assignments and number not in assignments:
+            continue
+        module = importlib.import_module(module_name)
+        recorded = []
+        
+        def recorder(question, file_path=None, file_name=None):
+            recorded.append((question, file_path, file_name))
+            return {"answer": ""}
+        
+        original = module.call_api
+        module.call_api = recorder
+        try:
+            for name, test_function in module.test_functions.items():
+                start = len(recorded)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    test_function()
+                for question, file_path, file_name in recorded[start:]:
+                    case = WorkloadCase(assignment=number, name=f"GA{number}.Q{name}", question=question)
+                    if file_path:
+                        resolved = _resolve_file(file_path)
+                        case.file_path = resolved
+                        case.file_name = file_name or Path(file_path).name
+                        case.missing_file = resolved is None
+                    cases.append(case)
+        finally:
+            module.call_api = original
+    return cases
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class AnswerCache:
+    """
+    Thread-safe LRU cache for answers produced by the AI Proxy.
+    
+    RequestHandler is created per request, so the cache lives at module level
+    and is shared by every handler in the worker process. Entries expire after
+    ttl seconds when a ttl is given.
+    """
+    def __init__(self, limit=500, ttl=None):
+        self.limit = limit
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(payload):
+        """Build a stable cache key from an upstream request payload."""
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            answer, expires_at = self._entries[key]
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer
+    
+    def set(self, key, answer):
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl if self.ttl else None
+            self._entries[key] = (answer, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.limit:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "limit": self.limit,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared by all RequestHandler instances in this process
+llm_answer_cache = AnswerCache()
@@ -0,0 +1,73 @@
+import logging
+import time
+from contextlib import contextmanager
+
+from .metrics import pipeline_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Deadline:
+    """
+    Time budget for one request, passed down through the pipeline stages.
+    
+    Local stages (matching, upload save, extraction, local solvers) must leave
+    llm_reserve seconds for the AI Proxy call; when they run short they stop
+    early and hand on what they have. A Deadline with no seconds never expires.
+    """
+    def __init__(self, seconds=None, llm_reserve=0.0):
+        self.seconds = seconds
+        self.llm_reserve = llm_reserve if seconds else 0.0
+        self.expires_at = time.monotonic() + seconds if seconds else None
+        self.stages = []
+    
+    def remaining(self):
+        """Seconds left for the whole request (inf without a deadline)."""
+        if self.expires_at is None:
+            return float('inf')
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def local_remaining(self):
+        """Seconds left for local stages, keeping llm_reserve for the LLM call."""
+        return max(0.0, self.remaining() - self.llm_reserve)
+    
+    def expired(self):
+        return self.remaining() <= 0
+    
+    def local_expired(self):
+        return self.local_remaining() <= 0
+    
+    def timeout(self, minimum=1.0):
+        """Timeout for an upstream call, or None without a deadline."""
+        if self.expires_at is None:
+            return None
+        return max(minimum, self.remaining())
+    
+    @contextmanager
+    def stage(self, name, local=True):
+        """
+        Time a pipeline stage and log it if it ran past its budget.
+        
+        Args:
+            name (str): Stage name, also recorded as the stage.<name> timing
+            local (bool): Whether the stage has to leave llm_reserve for the LLM
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            pipeline_metrics.observe(f"stage.{name}", elapsed)
+            over = self.local_expired() if local else self.expired()
+            self.stages.append((name, elapsed, over))
+            if over:
+                pipeline_metrics.increment(f"deadline.over_budget.{name}")
+                logger.warning(
+                    f"Stage {name} ran over the {self.seconds}s request deadline "
+                    f"after {elapsed * 1000:.0f} ms ({self.format_stages()})"
+                )
+    
+    def format_stages(self):
+        return ", ".join(
+            f"{name}={elapsed * 1000:.0f}ms{' (over)' if over else ''}" for name, elapsed, over in self.stages
+        )
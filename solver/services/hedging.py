@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from .metrics import pipeline_metrics, ratio
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hedge_executor():
+    """
+    Pool for the duplicate AI Proxy attempts, kept apart from the speculation
+    pool. Only hedges run on it, so its size bounds the extra requests and
+    never the calls themselves.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'AIPROXY_HEDGE_WORKERS', 16),
+                thread_name_prefix='aiproxy-hedge',
+            )
+        return _executor
+
+
+def _start_thread(func):
+    """
+    A Future for func() run on a thread of its own. The first attempt of every
+    call starts at once, however many calls are in flight.
+    """
+    future = Future()
+    
+    def run():
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(func())
+            except BaseException as e:
+                future.set_exception(e)
+    
+    threading.Thread(target=run, name='aiproxy-primary', daemon=True).start()
+    return future
+
+
+def _succeeded(future):
+    """Whether an attempt returned a 2xx response (or any result without a status)."""
+    if future.exception() is not None:
+        return False
+    return 200 <= getattr(future.result(), 'status_code', 200) < 300
+
+
+def _discard(future):
+    """Close the response of an attempt whose result is no longer needed."""
+    if not future.cancelled() and future.exception() is None:
+        response = future.result()
+        if hasattr(response, 'close'):
+            response.close()
+
+
+class HedgePolicy:
+    """
+    Sends one duplicate AI Proxy request when the first has not returned
+    within the recent latency percentile, and uses whichever finishes first.
+    
+    The delay adapts to the observed latencies of successful attempts and is
+    clamped to [min_delay, max_delay]. No hedge is sent until min_samples
+    latencies are known, and at most max_rate of the recent calls are hedged,
+    which caps the extra upstream cost.
+    """
+    def __init__(self, enabled=None, percentile=None, max_rate=None, min_delay=None,
+                 max_delay=None, window=200, min_samples=20):
+        self.enabled = getattr(settings, 'AIPROXY_HEDGE', True) if enabled is None else enabled
+        self.percentile = getattr(settings, 'AIPROXY_HEDGE_PERCENTILE', 90) if percentile is None else percentile
+        self.max_rate = getattr(settings, 'AIPROXY_HEDGE_MAX_RATE', 0.1) if max_rate is None else max_rate
+        self.min_delay = getattr(settings, 'AIPROXY_HEDGE_MIN_DELAY', 0.2) if min_delay is None else min_delay
+        self.max_delay = getattr(settings, 'AIPROXY_HEDGE_MAX_DELAY', 30.0) if max_delay is None else max_delay
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._hedged = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._counts = {"calls": 0, "hedged": 0, "hedge_wins": 0}
+    
+    def observe(self, seconds):
+        """Record the latency of one successful attempt."""
+        with self._lock:
+            self._latencies.append(seconds)
+    
+    def delay(self):
+        """
+        Seconds to wait before hedging, or None while there are too few samples.
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            values = sorted(self._latencies)
+        index = min(len(values) - 1, int(round(self.percentile / 100 * len(values))) - 1)
+        return min(self.max_delay, max(self.min_delay, values[max(0, index)]))
+    
+    def _reserve_hedge(self):
+        with self._lock:
+            if sum(self._hedged) + 1 > self.max_rate * (len(self._hedged) + 1):
+                return False
+            self._hedged.append(True)
+            self._counts["hedged"] += 1
+            return True
+    
+    def _record_unhedged(self):
+        with self._lock:
+            self._hedged.append(False)
+    
+    def call(self, send):
+        """
+        Run send() (which performs one upstream request and returns its
+        response), hedging it if it is slow.
+        
+        Args:
+            send (callable): Performs the request; may be called twice
+        
+        Returns:
+            The response of the first attempt to succeed, or of the last to
+            finish if neither did
+        """
+        with self._lock:
+            self._counts["calls"] += 1
+        
+        def attempt():
+            start = time.perf_counter()
+            response = send()
+            # Fast error responses would pull the delay down and cause extra hedges
+            if 200 <= getattr(response, 'status_code', 200) < 300:
+                self.observe(time.perf_counter() - start)
+            return response
+        
+        delay = self.delay() if self.enabled else None
+        if delay is None:
+            self._record_unhedged()
+            return attempt()
+        
+        primary = _start_thread(attempt)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._reserve_hedge():
+            self._record_unhedged()
+            return primary.result()
+        
+        pipeline_metrics.increment("aiproxy.hedged")
+        hedge = get_hedge_executor().submit(attempt)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                # A fast error response must not beat a slower answer
+                if _succeeded(future) or not pending:
+                    winner = future
+                    break
+            else:
+                # This attempt failed; wait for the other one
+                continue
+            for loser in pending:
+                # Cancels the attempt if it has not started; otherwise its response is closed
+                loser.cancel()
+                loser.add_done_callback(_discard)
+            if winner is hedge:
+                with self._lock:
+                    self._counts["hedge_wins"] += 1
+                pipeline_metrics.increment("aiproxy.hedge_won")
+            return winner.result()
+    
+    def stats(self):
+        delay = self.delay()
+        with self._lock:
+            counts = dict(self._counts)
+            return {
+                "enabled": self.enabled,
+                "delay_ms": round(delay * 1000, 1) if delay is not None else None,
+                "calls": counts["calls"],
+                "hedged": counts["hedged"],
+                "hedge_rate": ratio(counts["hedged"], counts["calls"]),
+                "hedge_wins": counts["hedge_wins"],
+                "win_rate": ratio(counts["hedge_wins"], counts["hedged"]),
+                # Every hedge is one extra upstream request
+                "extra_calls": counts["hedged"],
+                "recent_hedge_rate": ratio(sum(self._hedged), len(self._hedged)),
+                "max_rate": self.max_rate,
+            }
+    
+    def reset(self):
+        with self._lock:
+            self._latencies.clear()
+            self._hedged.clear()
+            self._counts = {"calls": 0, "hedged": 0, "hedge_wins": 0}
+
+
+# Shared by all RequestHandler instances in this process
+aiproxy_hedge = HedgePolicy()
@@ -0,0 +1,59 @@
+import threading
+from collections import defaultdict
+
+
+class Metrics:
+    """
+    Thread-safe in-process counters and timings.
+    
+    Each worker process keeps its own metrics; they are exposed through
+    the /api/metrics/ endpoint.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._timings = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+    
+    def increment(self, name, by=1):
+        with self._lock:
+            self._counters[name] += by
+    
+    def observe(self, name, seconds):
+        """Record a duration in seconds."""
+        ms = seconds * 1000
+        with self._lock:
+            timing = self._timings[name]
+            timing["count"] += 1
+            timing["total_ms"] += ms
+            timing["max_ms"] = max(timing["max_ms"], ms)
+    
+    def get(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+    
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "timings": {
+                    name: {
+                        "count": timing["count"],
+                        "mean_ms": round(timing["total_ms"] / timing["count"], 3) if timing["count"] else 0.0,
+                        "max_ms": round(timing["max_ms"], 3),
+                    }
+                    for name, timing in self._timings.items()
+                },
+            }
+    
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+# Request pipeline metrics shared by all RequestHandler instances in this process
+pipeline_metrics = Metrics()
+
+
+def ratio(numerator, denominator):
+    return round(numerator / denominator, 4) if denominator else 0.0
@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+
+from django.conf import settings
+
+from .metrics import pipeline_metrics
+
+logger = logging.getLogger(__name__)
+
+# Bump when a parser changes what it returns, so old entries are ignored
+PARSE_CACHE_VERSION = 1
+
+
+def content_digest(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+
+class ParseCache:
+    """
+    Parsed uploads on local disk, keyed by the SHA-256 of the file content.
+    
+    Each entry is one pickle file holding what a FileProcessor parser returned
+    (DataFrames, decoded text, SQLite schema samples); ZIP members are cached
+    one by one under the digest of their own content. Entries are written to
+    a temporary file and renamed into place, so several worker processes can
+    share one directory. A hit touches the entry's mtime; when the directory
+    grows past max_bytes the least recently used entries are removed. Files
+    smaller than min_bytes are cheaper to parse than to load and are skipped.
+    """
+    def __init__(self, directory=None, max_bytes=None, min_bytes=None, enabled=None):
+        self.enabled = getattr(settings, 'PARSE_CACHE', True) if enabled is None else enabled
+        self.directory = directory or getattr(settings, 'PARSE_CACHE_DIR', None)
+        self.max_bytes = getattr(settings, 'PARSE_CACHE_MAX_BYTES', 512 * 1024 * 1024) if max_bytes is None else max_bytes
+        self.min_bytes = getattr(settings, 'PARSE_CACHE_MIN_BYTES', 16 * 1024) if min_bytes is None else min_bytes
+        self._written = 0
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+    
+    def _path(self, digest, kind):
+        return os.path.join(self.directory, digest[:2], f"{digest}-{kind}-v{PARSE_CACHE_VERSION}.pkl")
+    
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+        pipeline_metrics.increment(f"parse_cache.{name}")
+    
+    def get_or_parse(self, raw, kind, parse):
+        """
+        Cached parse of raw, or parse(raw) stored for next time.
+        
+        Args:
+            raw (bytes): File content
+            kind (str): Parser name, part of the key
+            parse (callable): Parses raw into a picklable dict
+        
+        Returns:
+            dict: The parsed representation
+        """
+        if not self.enabled or not self.directory or len(raw) < self.min_bytes:
+            return parse(raw)
+        
+        digest = content_digest(raw)
+        cached = self.get(digest, kind)
+        if cached is not None:
+            return cached
+        parsed = parse(raw)
+        # Parses cut short by the deadline are not stored
+        if not parsed.get('partial'):
+            self.put(digest, kind, parsed)
+        return parsed
+    
+    def get(self, digest, kind):
+        path = self._path(digest, kind)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            # Keeps recently used entries from being evicted
+            os.utime(path)
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable parse cache entry {path}: {str(e)}")
+            self._remove(path)
+            self._count("misses")
+            return None
+        self._count("hits")
+        return value
+    
+    def put(self, digest, kind, value):
+        path = self._path(digest, kind)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not store parse cache entry {path}: {str(e)}")
+            return
+        self._count("stores")
+        
+        with self._lock:
+            self._written += size
+            # Scanning the directory is only worth it once a share of it is new
+            due = self._written >= self.max_bytes // 20
+            if due:
+                self._written = 0
+        if due:
+            self.evict()
+    
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            # Another worker may have removed it already
+            self._remove(path)
+            total -= size
+            removed += 1
+        if removed:
+            with self._lock:
+                self._counts["evictions"] += removed
+            pipeline_metrics.increment("parse_cache.evictions", removed)
+        return removed
+    
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+        return {"enabled": self.enabled, "directory": self.directory, **counts}
+    
+    def reset(self):
+        with self._lock:
+            self._written = 0
+            self._counts = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+# Shared by all FileProcessor instances in this process
+parse_cache = ParseCache()
@@ -0,0 +1,221 @@
+import gzip
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+# host ident user [time] "method path protocol" status bytes ... (Apache combined log and its extensions)
+LOG_RE = re.compile(
+    r'^(\S+) \S+ \S+ \[(\d\d/\w{3}/\d{4}:\d\d:\d\d:\d\d)[^\]]*\] '
+    r'"([^\s"]*) ?([^\s"]*)(?:[^"\\]|\\.)*" (\d{3}) (\d+|-)',
+    re.MULTILINE,
+)
+
+# Lines parsed before they are turned into arrays; bounds the Python objects alive at once
+CHUNK_LINES = 100000
+
+MONTHS = np.array([b'Jan', b'Feb', b'Mar', b'Apr', b'May', b'Jun', b'Jul', b'Aug', b'Sep', b'Oct', b'Nov', b'Dec'])
+
+
+def open_log(source):
+    """
+    Text stream over a log, decompressing gzip on the fly.
+    
+    Args:
+        source (bytes or str): File content, or the path of a file on disk
+    """
+    raw = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else open(source, 'rb')
+    if raw.read(2) == b'\x1f\x8b':
+        raw.seek(0)
+        raw = gzip.GzipFile(fileobj=raw)
+    else:
+        raw.seek(0)
+    return io.TextIOWrapper(raw, encoding='utf-8', errors='replace')
+
+
+def parse_timestamps(times):
+    """Vectorized parse of 'dd/Mon/yyyy:HH:MM:SS' strings into datetime64[s]."""
+    chars = np.array(times, dtype='S20')
+    digits = chars.view(np.uint8).reshape(len(times), 20).astype(np.int64) - ord('0')
+    
+    def number(start, width):
+        value = np.zeros(len(times), dtype=np.int64)
+        for i in range(start, start + width):
+            value = value * 10 + digits[:, i]
+        return value
+    
+    names = chars.view('S1').reshape(len(times), 20)[:, 3:6].copy().view('S3').ravel()
+    month = np.zeros(len(times), dtype=np.int64)
+    for i, name in enumerate(MONTHS):
+        month[names == name] = i
+    days = ((number(7, 4) - 1970) * 12 + month).astype('datetime64[M]').astype('datetime64[D]')
+    days += (number(0, 2) - 1).astype('timedelta64[D]')
+    seconds = number(12, 2) * 3600 + number(15, 2) * 60 + number(18, 2)
+    return days.astype('datetime64[s]') + seconds.astype('timedelta64[s]')
+
+
+def is_apache_log(source):
+    """Whether the first line of source looks like an Apache access log line."""
+    try:
+        with open_log(source) as f:
+            return LOG_RE.match(f.readline()) is not None
+    except (OSError, EOFError):
+        return False
+
+
+class Vocabulary:
+    """Dictionary encoding: repeated strings become small integer codes."""
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+    
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+    
+    def encode_many(self, values):
+        """Codes of a list of values as an int64 array."""
+        # Hashing in C per chunk; only the distinct values go through Python
+        local_codes, uniques = pd.factorize(np.array(values, dtype=object))
+        mapping = np.fromiter((self.encode(value) for value in uniques), dtype=np.int64, count=len(uniques))
+        return mapping[local_codes]
+    
+    def matching(self, predicate):
+        """Boolean array over codes of the values that satisfy predicate."""
+        return np.fromiter((predicate(value) for value in self.values), dtype=bool, count=len(self.values))
+    
+    def __getstate__(self):
+        return self.values
+    
+    def __setstate__(self, values):
+        self.values = values
+        self.codes = {value: code for code, value in enumerate(values)}
+
+
+class ApacheLog:
+    """
+    An access log as columns: timestamp, method, path, status, bytes and ip.
+    
+    Lines are streamed and parsed CHUNK_LINES at a time into numpy arrays, so
+    memory grows with the number of requests (about 40 bytes each) and the
+    distinct ips and paths, never with the size of the text. Timestamps are
+    the log's own local time, which is what questions about hours and days
+    refer to. ip, method and path are dictionary encoded, so filters on them
+    are evaluated once per distinct value and then applied with numpy.
+    """
+    def __init__(self):
+        self.ips = Vocabulary()
+        self.methods = Vocabulary()
+        self.paths = Vocabulary()
+        self.timestamp = np.array([], dtype='datetime64[s]')
+        self.ip = np.array([], dtype=np.int32)
+        self.method = np.array([], dtype=np.int16)
+        self.path = np.array([], dtype=np.int32)
+        self.status = np.array([], dtype=np.int16)
+        self.bytes = np.array([], dtype=np.int64)
+        self.skipped = 0
+        self.partial = None
+    
+    @classmethod
+    def parse(cls, source, deadline=None):
+        """
+        Parse a plain or gzipped log.
+        
+        Args:
+            source (bytes or str): File content, or the path of a file on disk
+            deadline (Deadline, optional): Parsing stops between chunks once
+                local time runs out; log.partial then says so
+        
+        Returns:
+            ApacheLog: The parsed columns
+        """
+        log = cls()
+        columns = {name: [] for name in ('timestamp', 'ip', 'method', 'path', 'status', 'bytes')}
+        with open_log(source) as f:
+            while True:
+                lines = f.readlines(CHUNK_LINES * 200)
+                if not lines:
+                    break
+                log._add_chunk(lines, columns)
+                if deadline is not None and deadline.local_expired():
+                    log.partial = "log not read to the end before the deadline"
+                    break
+        for name, parts in columns.items():
+            if parts:
+                setattr(log, name, np.concatenate(parts))
+        return log
+    
+    def _add_chunk(self, lines, columns):
+        # One regex pass over the whole chunk; lines that do not match are skipped
+        rows = LOG_RE.findall(''.join(lines))
+        self.skipped += len(lines) - len(rows)
+        if not rows:
+            return
+        ips, times, methods, paths, statuses, sizes = zip(*rows)
+        sizes = np.array(sizes)
+        columns['timestamp'].append(parse_timestamps(times))
+        columns['ip'].append(self.ips.encode_many(ips).astype(np.int32))
+        columns['method'].append(self.methods.encode_many(methods).astype(np.int16))
+        columns['path'].append(self.paths.encode_many(paths).astype(np.int32))
+        columns['status'].append(np.array(statuses).astype(np.int16))
+        columns['bytes'].append(np.where(sizes == '-', '0', sizes).astype(np.int64))
+    
+    def __len__(self):
+        return len(self.status)
+    
+    def where(self, method=None, status_range=None, path_prefix=None, date=None, weekday=None, hours=None):
+        """
+        Boolean mask of the requests that match every given condition.
+        
+        Args:
+            method (str, optional): HTTP method, e.g. 'GET'
+            status_range (tuple, optional): (low, high) with low <= status < high
+            path_prefix (str, optional): Paths that start with this
+            date (str, optional): Calendar day, 'YYYY-MM-DD'
+            weekday (int, optional): 0 for Monday to 6 for Sunday
+            hours (tuple, optional): (start, end) with start <= hour < end
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if method is not None:
+            mask &= self.methods.matching(lambda value: value == method)[self.method]
+        if status_range is not None:
+            mask &= (self.status >= status_range[0]) & (self.status < status_range[1])
+        if path_prefix is not None:
+            mask &= self.paths.matching(lambda value: value.startswith(path_prefix))[self.path]
+        if date is not None or weekday is not None:
+            days = self.timestamp.astype('datetime64[D]')
+            if date is not None:
+                mask &= days == np.datetime64(date, 'D')
+            if weekday is not None:
+                # 1970-01-01 was a Thursday (3)
+                mask &= (days.astype(np.int64) + 3) % 7 == weekday
+        if hours is not None:
+            hour = (self.timestamp - self.timestamp.astype('datetime64[D]')).astype('timedelta64[h]').astype(np.int64)
+            mask &= (hour >= hours[0]) & (hour < hours[1])
+        return mask
+    
+    def total_by(self, key, values, mask=None):
+        """
+        Sum of values per distinct key.
+        
+        Args:
+            key (str): 'ip', 'path' or 'method'
+            values (str or None): Column to add up, or None to count requests
+            mask (ndarray, optional): Requests to include
+        
+        Returns:
+            dict: key value -> total, largest first
+        """
+        codes = getattr(self, key)
+        vocabulary = getattr(self, f"{key}s")
+        weights = getattr(self, values) if values else None
+        if mask is not None:
+            codes = codes[mask]
+            weights = weights[mask] if weights is not None else None
+        totals = np.bincount(codes, weights=weights, minlength=len(vocabulary.values))
+        order = np.argsort(totals, kind='stable')[::-1]
+        return {vocabulary.values[code]: int(totals[code]) for code in order if totals[code]}
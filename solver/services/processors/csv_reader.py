@@ -0,0 +1,204 @@
+import io
+import logging
+import os
+from collections.abc import Mapping
+
+import pandas as pd
+from django.conf import settings
+
+from .encoding import detect_encoding
+
+logger = logging.getLogger(__name__)
+
+
+def available_engine(engine):
+    """The requested pandas CSV engine, or 'c' when pyarrow is not installed."""
+    if engine == 'pyarrow':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logger.warning("CSV_ENGINE is pyarrow but pyarrow is not installed; using the C parser")
+            return 'c'
+    return engine
+
+
+class CsvSource:
+    """
+    A CSV upload that can be read whole, by column, in chunks or just its head.
+    
+    The encoding is detected once, from a BOM or a sample of the file. Large files are
+    read in chunks of chunk_rows rows with the dtypes inferred from the first
+    sample_rows rows, so every chunk gets the same dtypes and no chunk is
+    parsed twice. Only the requested columns (usecols) are kept.
+    
+    Args:
+        source (bytes or str): File content, or the path of a file on disk
+        engine (str, optional): pandas parser engine, 'c' or 'pyarrow'
+        chunk_bytes (int, optional): Files at least this big are read in chunks
+        chunk_rows (int, optional): Rows per chunk
+        sample_rows (int, optional): Rows used to infer dtypes
+    """
+    def __init__(self, source, engine=None, chunk_bytes=None, chunk_rows=None, sample_rows=None):
+        self.source = source
+        self.engine = available_engine(engine or getattr(settings, 'CSV_ENGINE', 'c'))
+        self.chunk_bytes = getattr(settings, 'CSV_CHUNK_BYTES', 64 * 1024 * 1024) if chunk_bytes is None else chunk_bytes
+        self.chunk_rows = getattr(settings, 'CSV_CHUNK_ROWS', 200000) if chunk_rows is None else chunk_rows
+        self.sample_rows = getattr(settings, 'CSV_SAMPLE_ROWS', 10000) if sample_rows is None else sample_rows
+        self._encoding = None
+        self._dtypes = None
+    
+    @property
+    def size(self):
+        if isinstance(self.source, (bytes, bytearray)):
+            return len(self.source)
+        return os.path.getsize(self.source)
+    
+    def _open(self):
+        if isinstance(self.source, (bytes, bytearray)):
+            return io.BytesIO(self.source)
+        return open(self.source, 'rb')
+    
+    def _sample(self, size):
+        with self._open() as f:
+            return f.read(size)
+    
+    @property
+    def encoding(self):
+        if self._encoding is None:
+            if isinstance(self.source, (bytes, bytearray)):
+                self._encoding = detect_encoding(self.source)
+            else:
+                # Files on disk are only sampled, not hashed
+                self._encoding = detect_encoding(self._sample(64 * 1024), complete=False)
+        return self._encoding
+    
+    def _read(self, encoding, **kwargs):
+        with self._open() as f:
+            return pd.read_csv(f, encoding=encoding, **kwargs)
+    
+    def _read_any(self, **kwargs):
+        """Read with the detected encoding, then with cp1252 if that fails."""
+        try:
+            return self._read(self.encoding, **kwargs)
+        except UnicodeDecodeError:
+            self._encoding = 'cp1252'
+            return self._read(self._encoding, **kwargs)
+    
+    def columns(self):
+        """Column names, from the header alone."""
+        return list(self._read_any(nrows=0).columns)
+    
+    def head(self, rows=20):
+        return self._read_any(nrows=rows)
+    
+    def dtypes(self):
+        """dtypes of the first sample_rows rows, used for every chunk."""
+        if self._dtypes is None:
+            self._dtypes = self._read_any(nrows=self.sample_rows).dtypes.to_dict()
+        return self._dtypes
+    
+    def _usable(self, usecols):
+        if usecols is None:
+            return None
+        header = self.columns()
+        return [column for column in header if column in set(usecols)]
+    
+    def iter_chunks(self, usecols=None, chunk_rows=None):
+        """
+        Yield DataFrames of at most chunk_rows rows with only usecols columns.
+        """
+        usecols = self._usable(usecols)
+        dtypes = self.dtypes()
+        if usecols is not None:
+            dtypes = {column: dtypes[column] for column in usecols}
+        with self._open() as f:
+            reader = pd.read_csv(
+                f, encoding=self.encoding, usecols=usecols, dtype=dtypes,
+                chunksize=chunk_rows or self.chunk_rows,
+            )
+            for chunk in reader:
+                yield chunk
+    
+    def read(self, usecols=None):
+        """
+        The whole file as a DataFrame with only usecols columns (all by default).
+        """
+        if self.size < self.chunk_bytes or self.engine == 'pyarrow':
+            # The pyarrow engine is multi-threaded but cannot read in chunks
+            usecols = self._usable(usecols)
+            return self._read_any(usecols=usecols, engine=self.engine)
+        
+        try:
+            chunks = list(self.iter_chunks(usecols))
+        except (ValueError, TypeError) as e:
+            # A later chunk did not fit the sampled dtypes; read it in one go instead
+            logger.info(f"Sampled CSV dtypes did not fit ({str(e)}); reading without them")
+            return self._read_any(usecols=self._usable(usecols))
+        if not chunks:
+            return self.head(0)
+        return pd.concat(chunks, ignore_index=True)
+
+
+def read_columns(file_info, columns):
+    """
+    Just some columns of a CSV file_info, without parsing the rest.
+    
+    Columns that the file does not have are left out. The full DataFrame is
+    used if it was already loaded.
+    
+    Returns:
+        DataFrame or None: None if file_info is not a readable CSV
+    """
+    if file_info.get('type') != 'csv':
+        return None
+    loaded = getattr(file_info, 'loaded', None)
+    source = file_info.get('csv')
+    if source is None or (loaded is not None and loaded('data')):
+        df = file_info.get('data')
+        if df is None:
+            return None
+        return df[[column for column in df.columns if column in set(columns)]]
+    try:
+        return source.read(usecols=columns)
+    except Exception as e:
+        logger.warning(f"Could not read columns {columns} of {file_info.get('name')}: {str(e)}")
+        return None
+
+
+class ProjectedFileInfo(Mapping):
+    """
+    Read-only view of a CSV file_info whose data holds only some columns.
+    
+    The registry hands this to solvers that declare the columns they use, so
+    a question about the answer column never parses the others. Every other
+    key is looked up in the underlying file_info.
+    """
+    def __init__(self, file_info, columns):
+        self.file_info = file_info
+        self.columns = list(columns)
+        self._data = None
+    
+    def __getitem__(self, key):
+        if key != 'data':
+            return self.file_info[key]
+        if self._data is None:
+            self._data = read_columns(self.file_info, self.columns)
+            if self._data is None:
+                return self.file_info['data']
+        return self._data
+    
+    def __iter__(self):
+        return iter(self.file_info)
+    
+    def __len__(self):
+        return len(self.file_info)
+
+    def __bool__(self):
+        return True
+
+
+def project_columns(file_info, columns):
+    """file_info as a solver that only reads `columns` should see it."""
+    if file_info.get('type') != 'csv' or file_info.get('csv') is None:
+        return file_info
+    return ProjectedFileInfo(file_info, columns)
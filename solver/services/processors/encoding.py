@@ -0,0 +1,112 @@
+import codecs
+import hashlib
+
+import charset_normalizer
+from django.conf import settings
+
+from ..answer_cache import AnswerCache
+from ..metrics import pipeline_metrics
+
+# Longest first: the UTF-32 LE BOM starts with the UTF-16 LE one
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Detected encodings by content SHA-256, shared by every upload in the process
+encoding_cache = AnswerCache(limit=getattr(settings, 'ENCODING_CACHE_SIZE', 10000))
+
+
+# Wins ties with other single-byte code pages, as the most common for Western data
+PREFERRED_ENCODING = 'cp1252'
+# How much more mess charset-normalizer may see in cp1252 before another code page wins
+CHAOS_ALLOWANCE = 0.2
+
+
+def _first_invalid_utf8(raw, complete, chunk_size=1024 * 1024):
+    """Offset of the first byte that is not valid UTF-8, or None."""
+    decoder = codecs.getincrementaldecoder('utf-8')('strict')
+    view = memoryview(raw)
+    for offset in range(0, len(raw), chunk_size):
+        chunk = view[offset:offset + chunk_size]
+        try:
+            # Decoded in chunks so a large file is never held twice
+            decoder.decode(chunk, final=complete and offset + chunk_size >= len(raw))
+        except UnicodeDecodeError as e:
+            return offset + e.start
+    return None
+
+
+def _detect(raw, complete, sample_size):
+    for bom, encoding in BOMS:
+        if raw.startswith(bom):
+            return encoding, 'bom'
+    invalid = _first_invalid_utf8(raw, complete)
+    if invalid is None:
+        return 'utf-8', 'utf8'
+    
+    # Sample around the first byte UTF-8 rejected, where the telling characters are
+    start = max(0, invalid - sample_size // 2)
+    sample = raw[start:start + sample_size]
+    results = list(charset_normalizer.from_bytes(sample))
+    if b'\x00' not in sample:
+        # Text in UTF-16 or UTF-32 without a BOM is full of NUL bytes
+        results = [match for match in results if not match.encoding.startswith(('utf_16', 'utf_32'))]
+    if not results:
+        return PREFERRED_ENCODING, 'default'
+    best = results[0]
+    if best.coherence == 0 and _decodes(sample, PREFERRED_ENCODING):
+        # No language signal, e.g. a few accented characters in numbers and codes
+        return PREFERRED_ENCODING, 'default'
+    if best.encoding != PREFERRED_ENCODING:
+        # charset-normalizer drops cp1252 for DOS and Mac code pages over a few
+        # punctuation marks (dashes, curly quotes); keep it if it reads as well
+        preferred = charset_normalizer.from_bytes(sample, cp_isolation=[PREFERRED_ENCODING]).best()
+        if (preferred is not None and preferred.coherence >= best.coherence
+                and preferred.chaos <= best.chaos + CHAOS_ALLOWANCE):
+            return PREFERRED_ENCODING, 'detected'
+    return best.encoding, 'detected'
+
+
+def _decodes(sample, encoding):
+    try:
+        sample.decode(encoding)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def detect_encoding(raw, complete=True, sample_size=None):
+    """
+    Encoding of some file content.
+    
+    A BOM decides it when there is one. Otherwise content that is valid UTF-8
+    (checked strictly, in C, over the whole content) is UTF-8, and only then
+    does charset-normalizer look at a sample taken around the first byte that
+    is not. The result for complete content is cached by its SHA-256, so
+    each upload is detected once and decoded once.
+    
+    Args:
+        raw (bytes): The content, or the start of it
+        complete (bool): False when raw is only the start of the file
+        sample_size (int, optional): Bytes given to charset-normalizer;
+            defaults to ENCODING_SAMPLE_BYTES
+    
+    Returns:
+        str: A Python codec name
+    """
+    sample_size = sample_size or getattr(settings, 'ENCODING_SAMPLE_BYTES', 16 * 1024)
+    key = hashlib.sha256(raw).hexdigest() if complete else None
+    if key is not None:
+        cached = encoding_cache.get(key)
+        if cached is not None:
+            return cached
+    
+    encoding, method = _detect(raw, complete, sample_size)
+    pipeline_metrics.increment(f"encoding.{method}")
+    if key is not None:
+        encoding_cache.set(key, encoding)
+    return encoding
@@ -0,0 +1,151 @@
+import io
+import os
+import threading
+from collections.abc import Mapping
+
+import pandas as pd
+
+from ..parse_cache import parse_cache
+
+# Rows turned into a DataFrame at a time, so the row tuples never pile up
+EXCEL_CHUNK_ROWS = 50000
+
+
+def _load_openpyxl():
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportError("Reading .xlsx files needs openpyxl (pip install openpyxl)")
+    return openpyxl
+
+
+class ExcelSource:
+    """
+    An Excel upload whose sheets are read one at a time.
+    
+    .xlsx files are opened with openpyxl in read-only mode, which streams
+    each sheet's XML instead of building the whole workbook, and rows are
+    turned into DataFrames EXCEL_CHUNK_ROWS at a time. Cell values come
+    typed from openpyxl (numbers, dates, text); formulas give their cached
+    values. Legacy .xls files go through pandas and need xlrd.
+    
+    Args:
+        source (bytes or str): File content, or the path of a file on disk
+        name (str): File name; its extension picks the reader
+    """
+    def __init__(self, source, name):
+        self.source = source
+        self.legacy = os.path.splitext(name)[1].lower() == '.xls'
+        self._sheet_names = None
+    
+    def _open(self):
+        if isinstance(self.source, (bytes, bytearray)):
+            return io.BytesIO(self.source)
+        return open(self.source, 'rb')
+    
+    def _workbook(self, f):
+        return _load_openpyxl().load_workbook(f, read_only=True, data_only=True)
+    
+    def sheet_names(self):
+        """Sheet names in workbook order, from the workbook index alone."""
+        if self._sheet_names is None:
+            with self._open() as f:
+                if self.legacy:
+                    self._sheet_names = pd.ExcelFile(f, engine='xlrd').sheet_names
+                else:
+                    workbook = self._workbook(f)
+                    self._sheet_names = list(workbook.sheetnames)
+                    workbook.close()
+        return self._sheet_names
+    
+    def read_sheet(self, sheet, nrows=None):
+        """
+        One sheet as a DataFrame, with its first row as the header.
+        
+        Args:
+            sheet (str): Sheet name
+            nrows (int, optional): Read at most this many data rows
+        """
+        if self.legacy:
+            with self._open() as f:
+                return pd.read_excel(f, sheet_name=sheet, nrows=nrows, engine='xlrd')
+        
+        with self._open() as f:
+            workbook = self._workbook(f)
+            try:
+                rows = workbook[sheet].iter_rows(values_only=True)
+                header = next(rows, None)
+                if header is None:
+                    return pd.DataFrame()
+                columns = self._header(header)
+                chunks, chunk = [], []
+                for count, row in enumerate(rows):
+                    if nrows is not None and count >= nrows:
+                        break
+                    # Trailing formatted cells are dropped
+                    chunk.append(row[:len(columns)])
+                    if len(chunk) >= EXCEL_CHUNK_ROWS:
+                        chunks.append(self._frame(chunk, columns))
+                        chunk = []
+                if chunk or not chunks:
+                    chunks.append(self._frame(chunk, columns))
+            finally:
+                workbook.close()
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    
+    def _header(self, header):
+        header = list(header)
+        # Read-only mode pads rows to the sheet's widest formatted row
+        while header and header[-1] is None:
+            header.pop()
+        return [f"Unnamed: {i}" if value is None else str(value).strip() for i, value in enumerate(header)]
+    
+    def _frame(self, rows, columns):
+        df = pd.DataFrame.from_records(rows, columns=columns) if rows else pd.DataFrame(columns=columns)
+        # Object columns holding only numbers or only dates get a proper dtype
+        return df.infer_objects()
+
+
+class ExcelSheets(Mapping):
+    """
+    Sheet name -> DataFrame, each sheet parsed on first lookup.
+    
+    Sheets of in-memory uploads are cached in the parse cache under the
+    file's SHA-256 and the sheet's position, so a workbook seen before is
+    not parsed again, sheet by sheet.
+    """
+    def __init__(self, excel_source, raw=None):
+        self.excel_source = excel_source
+        self.raw = raw
+        self._names = excel_source.sheet_names()
+        self._sheets = {}
+        self._lock = threading.Lock()
+    
+    def __getitem__(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        index = self._names.index(name)
+        with self._lock:
+            if name not in self._sheets:
+                self._sheets[name] = self._load(name, index)
+            return self._sheets[name]
+    
+    def _load(self, name, index):
+        if self.raw is None:
+            return self.excel_source.read_sheet(name)
+        return parse_cache.get_or_parse(
+            self.raw, f"excel-{index}", lambda raw: {'data': self.excel_source.read_sheet(name)}
+        )['data']
+    
+    def __iter__(self):
+        return iter(self._names)
+    
+    def __len__(self):
+        return len(self._names)
+    
+    def loaded(self):
+        with self._lock:
+            return list(self._sheets)
+    
+    def __repr__(self):
+        return f"ExcelSheets({self._names})"
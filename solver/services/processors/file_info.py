@@ -0,0 +1,87 @@
+import threading
+from collections.abc import MutableMapping
+
+
+class LazyFileInfo(MutableMapping):
+    """
+    file_info dict whose expensive entries are computed on first access.
+    
+    A loader registered with lazy() computes a group of keys at once (for a
+    CSV, parsing gives data, content and columns together). It runs the first
+    time one of its keys is looked up, or tested with `in`, and its result is
+    memoized. Keys it leaves out keep the value they had before lazy() was
+    called, or are absent, just as in a plain dict.
+    Iterating, len() and repr() of unloaded keys are the exceptions: the first
+    two run the pending loaders, repr() only names them. A file_info is always
+    true, so `if file_info:` runs no loader.
+    """
+    def __init__(self, *args, **kwargs):
+        self._values = dict(*args, **kwargs)
+        self._pending = {}
+        # Loaders may look up other lazy keys of the same file_info
+        self._lock = threading.RLock()
+    
+    def lazy(self, keys, loader):
+        """
+        Register loader() to compute keys on first access.
+        
+        Args:
+            keys (iterable): Keys the loader provides
+            loader (callable): Returns a dict with some or all of the keys
+        """
+        with self._lock:
+            for key in keys:
+                self._pending[key] = loader
+    
+    def _resolve(self, key):
+        with self._lock:
+            loader = self._pending.get(key)
+            if loader is None:
+                return
+            keys = [name for name, pending in self._pending.items() if pending is loader]
+            result = loader()
+            for name in keys:
+                del self._pending[name]
+                if name in result:
+                    self._values[name] = result[name]
+    
+    def __getitem__(self, key):
+        self._resolve(key)
+        return self._values[key]
+    
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._pending.pop(key, None)
+            self._values[key] = value
+    
+    def __delitem__(self, key):
+        with self._lock:
+            if self._pending.pop(key, None) is None or key in self._values:
+                del self._values[key]
+    
+    def __contains__(self, key):
+        self._resolve(key)
+        return key in self._values
+    
+    def __iter__(self):
+        for key in list(self._pending):
+            self._resolve(key)
+        return iter(list(self._values))
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+    
+    def __bool__(self):
+        # Without this, truth testing falls back to __len__ and parses everything
+        return True
+    
+    def loaded(self, key):
+        """Whether key is available without running a loader."""
+        with self._lock:
+            return key not in self._pending
+    
+    def __repr__(self):
+        with self._lock:
+            items = [f"{key!r}: {value!r}" for key, value in self._values.items() if key not in self._pending]
+            items += [f"{key!r}: <not loaded>" for key in self._pending]
+        return "{" + ", ".join(items) + "}"
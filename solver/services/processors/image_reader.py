@@ -0,0 +1,169 @@
+import base64
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.conf import settings
+
+_executor = None
+_executor_lock = threading.Lock()
+
+MIME_TYPES = {'PNG': 'image/png', 'WEBP': 'image/webp', 'JPEG': 'image/jpeg', 'GIF': 'image/gif'}
+
+
+def _load_pil():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("Reading images needs Pillow (pip install Pillow)")
+    return Image
+
+
+def get_encoder_pool():
+    """Shared pool for trying image encoders side by side; Pillow releases the GIL while encoding."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'IMAGE_ENCODER_WORKERS', 4),
+                thread_name_prefix='image-encoder',
+            )
+        return _executor
+
+
+def decode_image(raw):
+    """
+    Decode an image upload once into a NumPy array.
+    
+    Palette and greyscale images are expanded to RGB (or RGBA when they have
+    transparency), so every solver sees height x width x channels uint8.
+    
+    Returns:
+        dict: data (ndarray), format, mode (of the array), size (width, height)
+    """
+    Image = _load_pil()
+    with Image.open(io.BytesIO(raw)) as image:
+        image_format = image.format
+        if image.mode not in ('RGB', 'RGBA'):
+            has_alpha = 'A' in image.mode or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+        pixels = np.asarray(image)
+    return {
+        'data': pixels,
+        'format': image_format,
+        'mode': 'RGBA' if pixels.shape[2] == 4 else 'RGB',
+        'size': (pixels.shape[1], pixels.shape[0]),
+    }
+
+
+def lightness(pixels):
+    """HLS lightness of every pixel, (max + min) / 2 of r, g, b in 0..1, as colorsys computes it."""
+    rgb = pixels[..., :3] / 255.0
+    return (rgb.max(axis=2) + rgb.min(axis=2)) / 2.0
+
+
+def _palette_image(pixels):
+    """The image as an exact palette image, or None with more than 256 colors."""
+    Image = _load_pil()
+    channels = pixels.shape[2]
+    flat = pixels.reshape(-1, channels)
+    colors, indices = np.unique(flat, axis=0, return_inverse=True)
+    if len(colors) > 256:
+        return None
+    image = Image.fromarray(indices.reshape(pixels.shape[:2]).astype(np.uint8), 'P')
+    image.putpalette(colors[:, :3].astype(np.uint8).tobytes())
+    if channels == 4:
+        image.info['transparency'] = colors[:, 3].astype(np.uint8).tobytes()
+    return image
+
+
+def _encode(pixels, candidate):
+    Image = _load_pil()
+    image_format, options, palette = candidate
+    image = _palette_image(pixels) if palette else Image.fromarray(pixels)
+    if image is None:
+        return None
+    if palette and 'transparency' in image.info:
+        options = dict(options, transparency=image.info['transparency'])
+    out = io.BytesIO()
+    image.save(out, image_format, **options)
+    return out.getvalue()
+
+
+# (format, save options, as an exact palette image)
+LOSSLESS_CANDIDATES = [
+    ('PNG', {'optimize': True}, True),
+    ('PNG', {'optimize': True}, False),
+    ('WEBP', {'lossless': True, 'quality': 100, 'method': 6}, False),
+    ('WEBP', {'lossless': True, 'quality': 100, 'method': 6, 'exact': True}, False),
+]
+
+
+def is_identical(pixels, encoded):
+    """Whether encoded decodes to exactly the given pixels."""
+    decoded = decode_image(encoded)['data']
+    if decoded.shape[2] != pixels.shape[2]:
+        # An opaque alpha channel added or dropped by the encoder changes nothing visible
+        if decoded.shape[2] == 4 and (decoded[..., 3] == 255).all():
+            decoded = decoded[..., :3]
+        elif pixels.shape[2] == 4 and (pixels[..., 3] == 255).all():
+            pixels = pixels[..., :3]
+    return decoded.shape == pixels.shape and np.array_equal(decoded, pixels)
+
+
+def compress_lossless(pixels):
+    """
+    The smallest lossless encoding of pixels among LOSSLESS_CANDIDATES.
+    
+    Candidates are encoded side by side on the shared encoder pool, then
+    checked pixel for pixel in size order. The first that decodes to the
+    same pixels is returned.
+    
+    Args:
+        pixels (ndarray): height x width x 3 or 4 uint8
+    
+    Returns:
+        tuple: (bytes, format), or (None, None) if nothing round-trips
+    """
+    pool = get_encoder_pool()
+    futures = {pool.submit(_encode, pixels, candidate): candidate[0] for candidate in LOSSLESS_CANDIDATES}
+    results = []
+    for future, image_format in futures.items():
+        try:
+            encoded = future.result()
+        except (OSError, ValueError):
+            # Encoder missing from this Pillow build, or it cannot take this mode
+            continue
+        if encoded is not None:
+            results.append((len(encoded), image_format, encoded))
+    for _, image_format, encoded in sorted(results, key=lambda result: result[0]):
+        if is_identical(pixels, encoded):
+            return encoded, image_format
+    return None, None
+
+
+def rearrange_tiles(pixels, moves, grid):
+    """
+    Move square tiles of an image with array slicing.
+    
+    Args:
+        pixels (ndarray): The scrambled image
+        moves (list): (original_row, original_col, scrambled_row, scrambled_col)
+        grid (tuple): (rows, cols) of tiles
+    
+    Returns:
+        ndarray: The image with each tile back at its original position
+    """
+    rows, cols = grid
+    height, width = pixels.shape[0] // rows, pixels.shape[1] // cols
+    # rows x cols x tile height x tile width x channels, a view without copying
+    tiles = pixels[:rows * height, :cols * width].reshape(rows, height, cols, width, -1).swapaxes(1, 2)
+    moves = np.asarray(moves)
+    placed = tiles.copy()
+    placed[moves[:, 0], moves[:, 1]] = tiles[moves[:, 2], moves[:, 3]]
+    return placed.swapaxes(1, 2).reshape(rows * height, cols * width, -1)
+
+
+def to_data_uri(encoded, image_format):
+    return f"data:{MIME_TYPES.get(image_format, 'application/octet-stream')};base64,{base64.b64encode(encoded).decode('ascii')}"
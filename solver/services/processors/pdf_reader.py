@@ -0,0 +1,275 @@
+import io
+import multiprocessing
+import os
+import re
+import statistics
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import pandas as pd
+from django.conf import settings
+
+_pool = None
+_pool_lock = threading.Lock()
+
+GROUP_RE = re.compile(r'\bgroup\s*(\d+)\b', re.IGNORECASE)
+BULLET_RE = re.compile(r'^[•●▪◦‣∙·\-\*]\s*')
+
+
+def _load_pdfplumber():
+    try:
+        import pdfplumber
+    except ImportError:
+        raise ImportError("Reading PDF files needs pdfplumber (pip install pdfplumber)")
+    return pdfplumber
+
+
+def get_pdf_pool():
+    """
+    Shared process pool for PDF pages; PDF parsing is pure Python and holds the GIL.
+    
+    Workers are spawned, not forked: forking the threaded server while another
+    thread holds a lock would leave that lock held forever in the child.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'PDF_WORKERS', None) or os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def _open(source):
+    return _load_pdfplumber().open(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+
+
+def page_count(source):
+    with _open(source) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pages(source, first, last):
+    """
+    Text lines and tables of pages first..last-1 (0-based).
+    
+    Runs in a pool worker, so it takes the file content or path and returns
+    plain lists and dicts. Each worker opens the document once for its range.
+    """
+    pages = []
+    with _open(source) as pdf:
+        for number in range(first, last):
+            page = pdf.pages[number]
+            found = page.find_tables()
+            boxes = [table.bbox for table in found]
+            lines = []
+            for line in page.extract_text_lines():
+                # Text inside a table is only kept as table cells
+                if any(x0 <= line['x0'] and line['x1'] <= x1 and top <= line['top'] and line['bottom'] <= bottom
+                       for x0, top, x1, bottom in boxes):
+                    continue
+                sizes = [char['size'] for char in line['chars']]
+                lines.append({
+                    'text': line['text'],
+                    'top': line['top'],
+                    'bottom': line['bottom'],
+                    'size': statistics.median(sizes) if sizes else 0,
+                })
+            tables = [{'top': table.bbox[1], 'rows': table.extract()} for table in found]
+            text = page.extract_text() or ''
+            group = GROUP_RE.search(text)
+            pages.append({
+                'page': number + 1,
+                'group': int(group.group(1)) if group else None,
+                'lines': lines,
+                'tables': tables,
+            })
+    return pages
+
+
+def _ranges(pages, parts):
+    """Split range(pages) into at most parts contiguous (first, last) ranges."""
+    size = -(-pages // parts)
+    return [(first, min(first + size, pages)) for first in range(0, pages, size)]
+
+
+def extract_pdf(source, deadline=None, workers=None, parallel_min_pages=None):
+    """
+    Tables and structured text of a PDF, pages processed in parallel.
+    
+    Documents of at least parallel_min_pages pages are split into one
+    contiguous page range per worker of the shared process pool; shorter ones
+    are read in this process, where starting workers would cost more than
+    it saves.
+    
+    Args:
+        source (bytes or str): File content, or the path of a file on disk
+        deadline (Deadline, optional): Ranges not finished when local time
+            runs out are left out and 'partial' says how many pages
+        workers (int, optional): Page ranges to split into; defaults to PDF_WORKERS
+        parallel_min_pages (int, optional): Defaults to PDF_PARALLEL_MIN_PAGES
+    
+    Returns:
+        dict: data (DataFrame of every table row with page and group
+            columns), tables (list of DataFrames), content (Markdown),
+            pages and, when cut short, partial
+    """
+    workers = workers or getattr(settings, 'PDF_WORKERS', None) or os.cpu_count()
+    parallel_min_pages = (
+        getattr(settings, 'PDF_PARALLEL_MIN_PAGES', 8) if parallel_min_pages is None else parallel_min_pages
+    )
+    total = page_count(source)
+    parsed = {}
+    if total < parallel_min_pages or workers < 2:
+        pages = extract_pages(source, 0, total)
+    else:
+        pool = get_pdf_pool()
+        futures = [pool.submit(extract_pages, source, first, last) for first, last in _ranges(total, workers)]
+        timeout = deadline.local_remaining() if deadline is not None and deadline.seconds else None
+        done, not_done = wait(futures, timeout=timeout)
+        for future in not_done:
+            future.cancel()
+        # Keep page order; result() re-raises a range that failed
+        pages = [page for future in futures if future in done for page in future.result()]
+        if len(pages) < total:
+            parsed['partial'] = f"{total - len(pages)} of {total} pages not read before the deadline"
+    
+    tables = tables_to_frames(pages)
+    parsed.update({
+        'pages': total,
+        'tables': tables,
+        'data': pd.concat(tables, ignore_index=True) if tables else None,
+        'content': to_markdown(pages),
+    })
+    return parsed
+
+
+def _is_number(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _numeric(df):
+    for column in df.columns:
+        if column in ('page', 'group'):
+            continue
+        converted = pd.to_numeric(df[column], errors='coerce')
+        # Only columns where every filled cell is a number
+        if converted.notna().sum() == (df[column] != '').sum():
+            df[column] = converted
+    return df
+
+
+def tables_to_frames(pages):
+    """
+    One DataFrame per table, first row as header, with page and group columns.
+    
+    A table that continues on the next page without repeating its header
+    gets the header of the table before it.
+    """
+    frames = []
+    header = None
+    for page in pages:
+        for table in page['tables']:
+            rows = [[(cell or '').strip() for cell in row] for row in table['rows'] if any(row)]
+            if not rows:
+                continue
+            first = rows[0]
+            continues = (
+                header is not None and len(first) == len(header) and first != header
+                and any(_is_number(cell) for cell in first)
+            )
+            if not continues:
+                header, rows = first, rows[1:]
+            df = pd.DataFrame(rows, columns=header)
+            df['page'] = page['page']
+            df['group'] = page['group'] if page['group'] is not None else page['page']
+            frames.append(_numeric(df))
+    return frames
+
+
+def to_markdown(pages):
+    """
+    Markdown from text lines: larger fonts become headings, bullets become
+    list items, lines close together join into paragraphs, tables become
+    Markdown tables in place.
+    """
+    sizes = [round(line['size'], 1) for page in pages for line in page['lines'] if line['text'].strip()]
+    body = statistics.mode(sizes) if sizes else 0
+    blocks = []
+    for page in pages:
+        items = [('line', line['top'], line) for line in page['lines']]
+        items += [('table', table['top'], table) for table in page['tables']]
+        paragraph = []
+        previous = None
+        for kind, _, item in sorted(items, key=lambda item: item[1]):
+            if kind == 'table':
+                _flush(blocks, paragraph)
+                blocks.append(_markdown_table(item['rows']))
+                previous = None
+                continue
+            text = item['text'].strip()
+            if not text:
+                continue
+            level = _heading_level(item['size'], body)
+            if level or BULLET_RE.match(text) or re.match(r'^\d+[.)]\s', text):
+                _flush(blocks, paragraph)
+                if level:
+                    blocks.append('#' * level + ' ' + text)
+                elif BULLET_RE.match(text):
+                    blocks.append('- ' + BULLET_RE.sub('', text))
+                else:
+                    blocks.append(text)
+                previous = None
+                continue
+            # A gap of more than a line's height starts a new paragraph
+            if previous is not None and item['top'] - previous['bottom'] > previous['bottom'] - previous['top']:
+                _flush(blocks, paragraph)
+            paragraph.append(text)
+            previous = item
+        _flush(blocks, paragraph)
+    return '\n\n'.join(_join_lists(blocks)) + '\n' if blocks else ''
+
+
+def _heading_level(size, body):
+    if not body or size < body * 1.15:
+        return 0
+    if size >= body * 1.8:
+        return 1
+    if size >= body * 1.4:
+        return 2
+    return 3
+
+
+def _flush(blocks, paragraph):
+    if paragraph:
+        blocks.append(' '.join(paragraph))
+        paragraph.clear()
+
+
+def _join_lists(blocks):
+    """Consecutive list items go in one block, without blank lines between them."""
+    joined = []
+    for block in blocks:
+        if joined and _is_item(block) and _is_item(joined[-1].split('\n')[-1]):
+            joined[-1] += '\n' + block
+        else:
+            joined.append(block)
+    return joined
+
+
+def _is_item(block):
+    return block.startswith('- ') or re.match(r'^\d+[.)]\s', block) is not None
+
+
+def _markdown_table(rows):
+    rows = [[(cell or '').replace('\n', ' ').strip() for cell in row] for row in rows if any(row)]
+    if not rows:
+        return ''
+    lines = ['| ' + ' | '.join(rows[0]) + ' |', '| ' + ' | '.join('---' for _ in rows[0]) + ' |']
+    lines += ['| ' + ' | '.join(row) + ' |' for row in rows[1:]]
+    return '\n'.join(lines)
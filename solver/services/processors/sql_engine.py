@@ -0,0 +1,186 @@
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+from .sqlite_reader import quote_identifier
+
+# Name of the view over the uploaded file in every query
+TABLE_NAME = 'data'
+
+# DuckDB table function reading each file type, with its options
+READERS = {
+    'csv': "read_csv({path}, auto_detect = true{options})",
+    'json': "read_json_auto({path}, format = 'auto')",
+    'ndjson': "read_json_auto({path}, format = 'newline_delimited')",
+    'parquet': "read_parquet({path})",
+}
+
+# CSV encodings detected by encoding.py and the DuckDB name for them; DuckDB has no cp1252,
+# so those files read as latin-1 and fail on the bytes 0x80-0x9f the two disagree on
+CSV_ENCODINGS = {
+    'utf-16': 'utf-16',
+    'utf-16-le': 'utf-16',
+    'utf-16-be': 'utf-16',
+    'cp1252': 'latin-1',
+    'latin1': 'latin-1',
+    'latin-1': 'latin-1',
+    'iso-8859-1': 'latin-1',
+}
+
+
+class QueryTimeout(Exception):
+    """A query ran past its time budget and was interrupted."""
+
+
+def _load_duckdb():
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError("Querying files with SQL needs duckdb (pip install duckdb)")
+    return duckdb
+
+
+def quote_literal(value):
+    """A string quoted as an SQL literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class SqlTable:
+    """
+    An uploaded CSV, JSON, NDJSON or Parquet file queried in place with DuckDB.
+    
+    Every query gets its own in-memory DuckDB connection with a view named
+    TABLE_NAME over the file, so the file is scanned by DuckDB's vectorized
+    reader and never loaded into a DataFrame; only the result comes back.
+    Operators that outgrow DUCKDB_MEMORY_LIMIT spill to a temporary
+    directory. Once the view exists, the connection may read no other file
+    and its configuration is locked.
+    
+    Args:
+        source (str or callable): Path of the file, or a callable returning
+            one; in-memory uploads are spilled by it on the first query
+        file_type (str): 'csv', 'json', 'ndjson' or 'parquet'
+        csv_source (CsvSource, optional): Gives the encoding of a CSV file
+        deadline (Deadline, optional): Queries never run past local time left
+    """
+    def __init__(self, source, file_type, csv_source=None, deadline=None):
+        if file_type not in READERS:
+            raise ValueError(f"No SQL reader for file type: {file_type}")
+        self.source = source
+        self.file_type = file_type
+        self.csv_source = csv_source
+        self.deadline = deadline
+        self._path = None
+        self._lock = threading.Lock()
+    
+    @property
+    def path(self):
+        with self._lock:
+            if self._path is None:
+                self._path = str(self.source() if callable(self.source) else self.source)
+            return self._path
+    
+    def _relation(self):
+        options = ''
+        if self.csv_source is not None:
+            encoding = CSV_ENCODINGS.get(self.csv_source.encoding.lower())
+            if encoding:
+                options = f", encoding = {quote_literal(encoding)}"
+        return READERS[self.file_type].format(path=quote_literal(self.path), options=options)
+    
+    def connect(self, table=TABLE_NAME):
+        """
+        A new connection with the file as view table, read-only from then on.
+        """
+        duckdb = _load_duckdb()
+        conn = duckdb.connect(':memory:', config={
+            'threads': getattr(settings, 'DUCKDB_THREADS', None) or 1,
+            'memory_limit': getattr(settings, 'DUCKDB_MEMORY_LIMIT', '1GB'),
+            'temp_directory': getattr(settings, 'DUCKDB_TEMP_DIRECTORY', None) or tempfile.gettempdir(),
+        })
+        try:
+            conn.execute(f'CREATE VIEW {quote_identifier(table)} AS SELECT * FROM {self._relation()}')
+            conn.execute(f"SET allowed_paths = [{quote_literal(Path(self.path).resolve())}]")
+            conn.execute("SET enable_external_access = false")
+            conn.execute("SET lock_configuration = true")
+        except Exception:
+            conn.close()
+            raise
+        return conn
+    
+    def query(self, sql, params=None, table=TABLE_NAME, timeout=None, max_rows=None):
+        """
+        Run one query against the file with a time budget and a row cap.
+        
+        A timer interrupts the query once its budget is spent, so a runaway
+        join cannot hold a worker.
+        
+        Args:
+            sql (str): The query, reading the file as table; values go in
+                params, never into the SQL text
+            params (sequence or dict, optional): Query parameters
+            table (str): Name of the view over the file
+            timeout (float, optional): Seconds allowed; defaults to DUCKDB_QUERY_TIMEOUT
+            max_rows (int, optional): Rows returned at most; defaults to DUCKDB_MAX_ROWS
+        
+        Returns:
+            dict: columns, rows, and truncated (True if more rows were left)
+        
+        Raises:
+            QueryTimeout: The query was interrupted
+            duckdb.Error: The query failed or was not allowed
+        """
+        max_rows = getattr(settings, 'DUCKDB_MAX_ROWS', 10000) if max_rows is None else max_rows
+        with self._bounded_connection(table, timeout) as conn:
+            cursor = conn.execute(sql, params)
+            rows = cursor.fetchmany(max_rows + 1)
+            columns = [description[0] for description in cursor.description or []]
+        return {'columns': columns, 'rows': rows[:max_rows], 'truncated': len(rows) > max_rows}
+    
+    @contextmanager
+    def _bounded_connection(self, table, timeout):
+        """A connection that a timer interrupts once timeout (or the local deadline) is spent."""
+        timeout = getattr(settings, 'DUCKDB_QUERY_TIMEOUT', 10.0) if timeout is None else timeout
+        if self.deadline is not None and self.deadline.seconds:
+            timeout = min(timeout, self.deadline.local_remaining())
+        
+        duckdb = _load_duckdb()
+        conn = self.connect(table)
+        timer = threading.Timer(max(timeout, 0), conn.interrupt)
+        timer.start()
+        try:
+            yield conn
+        except duckdb.InterruptException as e:
+            raise QueryTimeout(f"Query interrupted after {timeout:.1f} s") from e
+        finally:
+            timer.cancel()
+            conn.close()
+    
+    def scalar(self, sql, params=None, table=TABLE_NAME):
+        """The first value of the first row of a query, such as an aggregate."""
+        rows = self.query(sql, params, table, max_rows=1)['rows']
+        return rows[0][0] if rows else None
+    
+    def columns(self):
+        """Column names and DuckDB types, from the file's schema alone."""
+        return [row[:2] for row in self.query(f'DESCRIBE {quote_identifier(TABLE_NAME)}')['rows']]
+    
+    def frame(self, sql=None, params=None, timeout=None, max_rows=None):
+        """
+        A query result (by default the whole file) as a DataFrame, within the
+        same time budget and row cap as query(). attrs['truncated'] of the
+        DataFrame is True if more rows were left.
+        """
+        max_rows = getattr(settings, 'DUCKDB_MAX_ROWS', 10000) if max_rows is None else max_rows
+        with self._bounded_connection(TABLE_NAME, timeout) as conn:
+            df = conn.sql(sql or f'SELECT * FROM {quote_identifier(TABLE_NAME)}', params=params).limit(max_rows + 1).df()
+        truncated = len(df) > max_rows
+        df = df.head(max_rows)
+        df.attrs['truncated'] = truncated
+        return df
+    
+    def __repr__(self):
+        return f"SqlTable({self.file_type})"
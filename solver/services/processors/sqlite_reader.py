@@ -0,0 +1,161 @@
+import sqlite3
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+# SQLite VM instructions between two checks of the time budget
+PROGRESS_STEPS = 1000
+
+# Statements a query may be made of; anything else (ATTACH, PRAGMA, writes) is refused
+ALLOWED_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+}
+
+
+class QueryTimeout(sqlite3.OperationalError):
+    """A query ran past its time budget and was interrupted."""
+
+
+def quote_identifier(name):
+    """A table or column name quoted for SQL, whatever characters it has."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def connect_readonly(path):
+    """
+    Open a database file read-only and immutable.
+    
+    immutable=1 tells SQLite the file cannot change, so it takes no locks
+    and never creates a journal or WAL file next to the upload.
+    """
+    uri = f"{Path(path).resolve().as_uri()}?mode=ro&immutable=1"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+
+def read_schema(path, deadline=None, sample_rows=5):
+    """
+    Tables with their columns, row counts and first rows.
+    
+    Columns of every table come from one query over pragma_table_info, and
+    row counts from one UNION ALL query; only the samples are read table by
+    table.
+    
+    Args:
+        path (str): Database file
+        deadline (Deadline, optional): Samples left when local time runs out
+            are skipped and 'partial' says how many
+        sample_rows (int): Rows sampled per table
+    
+    Returns:
+        dict: data (table -> columns, types, rows, sample), content, and partial
+            when cut short; rows is None when counting took too long
+    """
+    parsed = {}
+    conn = connect_readonly(path)
+    try:
+        tables = {}
+        for table, column, column_type in conn.execute(
+            "SELECT m.name, p.name, p.type FROM sqlite_master AS m, pragma_table_info(m.name) AS p "
+            "WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%' ORDER BY m.name, p.cid"
+        ):
+            entry = tables.setdefault(table, {'columns': [], 'types': [], 'rows': None, 'sample': []})
+            entry['columns'].append(column)
+            entry['types'].append(column_type)
+        
+        if tables:
+            counts = " UNION ALL ".join(
+                f"SELECT ?, COUNT(*) FROM {quote_identifier(table)}" for table in tables
+            )
+            try:
+                result = run_query(conn, counts, list(tables), max_rows=len(tables), deadline=deadline)
+            except QueryTimeout:
+                # Keep the schema already read; counts are left unknown
+                parsed['partial'] = "row counts not read before the time limit"
+            else:
+                for table, rows in result['rows']:
+                    tables[table]['rows'] = rows
+        
+        for index, (table, entry) in enumerate(tables.items()):
+            if deadline is not None and deadline.local_expired():
+                skipped = len(tables) - index
+                parsed['partial'] = f"{skipped} of {len(tables)} tables not read before the deadline"
+                break
+            entry['sample'] = run_query(
+                conn, f"SELECT * FROM {quote_identifier(table)} LIMIT ?", (sample_rows,), max_rows=sample_rows
+            )['rows']
+    finally:
+        conn.close()
+    parsed['data'] = tables
+    parsed['content'] = str(tables)
+    return parsed
+
+
+def _authorize(action, *args):
+    return sqlite3.SQLITE_OK if action in ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+
+def run_query(source, sql, params=(), timeout=None, max_rows=None, deadline=None):
+    """
+    Run one read-only SELECT with a time budget and a row cap.
+    
+    A progress handler checks the clock every PROGRESS_STEPS SQLite VM
+    instructions and interrupts the query once its budget is spent, so a
+    runaway join or recursive CTE cannot hold a worker. An authorizer
+    refuses anything but reading (ATTACH, PRAGMA, writes).
+    
+    Args:
+        source (str or Connection): Database file, or a connection from connect_readonly
+        sql (str): The query; values go in params, never into the SQL text
+        params (sequence or dict): Query parameters
+        timeout (float, optional): Seconds allowed; defaults to SQLITE_QUERY_TIMEOUT
+        max_rows (int, optional): Rows returned at most; defaults to SQLITE_MAX_ROWS
+        deadline (Deadline, optional): The budget never runs past local time left
+    
+    Returns:
+        dict: columns, rows, and truncated (True if more rows were left)
+    
+    Raises:
+        QueryTimeout: The query was interrupted
+        sqlite3.DatabaseError: The query failed or was not allowed
+    """
+    timeout = getattr(settings, 'SQLITE_QUERY_TIMEOUT', 5.0) if timeout is None else timeout
+    max_rows = getattr(settings, 'SQLITE_MAX_ROWS', 10000) if max_rows is None else max_rows
+    if deadline is not None and deadline.seconds:
+        timeout = min(timeout, deadline.local_remaining())
+    stop_at = time.monotonic() + timeout
+    
+    conn = connect_readonly(source) if isinstance(source, (str, Path)) else source
+    conn.set_progress_handler(lambda: time.monotonic() > stop_at, PROGRESS_STEPS)
+    conn.set_authorizer(_authorize)
+    try:
+        cursor = conn.execute(sql, params)
+        rows = cursor.fetchmany(max_rows + 1)
+        columns = [description[0] for description in cursor.description or []]
+    except sqlite3.OperationalError as e:
+        if time.monotonic() > stop_at and 'interrupted' in str(e):
+            raise QueryTimeout(f"Query interrupted after {timeout:.1f} s") from e
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+        conn.set_authorizer(None)
+        if conn is not source:
+            conn.close()
+    return {'columns': columns, 'rows': rows[:max_rows], 'truncated': len(rows) > max_rows}
+
+
+def find_table(tables, *columns):
+    """
+    Name of the first table that has all the given columns (case-insensitive).
+    
+    Returns:
+        tuple: (table, {wanted column: actual column name}), or (None, None)
+    """
+    for table, entry in tables.items():
+        actual = {column.lower(): column for column in entry['columns']}
+        if all(column in actual for column in columns):
+            return table, {column: actual[column] for column in columns}
+    return None, None
@@ -0,0 +1,212 @@
+import json
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from ..utils.file_utils import detect_type
+from .processors.file_processor import ZipMembers
+
+# Rough estimate used for budgeting; close enough for gpt-4o-mini on English and code
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in a piece of text."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def format_number(value):
+    """A column aggregate for the prompt; NA (from an all-NA nullable column) stays NA."""
+    if pd.isna(value):
+        return "NA"
+    try:
+        return f"{value:.10g}"
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Deterministically truncate text to roughly max_tokens.
+    
+    The cut is made at the last line break inside the budget when there is one,
+    so rows and log lines are never split in half.
+    """
+    max_chars = max(0, max_tokens) * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    if cut < max_chars // 2:
+        cut = max_chars
+    omitted = len(text) - cut
+    return f"{text[:cut]}\n... [truncated {omitted} chars]"
+
+
+class PromptBuilder:
+    """
+    Builds compact, type-aware file context for LLM prompts within a token budget.
+    """
+    def __init__(self, token_budget=None, head_rows=5):
+        self.token_budget = token_budget or getattr(settings, 'AIPROXY_PROMPT_TOKEN_BUDGET', 4000)
+        self.head_rows = head_rows
+    
+    def build_file_context(self, file_info):
+        """
+        Summarize a file_info dict for the prompt.
+        
+        Args:
+            file_info (dict): Information extracted by FileProcessor.extract_file_info
+        
+        Returns:
+            tuple: (context, stats) where stats has raw_tokens, prompt_tokens
+                and tokens_saved
+        """
+        context = truncate_to_tokens(self.summarize(file_info, self.token_budget), self.token_budget)
+        raw_tokens = self._raw_tokens(file_info)
+        prompt_tokens = estimate_tokens(context)
+        stats = {
+            "raw_tokens": raw_tokens,
+            "prompt_tokens": prompt_tokens,
+            "tokens_saved": max(0, raw_tokens - prompt_tokens),
+        }
+        return context, stats
+    
+    def _raw_tokens(self, file_info):
+        """Tokens the unsummarized content would take, archive members included."""
+        members = file_info.get('extracted_content')
+        if isinstance(members, ZipMembers):
+            # Estimated from the uncompressed sizes, so no member is parsed for it
+            return sum(
+                (member.file_size + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN for member in members.infos.values()
+            )
+        if members:
+            return sum(self._raw_tokens(info) for info in members.values())
+        return estimate_tokens(str(file_info.get('content') or ''))
+    
+    def summarize(self, file_info, budget):
+        """
+        Summarize a single file_info dict in at most `budget` tokens.
+        """
+        file_type = file_info.get('type')
+        header = f"File: {file_info.get('name', 'unknown')} (type: {file_type})"
+        if file_info.get('error'):
+            header += f"\nError while reading file: {file_info['error']}"
+        if file_info.get('partial'):
+            header += f"\nPartial content: {file_info['partial']}"
+        
+        summarizer = {
+            'zip': self._summarize_zip,
+            'multi': self._summarize_zip,
+            'csv': self._summarize_csv,
+            'excel': self._summarize_csv,
+            'json': self._summarize_json,
+            'ndjson': self._summarize_json,
+            'parquet': self._summarize_csv,
+            'sqlite': self._summarize_sqlite,
+            'apache_log': self._summarize_log,
+        }.get(file_type, self._summarize_text)
+        
+        body = summarizer(file_info, budget - estimate_tokens(header))
+        return truncate_to_tokens(f"{header}\n{body}" if body else header, budget)
+    
+    def _summarize_csv(self, file_info, budget):
+        df = file_info.get('data')
+        if not isinstance(df, pd.DataFrame):
+            return self._summarize_text(file_info, budget)
+        
+        lines = [f"Rows: {len(df)}, Columns: {len(df.columns)}", "Schema:"]
+        lines.extend(f"  {col}: {dtype}" for col, dtype in df.dtypes.items())
+        
+        numeric = df.select_dtypes(include='number')
+        if not numeric.empty:
+            lines.append("Aggregates:")
+            for col in numeric.columns:
+                series = numeric[col]
+                lines.append(
+                    f"  {col}: sum={format_number(series.sum())} min={format_number(series.min())} "
+                    f"max={format_number(series.max())} mean={format_number(series.mean())}"
+                )
+        
+        lines.append(f"First {min(self.head_rows, len(df))} rows (CSV):")
+        lines.append(df.head(self.head_rows).to_csv(index=False).rstrip())
+        return truncate_to_tokens("\n".join(lines), budget)
+    
+    def _summarize_json(self, file_info, budget):
+        data = file_info.get('data')
+        if data is None:
+            return self._summarize_text(file_info, budget)
+        
+        lines = []
+        if isinstance(data, list):
+            lines.append(f"JSON array with {len(data)} items")
+            if data and isinstance(data[0], dict):
+                lines.append(f"Item keys: {', '.join(map(str, data[0].keys()))}")
+            sample = data[:self.head_rows]
+        elif isinstance(data, dict):
+            lines.append(f"JSON object with keys: {', '.join(map(str, list(data.keys())[:50]))}")
+            sample = data
+        else:
+            sample = data
+        lines.append("Sample: " + json.dumps(sample, separators=(',', ':'), default=str))
+        return truncate_to_tokens("\n".join(lines), budget)
+    
+    def _summarize_sqlite(self, file_info, budget):
+        tables = file_info.get('data')
+        if not isinstance(tables, dict):
+            return self._summarize_text(file_info, budget)
+        
+        lines = []
+        for table_name, table in tables.items():
+            rows = f", {table['rows']} rows" if table.get('rows') is not None else ""
+            lines.append(f"Table {table_name}({', '.join(table.get('columns', []))}){rows}")
+            for row in table.get('sample', [])[:self.head_rows]:
+                lines.append("  " + ", ".join(map(str, row)))
+        return truncate_to_tokens("\n".join(lines), budget)
+    
+    def _summarize_log(self, file_info, budget):
+        log = file_info.get('data')
+        if log is None or not len(log):
+            return self._summarize_text(file_info, budget)
+        
+        lines = [
+            f"Apache access log with {len(log)} requests "
+            f"from {log.timestamp.min()} to {log.timestamp.max()} (log local time)",
+            "Methods: " + ", ".join(f"{method}={count}" for method, count in log.total_by('method', None).items()),
+        ]
+        statuses, counts = np.unique(log.status, return_counts=True)
+        lines.append("Statuses: " + ", ".join(f"{status}={count}" for status, count in zip(statuses, counts)))
+        # Top-level sections, e.g. /telugu/, by request count
+        sections = {}
+        for path, count in log.total_by('path', None).items():
+            section = '/' + path.lstrip('/').split('/', 1)[0]
+            sections[section] = sections.get(section, 0) + count
+        top = sorted(sections.items(), key=lambda item: -item[1])[:20]
+        lines.append("Top sections: " + ", ".join(f"{section}={count}" for section, count in top))
+        lines.append(f"First lines:\n{file_info.get('content') or ''}")
+        return truncate_to_tokens("\n".join(lines), budget)
+    
+    def _summarize_zip(self, file_info, budget):
+        members = file_info.get('extracted_content') or {}
+        kind = "Upload" if file_info.get('type') == 'multi' else "Archive"
+        lines = [f"{kind} with {len(members)} files:"]
+        # Types come from the names so the listing does not parse archive members
+        for name in members:
+            lines.append(f"  {name} ({detect_type(name)})")
+        listing = "\n".join(lines)
+        
+        # Split what is left of the budget evenly between the members
+        remaining = budget - estimate_tokens(listing)
+        if not members or remaining <= 0:
+            return truncate_to_tokens(listing, budget)
+        share = remaining // len(members)
+        parts = [listing] + [self.summarize(info, share) for info in members.values()]
+        return "\n\n".join(parts)
+    
+    def _summarize_text(self, file_info, budget):
+        content = file_info.get('content')
+        if content is None:
+            return ""
+        return truncate_to_tokens(str(content), budget)
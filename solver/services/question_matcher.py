@@ -9,6 +9,9 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Repository of known questions and answers served by the matcher
+QUESTIONS_JSON_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'questions.json')
+
 class QuestionMatcher:
     """Enhanced service to match incoming questions against the repository"""
     
@@ -53,7 +56,7 @@ class QuestionMatcher:
     
     def _load_questions(self):
         """Load questions from JSON file"""
-        json_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'questions.json')
+        json_path = QUESTIONS_JSON_PATH
         if os.path.exists(json_path):
             with open(json_path, 'r', encoding='utf-8') as f:
                 self.questions_data = json.load(f)
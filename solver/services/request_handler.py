@@ -1,11 +1,32 @@
 import os
-import tempfile
 import requests
 import json
 import re
+import time
+import logging
+from contextlib import ExitStack
 from django.conf import settings
-from django.http import JsonResponse
 from .question_matcher import QuestionMatcher
+from .processors.file_info import LazyFileInfo
+from .processors.file_processor import SpillDirectory, get_extract_executor
+from .answer_cache import llm_answer_cache
+from .response_cache import response_cache
+from .parse_cache import parse_cache
+from .streaming import StreamingAnswerCleaner, iter_sse_deltas
+from .prompt_builder import PromptBuilder, estimate_tokens
+from .solvers.registry import get_solver_registry
+from .metrics import pipeline_metrics, ratio
+from .speculation import get_executor, get_match_executor, speculation_policy
+from .hedging import aiproxy_hedge
+from .routing import PROMPT_VARIANTS, model_router
+from .usage import usage_accountant
+from .deadline import Deadline
+
+logger = logging.getLogger(__name__)
+
+AIPROXY_URL = "https://aiproxy.sanand.workers.dev/openai/v1/chat/completions"
+
+SYSTEM_PROMPT = "You are a helpful assistant for the IIT Madras Online Degree in Data Science. Your task is to answer questions accurately. Provide only the exact answer as plain text without any explanations, additional text, or formatting. Do not use JSON, markdown, code blocks, or backticks in your response."
 
 # NOTE: When using this class in a Django view, make sure to return the result as a JsonResponse:
 # Example usage in a view:
@@ -27,52 +48,270 @@ class RequestHandler:
         self.file_processor = FileProcessor()
         # Get AI Proxy token instead of OpenAI API key
         self.aiproxy_token = settings.AIPROXY_TOKEN or os.environ.get("AIPROXY_TOKEN", "")
+        self.aiproxy_url = getattr(settings, 'AIPROXY_URL', '') or AIPROXY_URL
         # Initialize the question matcher
         self.question_matcher = QuestionMatcher()
+        # Builds compact file summaries within the prompt token budget
+        self.prompt_builder = PromptBuilder()
+        self.last_prompt_stats = None
+        # What the last answer was based on, to tell whether it is safe to cache
+        self.last_file_info = None
+        self.dropped_uploads = 0
         
-    def process_request(self, question, file=None):
+    def process_request(self, question, file=None, deadline=None):
         """
         Process the request using question repository first, then AI Proxy.
         
         Args:
             question (str): The question text
-            file (InMemoryUploadedFile, optional): Uploaded file
+            file (InMemoryUploadedFile or list, optional): Uploaded file, or
+                several uploaded files that are answered together
+            deadline (Deadline, optional): Time budget for the whole request
             
         Returns:
             dict: Response with answer key as a string without markdown
         """
+        deadline = deadline or Deadline()
+        if speculation_policy.enabled:
+            return self._run_speculative_pipeline(question, file, deadline)
+        return self._run_pipeline(question, file, self.query_aiproxy, deadline)
+    
+    def answered_partially(self):
+        """
+        Whether the last answer was given without all of the upload: a file
+        skipped for lack of time, or a file_info that says it is 'partial'.
+        Such answers must not be cached, since a later identical request may
+        have the time to read everything.
+        """
+        return self.dropped_uploads > 0 or is_partial(self.last_file_info)
+    
+    def stream_request(self, question, file=None, deadline=None):
+        """
+        Process the request like process_request, but stream LLM answers.
+        
+        Repository and direct answers are yielded as a single "done" event;
+        LLM answers are yielded as "delta" events followed by "done".
+        
+        Args:
+            question (str): The question text
+            file (InMemoryUploadedFile or list, optional): Uploaded file, or
+                several uploaded files that are answered together
+            deadline (Deadline, optional): Time budget for the whole request
+        
+        Yields:
+            tuple: (event, data) pairs
+        """
+        result = self._run_pipeline(question, file, self.stream_aiproxy, deadline or Deadline())
+        if isinstance(result, dict):
+            yield "done", result
+        else:
+            yield from result
+    
+    def _run_pipeline(self, question, file, llm_step, deadline):
+        """
+        Run repository matching, file extraction and the local solvers,
+        falling back to llm_step.
+        """
+        pipeline_metrics.increment("requests")
+        
         # First try to match from the question repository
-        matched, answer = self.question_matcher.match_question(question)
-        if matched:
-            # Return properly formatted answer
-            return {"answer": self._ensure_string_answer(answer)}
+        result = self._match_repository(question, deadline)
+        if result:
+            pipeline_metrics.increment("answered.repository")
+            return result
         
         # If there's a file, process it
-        file_content = None
         if file:
-            # Create a temporary directory to save the file
-            with tempfile.TemporaryDirectory() as temp_dir:
-                file_path = os.path.join(temp_dir, file.name)
-                
-                # Save the uploaded file
-                with open(file_path, 'wb+') as destination:
-                    for chunk in file.chunks():
-                        destination.write(chunk)
+            pipeline_metrics.increment("file_requests")
+            # The upload is parsed in memory; the directory is only created for SQLite
+            with ExitStack() as stack:
+                spill_dir = stack.enter_context(SpillDirectory())
+                file_info = self._extract_upload(file, spill_dir, deadline)
+                self.last_file_info = file_info
                 
-                # Extract file content using file processor
-                file_info = self.file_processor.extract_file_info(file_path)
-                
-                # Try to directly handle simple known question patterns
-                direct_answer = self.get_direct_answer(question, file_info)
-                if direct_answer:
-                    # Return properly formatted answer
-                    return {"answer": self._ensure_string_answer(direct_answer)}
+                # Local solver stage: deterministic answers from the extracted file
+                result = self._solve_locally(question, file_info, deadline)
+                if result:
+                    return result
                 
                 # Now send to AI Proxy with the file content
-                return self.query_aiproxy(question, file_info)
+                pipeline_metrics.increment("answered.llm")
+                result = llm_step(question, file_info, deadline=deadline)
+                if isinstance(result, dict):
+                    return result
+                # A streamed answer reads the upload as it is consumed, so the directory is kept until then
+                return close_after(result, stack.pop_all())
         
         # If no file and no repository match, just send the question to AI Proxy
-        return self.query_aiproxy(question)
+        pipeline_metrics.increment("answered.llm")
+        return llm_step(question, deadline=deadline)
+    
+    def _run_speculative_pipeline(self, question, file, deadline):
+        """
+        Same answers as _run_pipeline, but repository matching runs alongside
+        file extraction and the LLM call starts as soon as its prompt is known,
+        instead of after every local stage has missed. Repository and local
+        solver answers still win; a speculative LLM answer is only used when
+        they miss, and is otherwise cancelled or discarded.
+        """
+        pipeline_metrics.increment("requests")
+        # Matching has its own pool, so it never queues behind speculative LLM calls
+        match_future = get_match_executor().submit(self._match_repository, question, deadline)
+        llm_future = None
+        used_llm = False
+        
+        with ExitStack() as stack:
+            spill_dir = stack.enter_context(SpillDirectory())
+            try:
+                file_info = None
+                if file:
+                    pipeline_metrics.increment("file_requests")
+                    file_info = self._extract_upload(file, spill_dir, deadline)
+                    self.last_file_info = file_info
+                    if match_future.done() and match_future.result():
+                        pipeline_metrics.increment("answered.repository")
+                        return match_future.result()
+                
+                if speculation_policy.should_speculate(question, file_info):
+                    pipeline_metrics.increment("speculation.started")
+                    llm_future = get_executor().submit(self.query_aiproxy, question, file_info, deadline=deadline)
+                
+                # As in _run_pipeline, a repository answer takes priority over the local solvers
+                result = match_future.result()
+                if result:
+                    pipeline_metrics.increment("answered.repository")
+                    return result
+                
+                result = self._solve_locally(question, file_info, deadline)
+                if result:
+                    return result
+                
+                pipeline_metrics.increment("answered.llm")
+                if llm_future is None:
+                    return self.query_aiproxy(question, file_info, deadline=deadline)
+                used_llm = True
+                return llm_future.result()
+            finally:
+                if llm_future is not None:
+                    speculation_policy.record(wasted=not used_llm)
+                    if not used_llm:
+                        pipeline_metrics.increment("speculation.wasted")
+                        # Cancels the call if it has not started; otherwise its answer is dropped, and
+                        # the spill directory is kept until it finishes, since it may still read the upload
+                        if not llm_future.cancel():
+                            llm_future.add_done_callback(lambda _, cleanup=stack.pop_all(): cleanup.close())
+    
+    def _match_repository(self, question, deadline):
+        """
+        Look the question up in the repository.
+        
+        Returns:
+            dict or None: Response with the repository answer, or None
+        """
+        with deadline.stage("match"):
+            matched, answer = self.question_matcher.match_question(question)
+        if matched:
+            # Return properly formatted answer
+            return {"answer": self._ensure_string_answer(answer)}
+        return None
+    
+    def _extract_upload(self, file, spill_dir, deadline):
+        """
+        Extract the file_info of an upload (or a list of uploads) from memory.
+        
+        Returns:
+            dict or None: The file_info, or None if there was no local time
+                left to read it (the LLM then gets the question only)
+        """
+        if isinstance(file, (list, tuple)):
+            if len(file) > 1:
+                return self._extract_uploads(file, spill_dir, deadline)
+            file = file[0]
+        
+        file_info = self._extract_one(file, spill_dir, deadline)
+        if file_info is None:
+            self.dropped_uploads += 1
+        return file_info
+    
+    def _extract_one(self, file, spill_dir, deadline):
+        """
+        Extract one upload, or return None if there is no local time left.
+        Safe to run on the extraction pool: it changes no handler state.
+        """
+        if deadline.local_expired():
+            logger.warning(f"Out of time before reading {file.name}; answering without the file")
+            return None
+        
+        # Extract file content using file processor
+        with deadline.stage("extract"):
+            return self.file_processor.extract_file_info(
+                file, deadline=deadline, name=file.name, spill_dir=spill_dir
+            )
+    
+    def _extract_uploads(self, files, spill_dir, deadline):
+        """
+        Extract several uploads concurrently into one combined file_info.
+        
+        The combined file_info has type 'multi', one extracted_content entry
+        per file (like a ZIP archive) and the per-file extraction times in
+        timings_ms.
+        """
+        def extract(upload):
+            start = time.perf_counter()
+            upload_info = self._extract_one(upload, spill_dir, deadline)
+            return upload_info, time.perf_counter() - start
+        
+        with deadline.stage("extract_uploads"):
+            futures = [get_extract_executor().submit(extract, upload) for upload in files]
+            extracted_content = {}
+            timings_ms = {}
+            for upload, future in zip(files, futures):
+                upload_info, elapsed = future.result()
+                if upload_info is None:
+                    # Counted here, on the request thread, not on the extraction threads
+                    self.dropped_uploads += 1
+                    continue
+                name = upload.name
+                while name in extracted_content:
+                    name = f"_{name}"
+                extracted_content[name] = upload_info
+                timings_ms[name] = round(elapsed * 1000, 3)
+                pipeline_metrics.observe(f"extract_file.{upload_info.get('type')}", elapsed)
+        
+        logger.info(
+            f"Extracted {len(extracted_content)} of {len(files)} files: "
+            + ", ".join(f"{name}={ms:.0f}ms" for name, ms in timings_ms.items())
+        )
+        partial = len(files) - len(extracted_content)
+        file_info = LazyFileInfo({
+            'path': None,
+            'name': ", ".join(upload.name for upload in files),
+            'type': 'multi',
+            'data': None,
+            'extracted_files': list(extracted_content),
+            'extracted_content': extracted_content,
+            'timings_ms': timings_ms,
+            **({'partial': f"{partial} of {len(files)} files not read before the deadline"} if partial else {}),
+        })
+        file_info.lazy(('content',), lambda: {'content': str(extracted_content)})
+        return file_info
+    
+    def _solve_locally(self, question, file_info, deadline):
+        """
+        Local solver stage.
+        
+        Returns:
+            dict or None: Response with the local answer, or None
+        """
+        if file_info is None:
+            return None
+        with deadline.stage("local_solvers"):
+            direct_answer = self.get_direct_answer(question, file_info, deadline)
+        if direct_answer:
+            pipeline_metrics.increment("answered.local_solver")
+            # Return properly formatted answer
+            return {"answer": self._ensure_string_answer(direct_answer)}
+        return None
     
     def _ensure_string_answer(self, answer):
         """
@@ -139,33 +378,98 @@ class RequestHandler:
         
         return answer_str
     
-    def get_direct_answer(self, question, file_info):
+    def get_direct_answer(self, question, file_info, deadline=None):
         """
-        Try to directly answer common question patterns without calling AI Proxy.
+        Try to answer the question with the registered local solvers,
+        without calling AI Proxy.
         
         Args:
             question (str): The question text
-            file_info (dict): Information extracted from the file
+            file_info (dict): Information extracted from the file; for CSV,
+                JSON, NDJSON and Parquet files, file_info['sql'] runs aggregates
+                on the file itself, without building a DataFrame
+            deadline (Deadline, optional): Stops trying solvers once local time runs out
             
         Returns:
             str or None: Direct answer if possible, None otherwise
         """
-        # Common pattern: "What is the value in the 'answer' column of the CSV file?"
-        if ("answer column" in question.lower() or "column" in question.lower() and "answer" in question.lower()) and file_info.get('type') == 'csv':
-            if file_info.get('data') is not None and 'answer' in file_info['data'].columns:
-                return str(file_info['data']['answer'].iloc[0])
+        return get_solver_registry().solve(question, file_info, deadline=deadline)
+    
+    def _build_payload(self, question, file_info=None, route=None):
+        """
+        Build the chat completion payload for a question and optional file.
         
-        # Add more direct answer patterns here for common questions
+        Args:
+            question (str): The question text
+            file_info (dict, optional): Information extracted from the file
+            route (Route, optional): Model, token limit and prompt variant to use
+        """
+        route = route or model_router.choose(question, file_info)
+        instruction = PROMPT_VARIANTS[route.prompt_variant]
+        if file_info:
+            file_context, self.last_prompt_stats = self.prompt_builder.build_file_context(file_info)
+            logger.info(
+                f"Prompt file context: {self.last_prompt_stats['prompt_tokens']} tokens "
+                f"(saved {self.last_prompt_stats['tokens_saved']} of {self.last_prompt_stats['raw_tokens']})"
+            )
+            prompt = f"Question: {question}\n\nFile Content: {file_context}\n\nAnswer the question based on the file content. {instruction}"
+        else:
+            prompt = f"Question: {question}\n\nAnswer the question directly. {instruction}"
         
-        return None
+        # Add explicit instruction to avoid markdown and provide plain text only
+        prompt += " Do not use any markdown formatting, code blocks, or backticks in your response. Provide a plain text response only."
+        
+        payload = {
+            "model": route.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ]
+        }
+        if route.max_tokens:
+            payload["max_tokens"] = route.max_tokens
+        return payload
+    
+    def _headers(self):
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.aiproxy_token}"
+        }
+    
+    def _clean_llm_answer(self, answer):
+        """
+        Ensure an LLM answer is a string, even if it appears to be a JSON object
+        or contains markdown formatting like code blocks.
+        """
+        try:
+            # Check if the answer is a JSON string that needs to be converted
+            if answer.startswith('{') or answer.startswith('['):
+                # Try to parse it to check if it's valid JSON
+                json_obj = json.loads(answer)
+                # If it parsed successfully, we'll convert it back to a string
+                return self._ensure_string_answer(json_obj)
+            # Clean up any markdown formatting or code blocks
+            return self._ensure_string_answer(answer)
+        except json.JSONDecodeError:
+            # If it's not valid JSON, still clean it up
+            return self._ensure_string_answer(answer)
+    
+    def _record_call(self, question, file_info, route, status, seconds, usage=None):
+        """
+        Record one upstream call for route health and usage accounting.
+        """
+        model_router.record(route, seconds, ok=status == 200, usage=usage)
+        file_type = file_info.get('type') if file_info else None
+        usage_accountant.record(question, file_type, route.name, status, seconds, usage)
     
-    def query_aiproxy(self, question, file_info=None):
+    def query_aiproxy(self, question, file_info=None, deadline=None):
         """
         Query AI Proxy with the question and file content.
         
         Args:
             question (str): The question text
             file_info (dict, optional): Information extracted from the file
+            deadline (Deadline, optional): Bounds the upstream call
             
         Returns:
             dict: Response with answer key as a string without markdown
@@ -175,60 +479,49 @@ class RequestHandler:
             if not self.aiproxy_token:
                 return {"answer": "Error: AI Proxy token not configured"}
             
-            # Prepare the prompt
-            if file_info:
-                prompt = f"Question: {question}\n\nFile Content: {file_info['content']}\n\nAnswer the question based on the file content. Provide ONLY the answer, without any explanations or text."
-            else:
-                prompt = f"Question: {question}\n\nAnswer the question directly. Provide ONLY the answer, without any explanations or text."
-            
-            # Add explicit instruction to avoid markdown and provide plain text only
-            prompt += " Do not use any markdown formatting, code blocks, or backticks in your response. Provide a plain text response only."
+            route = model_router.choose(question, file_info)
+            payload = self._build_payload(question, file_info, route)
             
-            # Prepare the request to AI Proxy
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.aiproxy_token}"
-            }
+            # Identical prompts get identical answers; skip the upstream call
+            cache_key = llm_answer_cache.make_key(payload)
+            cached = llm_answer_cache.get(cache_key)
+            if cached is not None:
+                return {"answer": cached}
             
-            payload = {
-                "model": "gpt-4o-mini",
-                "messages": [
-                    {"role": "system", "content": "You are a helpful assistant for the IIT Madras Online Degree in Data Science. Your task is to answer questions accurately. Provide only the exact answer as plain text without any explanations, additional text, or formatting. Do not use JSON, markdown, code blocks, or backticks in your response."},
-                    {"role": "user", "content": prompt}
-                ]
-            }
+            deadline = deadline or Deadline()
+            if deadline.expired():
+                return {"answer": "Error: Request deadline exceeded before the AI Proxy call"}
             
-            # Call AI Proxy API
-            response = requests.post(
-                "https://aiproxy.sanand.workers.dev/openai/v1/chat/completions",
-                headers=headers,
-                json=payload
-            )
-            
-            # Check if the request was successful
-            response.raise_for_status()
-            
-            # Parse the response
-            response_data = response.json()
+            start = time.perf_counter()
+            status, usage = "error", None
+            try:
+                with deadline.stage("llm", local=False):
+                    # Call AI Proxy API, with a duplicate request if this one stalls
+                    response = aiproxy_hedge.call(lambda: requests.post(
+                        self.aiproxy_url,
+                        headers=self._headers(),
+                        json=payload,
+                        timeout=deadline.timeout()
+                    ))
+                status = response.status_code
+                
+                # Check if the request was successful
+                response.raise_for_status()
+                
+                # Parse the response
+                response_data = response.json()
+                usage = response_data.get('usage')
+            finally:
+                self._record_call(question, file_info, route, status, time.perf_counter() - start, usage)
             
             # Extract the answer from the response
-            answer = response_data['choices'][0]['message']['content'].strip()
-            
-            # Ensure answer is a string, even if it appears to be a JSON object
-            # or contains markdown formatting like code blocks
-            try:
-                # Check if the answer is a JSON string that needs to be converted
-                if answer.startswith('{') or answer.startswith('['):
-                    # Try to parse it to check if it's valid JSON
-                    json_obj = json.loads(answer)
-                    # If it parsed successfully, we'll convert it back to a string
-                    answer = self._ensure_string_answer(json_obj)
-                else:
-                    # Clean up any markdown formatting or code blocks
-                    answer = self._ensure_string_answer(answer)
-            except json.JSONDecodeError:
-                # If it's not valid JSON, still clean it up
-                answer = self._ensure_string_answer(answer)
+            choice = response_data['choices'][0]
+            if choice.get('finish_reason') == 'length':
+                # A cut-off answer is an error, never cached
+                return {"answer": "Error: AI Proxy answer was cut off at the token limit"}
+            answer = choice['message']['content'].strip()
+            answer = self._clean_llm_answer(answer)
+            llm_answer_cache.set(cache_key, answer)
             
             # Return JSON-serializable dict with a single "answer" field
             # This will be converted to proper JSON by Django's JsonResponse
@@ -236,4 +529,124 @@ class RequestHandler:
         
         except Exception as e:
             return {"answer": f"Error: {str(e)}"}
-        
\ No newline at end of file
+        
+    def stream_aiproxy(self, question, file_info=None, deadline=None):
+        """
+        Stream an answer from AI Proxy, cleaning it incrementally.
+        
+        Args:
+            question (str): The question text
+            file_info (dict, optional): Information extracted from the file
+            deadline (Deadline, optional): Bounds connecting and each read
+        
+        Yields:
+            tuple: ("delta", {"delta": str}) for each cleaned chunk, then
+                ("done", {"answer": str}) with the fully cleaned answer
+        """
+        if not self.aiproxy_token:
+            yield "done", {"answer": "Error: AI Proxy token not configured"}
+            return
+        
+        route = model_router.choose(question, file_info)
+        payload = self._build_payload(question, file_info, route)
+        cache_key = llm_answer_cache.make_key(payload)
+        cached = llm_answer_cache.get(cache_key)
+        if cached is not None:
+            yield "done", {"answer": cached}
+            return
+        
+        deadline = deadline or Deadline()
+        if deadline.expired():
+            yield "done", {"answer": "Error: Request deadline exceeded before the AI Proxy call"}
+            return
+        
+        cleaner = StreamingAnswerCleaner()
+        finish_reasons = []
+        start = time.perf_counter()
+        status = "error"
+        try:
+            with requests.post(
+                self.aiproxy_url,
+                headers=self._headers(),
+                json={**payload, "stream": True},
+                stream=True,
+                timeout=deadline.timeout()
+            ) as response:
+                status = response.status_code
+                response.raise_for_status()
+                for delta in iter_sse_deltas(response, finish_reasons):
+                    text = cleaner.feed(delta)
+                    if text:
+                        yield "delta", {"delta": text}
+            
+            tail = cleaner.finish()
+            if tail:
+                yield "delta", {"delta": tail}
+        except Exception as e:
+            self._record_call(question, file_info, route, status, time.perf_counter() - start)
+            yield "done", {"answer": f"Error: {str(e)}"}
+            return
+        # Streamed responses carry no usage block, so estimate it
+        usage = {
+            "prompt_tokens": sum(estimate_tokens(m["content"]) for m in payload["messages"]),
+            "completion_tokens": estimate_tokens(cleaner.raw_text),
+        }
+        self._record_call(question, file_info, route, status, time.perf_counter() - start, usage)
+        if 'length' in finish_reasons:
+            # A cut-off answer is an error, never cached
+            yield "done", {"answer": "Error: AI Proxy answer was cut off at the token limit"}
+            return
+        
+        # The assembled answer goes through the same cleanup as query_aiproxy
+        answer = self._clean_llm_answer(cleaner.raw_text.strip())
+        llm_answer_cache.set(cache_key, answer)
+        yield "done", {"answer": answer}
+
+
+def close_after(stream, stack):
+    """
+    Yield from stream, then close stack (an ExitStack) once it is exhausted
+    or closed.
+    """
+    with stack:
+        yield from stream
+
+
+def is_partial(file_info):
+    """
+    Whether a file_info, or any member read from it, is marked 'partial'.
+    
+    Only entries that were already loaded are checked, so nothing is parsed;
+    a member that was never parsed cannot have been cut short either.
+    """
+    if file_info is None:
+        return False
+    
+    def loaded(key):
+        return not isinstance(file_info, LazyFileInfo) or file_info.loaded(key)
+    
+    if loaded('partial') and file_info.get('partial'):
+        return True
+    members = file_info.get('extracted_content') if loaded('extracted_content') else None
+    if members:
+        names = members.loaded() if hasattr(members, 'loaded') else list(members)
+        return any(is_partial(members[name]) for name in names)
+    return False
+
+def get_pipeline_stats():
+    """
+    Snapshot of pipeline metrics, including the share of file questions
+    answered by the local solvers.
+    """
+    snapshot = pipeline_metrics.snapshot()
+    counters = snapshot["counters"]
+    file_requests = counters.get("file_requests", 0)
+    snapshot["local_solver_rate"] = ratio(counters.get("answered.local_solver", 0), file_requests)
+    snapshot["solvers"] = get_solver_registry().get_stats()
+    snapshot["speculation"] = speculation_policy.stats()
+    snapshot["hedging"] = aiproxy_hedge.stats()
+    snapshot["routes"] = model_router.stats()
+    snapshot["llm_usage"] = usage_accountant.stats()
+    snapshot["response_cache"] = response_cache.stats()
+    snapshot["parse_cache"] = parse_cache.stats()
+    return snapshot
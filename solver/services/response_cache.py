@@ -0,0 +1,47 @@
+import hashlib
+import re
+
+from django.conf import settings
+
+from .answer_cache import AnswerCache
+
+
+def normalize_question(question):
+    """Question text with surrounding and repeated whitespace removed."""
+    return re.sub(r'\s+', ' ', question).strip()
+
+
+def file_digest(upload):
+    """SHA-256 of an upload, for files that came in without a streamed digest."""
+    sha256 = hashlib.sha256()
+    for chunk in upload.chunks():
+        sha256.update(chunk)
+    upload.seek(0)
+    return sha256.hexdigest()
+
+
+def make_response_key(question, uploads, digests=None):
+    """
+    Cache key for a (question, files) request.
+    
+    Args:
+        question (str): The question text
+        uploads (list): Uploaded files, in request order
+        digests (list, optional): SHA-256 of each upload, computed while it
+            streamed in; computed from the files when missing
+    
+    Returns:
+        str: The key
+    """
+    if digests is None or len(digests) != len(uploads):
+        digests = [file_digest(upload) for upload in uploads]
+    # File names are part of the key because extraction depends on the extension
+    files = [[upload.name, digest] for upload, digest in zip(uploads, digests)]
+    return AnswerCache.make_key({"question": normalize_question(question), "files": files})
+
+
+# Whole API responses, shared by every request in this worker process
+response_cache = AnswerCache(
+    limit=getattr(settings, 'RESPONSE_CACHE_SIZE', 1000),
+    ttl=getattr(settings, 'RESPONSE_CACHE_TTL', 3600),
+)
@@ -0,0 +1,196 @@
+import re
+import threading
+from collections import deque
+
+from django.conf import settings
+
+from .metrics import ratio
+
+# Questions that ask to write code, a script or a query get the code prompt; naming a tool
+# (npx, uv run, bash) is not enough, as many questions want the output of a command
+CODE_QUESTION_RE = re.compile(
+    r'\b(write|create|generate)\b(?:\W+\w+){0,6}?\W+(code|script|program|function|command|query|regex|yaml|dockerfile)\b',
+    re.IGNORECASE,
+)
+# Questions that ask for a value (an output, a URL, extracted data) are not code questions
+VALUE_QUESTION_RE = re.compile(r'\b(what (?:is|are|does|will)|how many|which)\b|\binto an? json\b', re.IGNORECASE)
+
+# Instructions appended to the prompt for each prompt variant
+PROMPT_VARIANTS = {
+    "plain": "Provide ONLY the answer, without any explanations or text.",
+    "code": "Provide ONLY the code or command that answers the question, without any explanations or text.",
+}
+
+
+class Route:
+    """
+    One way of calling the LLM: a model, a completion token limit and a prompt variant.
+    
+    max_tokens None leaves the limit to the model, so long Markdown or JSON
+    answers are not cut off.
+    """
+    def __init__(self, name, model, max_tokens, prompt_variant="plain", fallback=None):
+        self.name = name
+        self.model = model
+        self.max_tokens = max_tokens
+        self.prompt_variant = prompt_variant
+        self.fallback = fallback
+    
+    def __repr__(self):
+        return f"Route({self.name!r}, {self.model!r}, max_tokens={self.max_tokens})"
+
+
+def default_routes():
+    """
+    The lookup, file, code and long routes as configured in AIPROXY_ROUTES,
+    and the fallback route on AIPROXY_FALLBACK_MODEL. A route only falls back
+    when the fallback is another model, since moving to the same one would
+    change nothing.
+    """
+    model = getattr(settings, 'AIPROXY_MODEL', 'gpt-4o-mini')
+    fallback_model = getattr(settings, 'AIPROXY_FALLBACK_MODEL', model)
+    configured = getattr(settings, 'AIPROXY_ROUTES', {})
+    routes = []
+    for name, prompt_variant in (("lookup", "plain"), ("file", "plain"), ("code", "code"), ("long", "plain")):
+        config = configured.get(name, {})
+        route_model = config.get('model') or model
+        fallback = "fallback" if route_model != fallback_model else None
+        routes.append(Route(name, route_model, config.get('max_tokens'), prompt_variant, fallback=fallback))
+    routes.append(Route("fallback", fallback_model, None, "plain"))
+    return routes
+
+
+class RouteStats:
+    """Recent outcomes and cumulative token usage for one route."""
+    def __init__(self, window):
+        self.outcomes = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.skipped = 0
+    
+    def latency_percentile(self, percentile):
+        latencies = sorted(seconds for seconds, ok in self.outcomes if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, max(0, int(round(percentile / 100 * len(latencies))) - 1))
+        return latencies[index]
+    
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for _, ok in self.outcomes if not ok) / len(self.outcomes)
+
+
+class ModelRouter:
+    """
+    Picks a route for each LLM request from cheap request features and falls
+    back when the chosen route degrades.
+    
+    A route is degraded when, over its recent calls, the error rate is above
+    max_error_rate or the p90 latency is above max_p90. Degraded routes still
+    get every probe_every-th request so they can recover.
+    """
+    def __init__(self, routes=None, window=50, min_samples=10, max_error_rate=None, max_p90=None,
+                 probe_every=10, lookup_max_chars=400):
+        self.routes = {route.name: route for route in (routes or default_routes())}
+        self.window = window
+        self.min_samples = min_samples
+        self.max_error_rate = (
+            getattr(settings, 'AIPROXY_ROUTE_MAX_ERROR_RATE', 0.2) if max_error_rate is None else max_error_rate
+        )
+        self.max_p90 = getattr(settings, 'AIPROXY_ROUTE_MAX_P90', 20.0) if max_p90 is None else max_p90
+        self.probe_every = probe_every
+        self.lookup_max_chars = lookup_max_chars
+        self._stats = {name: RouteStats(window) for name in self.routes}
+        self._lock = threading.Lock()
+    
+    def classify(self, question, file_info=None):
+        """
+        Name of the preferred route for a request, before health checks.
+        """
+        if CODE_QUESTION_RE.search(question) and not VALUE_QUESTION_RE.search(question):
+            return "code"
+        if file_info:
+            return "file"
+        if len(question) <= self.lookup_max_chars:
+            return "lookup"
+        return "long"
+    
+    def choose(self, question, file_info=None):
+        """
+        Route for a request, following fallbacks past degraded routes.
+        
+        Returns:
+            Route: The route to use
+        """
+        route = self.routes[self.classify(question, file_info)]
+        with self._lock:
+            while route.fallback and self._is_degraded(route):
+                stats = self._stats[route.name]
+                stats.skipped += 1
+                # Probe now and then so the route is used again once it recovers
+                if stats.skipped % self.probe_every == 0:
+                    break
+                route = self.routes[route.fallback]
+        return route
+    
+    def _is_degraded(self, route):
+        stats = self._stats[route.name]
+        if len(stats.outcomes) < self.min_samples:
+            return False
+        if stats.error_rate() > self.max_error_rate:
+            return True
+        p90 = stats.latency_percentile(90)
+        return p90 is not None and p90 > self.max_p90
+    
+    def record(self, route, seconds, ok, usage=None):
+        """
+        Record the outcome of one call on a route.
+        
+        Args:
+            route (Route): The route used
+            seconds (float): Call latency
+            ok (bool): Whether the call succeeded
+            usage (dict, optional): The usage block of the response
+        """
+        with self._lock:
+            stats = self._stats[route.name]
+            stats.outcomes.append((seconds, ok))
+            stats.calls += 1
+            if not ok:
+                stats.errors += 1
+            if usage:
+                stats.prompt_tokens += usage.get('prompt_tokens', 0)
+                stats.completion_tokens += usage.get('completion_tokens', 0)
+    
+    def stats(self):
+        with self._lock:
+            result = {}
+            for name, route in self.routes.items():
+                stats = self._stats[name]
+                p50 = stats.latency_percentile(50)
+                p90 = stats.latency_percentile(90)
+                result[name] = {
+                    "model": route.model,
+                    "max_tokens": route.max_tokens,
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "recent_error_rate": round(stats.error_rate(), 4),
+                    "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                    "p90_ms": round(p90 * 1000, 1) if p90 is not None else None,
+                    "degraded": self._is_degraded(route),
+                    "prompt_tokens": stats.prompt_tokens,
+                    "completion_tokens": stats.completion_tokens,
+                    "mean_completion_tokens": ratio(stats.completion_tokens, stats.calls),
+                }
+            return result
+    
+    def reset(self):
+        with self._lock:
+            self._stats = {name: RouteStats(self.window) for name in self.routes}
+
+
+# Shared by all RequestHandler instances in this process
+model_router = ModelRouter()
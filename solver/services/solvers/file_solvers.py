@@ -0,0 +1,480 @@
+"""
+Built-in local solvers for question families that come with a file.
+"""
+
+import hashlib
+import re
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from ...utils.file_utils import detect_type
+from ..processors.csv_reader import read_columns
+from ..processors.image_reader import compress_lossless, lightness, rearrange_tiles, to_data_uri
+from ..processors.sql_engine import quote_literal
+from ..processors.sqlite_reader import find_table, quote_identifier, run_query
+from .registry import requires_all, solver_registry
+
+
+# ZIP extraction (Q8)
+@solver_registry.register('zip_answer_column', file_types=['zip', 'multi'], signature=requires_all('unzip', 'answer column'))
+def zip_answer_column(question, file_info):
+    members = file_info.get('extracted_content', {})
+    # Archive members are parsed when looked up, so only the CSV files are read
+    for name in members:
+        if detect_type(name) != 'csv':
+            continue
+        extracted = members[name]
+        if extracted.get('type') == 'csv':
+            if 'answer' in extracted.get('columns', []):
+                df = read_columns(extracted, ['answer'])
+                if df is not None and not df.empty:
+                    return str(df['answer'].iloc[0])
+    return None
+
+
+# Simple CSV question: "What is the value in the 'answer' column of the CSV file?"
+@solver_registry.register('csv_answer_column', file_types=['csv'], signature=requires_all('column', 'answer'),
+                          columns=['answer'])
+def csv_answer_column(question, file_info):
+    df = file_info.get('data')
+    if df is not None and 'answer' in df.columns:
+        return str(df['answer'].iloc[0])
+    return None
+
+
+# Markdown formatting (Q3)
+@solver_registry.register('prettier_sha256', file_types=['markdown'], signature=requires_all('prettier', 'sha256sum'))
+def prettier_sha256(question, file_info):
+    # Process markdown with prettier (simulate the output)
+    content = file_info.get('content', '')
+    # Apply basic prettier formatting rules
+    formatted = format_markdown(content)
+    # Calculate SHA256 hash
+    return hashlib.sha256(formatted.encode('utf-8')).hexdigest()
+
+
+# File comparison (Q17)
+@solver_registry.register('compare_files', file_types=['zip', 'multi'], signature=requires_all('how many lines are different'))
+def compare_files(question, file_info):
+    members = file_info.get('extracted_content', {})
+    a_content = members.get('a.txt', {}).get('content')
+    b_content = members.get('b.txt', {}).get('content')
+    
+    if a_content and b_content:
+        a_lines = a_content.splitlines()
+        b_lines = b_content.splitlines()
+        
+        # Count different lines
+        if len(a_lines) == len(b_lines):
+            diff_count = sum(1 for a, b in zip(a_lines, b_lines) if a != b)
+            return str(diff_count)
+    return None
+
+
+# File encoding processing (Q12)
+@solver_registry.register('encoding_symbol_sum', file_types=['zip', 'multi'], signature=requires_all('different encodings', 'sum'))
+def encoding_symbol_sum(question, file_info):
+    total_sum = 0
+    matched = False
+    special_symbols = ['›', 'œ', '—']
+    
+    members = file_info.get('extracted_content', {})
+    for name in members:
+        if detect_type(name) not in ['csv', 'text']:
+            continue
+        extracted = members[name]
+        if extracted.get('type') in ['csv', 'text']:
+            df = read_columns(extracted, ['symbol', 'value']) if extracted.get('type') == 'csv' else extracted.get('data')
+            if df is not None and hasattr(df, 'columns') and 'symbol' in df.columns and 'value' in df.columns:
+                # Sum values for matching symbols
+                for symbol in special_symbols:
+                    matches = df[df['symbol'] == symbol]
+                    matched = matched or not matches.empty
+                    total_sum += matches['value'].sum()
+    
+    # No symbol found: not the expected files, so leave the question to the LLM
+    if not matched:
+        return None
+    return str(int(total_sum))
+
+
+# CSS Selector (Q11)
+@solver_registry.register('css_foo_data_value', file_types=['text', 'html'], signature=requires_all('div', 'foo class', 'data-value'))
+def css_foo_data_value(question, file_info):
+    content = file_info.get('content', '')
+    soup = BeautifulSoup(content, 'html.parser')
+    # Find all divs with foo class
+    divs = soup.select('div.foo')
+    # Sum data-value attributes
+    total = sum(int(div.get('data-value', 0)) for div in divs)
+    return str(total)
+
+
+# DevTools usage (Q6)
+@solver_registry.register('hidden_input', file_types=['text', 'html'], signature=requires_all('hidden input', 'secret value'))
+def hidden_input(question, file_info):
+    content = file_info.get('content', '')
+    soup = BeautifulSoup(content, 'html.parser')
+    # Find hidden input
+    hidden = soup.find('input', {'type': 'hidden'})
+    if hidden:
+        return hidden.get('value', '')
+    return None
+
+
+# Templated SQL answer; names come from the uploaded schema and are quoted, the ticket type is a quoted literal
+TICKET_SALES_SQL = "SELECT SUM({units} * {price}) AS total_sales FROM {table} WHERE LOWER(TRIM({type})) = {ticket_type};"
+
+
+# SQL Query (Q18)
+@solver_registry.register('sql_ticket_sales', file_types=['sqlite'], signature=requires_all('sql', 'ticket type'))
+def sql_ticket_sales(question, file_info):
+    tables = file_info.get('data') or {}
+    ticket_type = re.search(r'"([^"]+)" ticket type', question, re.IGNORECASE)
+    table, columns = find_table(tables, 'type', 'units', 'price')
+    if ticket_type is None or table is None:
+        return None
+    
+    query = TICKET_SALES_SQL.format(
+        table=quote_identifier(table),
+        ticket_type=quote_literal(ticket_type.group(1).strip().lower()),
+        **{name: quote_identifier(column) for name, column in columns.items()},
+    )
+    # The question asks for the SQL; running it once checks it against the uploaded schema
+    run_query(file_info.get('path'), query, max_rows=1, deadline=file_info.get('deadline'))
+    return query
+
+
+# Aggregate functions for "the <function> of the <name> column"
+AGGREGATES = {
+    'sum': 'SUM', 'total': 'SUM', 'average': 'AVG', 'mean': 'AVG',
+    'maximum': 'MAX', 'max': 'MAX', 'minimum': 'MIN', 'min': 'MIN',
+}
+AGGREGATE_RE = re.compile(
+    r'\b(sum|total|average|mean|maximum|max|minimum|min) of (?:the |all )?["\'`]?([\w ]{1,40}?)["\'`]? column'
+)
+# Conditions the column aggregate does not handle; such questions are left to the LLM
+CONDITION_RE = re.compile(r'\b(where|only|excluding|filter|for (?:rows|records|entries))\b')
+
+
+# Whole-column aggregates on tabular files, computed by DuckDB without loading the file into pandas
+@solver_registry.register('column_aggregate', file_types=['csv', 'json', 'ndjson', 'parquet'], signature=AGGREGATE_RE.pattern)
+def column_aggregate(question, file_info):
+    sql_table = file_info.get('sql')
+    match = AGGREGATE_RE.search(question.lower())
+    if sql_table is None or match is None or CONDITION_RE.search(question.lower()):
+        return None
+    function, wanted = match.groups()
+    columns = {column.lower(): column for column, _ in sql_table.columns()}
+    column = columns.get(wanted.strip())
+    if column is None:
+        return None
+    value = sql_table.scalar(f"SELECT {AGGREGATES[function]}({quote_identifier(column)}) FROM data")
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+# The query is the answer; it is run on the uploaded posts first, so only SQL that works is returned
+SOCIAL_MEDIA_SQL = """SELECT post_id
+FROM social_media
+WHERE timestamp >= {timestamp}
+  AND EXISTS (
+    SELECT 1
+    FROM UNNEST(CAST(json_extract(CAST(comments AS JSON), '$[*].stars.useful') AS INTEGER[])) AS t(useful)
+    WHERE useful {operator} {stars}
+  )
+ORDER BY post_id;"""
+
+
+# DuckDB social media interactions (GA5 Q8)
+@solver_registry.register('duckdb_social_media', file_types=['json', 'ndjson', 'parquet', 'csv'],
+                          signature=requires_all('duckdb', 'post', 'comment', 'useful'))
+def duckdb_social_media(question, file_info):
+    sql_table = file_info.get('sql')
+    timestamp = re.search(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?Z?)', question)
+    # "more than 4 useful stars" in the task list; "with 4 useful stars" in the summary line
+    more_than = re.search(r'more than (\d+) useful stars?', question, re.IGNORECASE)
+    at_least = re.search(r'(\d+) useful stars?', question, re.IGNORECASE)
+    if sql_table is None or timestamp is None or (more_than or at_least) is None:
+        return None
+    columns = {column.lower() for column, _ in sql_table.columns()}
+    if not {'post_id', 'timestamp', 'comments'} <= columns:
+        return None
+    
+    query = SOCIAL_MEDIA_SQL.format(
+        timestamp=quote_literal(timestamp.group(1)),
+        operator='>' if more_than else '>=',
+        stars=int((more_than or at_least).group(1)),
+    )
+    sql_table.query(query, table='social_media', max_rows=1)
+    return query
+
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def log_section(question):
+    """Path prefix of the site section a log question is about, e.g. '/telugu/'."""
+    match = re.search(r'under\s+/?([\w.-]+)/', question)
+    return f"/{match.group(1)}/" if match else None
+
+
+# Apache log requests (GA5 Q3)
+@solver_registry.register('log_section_requests', file_types=['apache_log'],
+                          signature=requires_all('successful get requests', 'under'))
+def log_section_requests(question, file_info):
+    log = file_info.get('data')
+    section = log_section(question)
+    if log is None or section is None:
+        return None
+    
+    weekday = re.search(r'\b(' + '|'.join(WEEKDAYS) + r')s?\b', question, re.IGNORECASE)
+    hours = re.search(r'(\d{1,2}):\d\d until before (\d{1,2}):\d\d', question)
+    mask = log.where(
+        method='GET',
+        status_range=(200, 300),
+        path_prefix=section,
+        weekday=WEEKDAYS.index(weekday.group(1).lower()) if weekday else None,
+        hours=(int(hours.group(1)), int(hours.group(2))) if hours else None,
+    )
+    return str(int(mask.sum()))
+
+
+# Apache log downloads (GA5 Q4)
+@solver_registry.register('log_top_ip_bytes', file_types=['apache_log'], signature=requires_all('bytes', 'top ip'))
+def log_top_ip_bytes(question, file_info):
+    log = file_info.get('data')
+    section = log_section(question)
+    if log is None or section is None:
+        return None
+    
+    date = re.search(r'\b(\d{4}-\d{2}-\d{2})\b', question)
+    mask = log.where(path_prefix=section, date=date.group(1) if date else None)
+    totals = log.total_by('ip', 'bytes', mask)
+    if not totals:
+        return None
+    # Largest first
+    return str(next(iter(totals.values())))
+
+
+# PDF table extraction (GA4 Q9)
+@solver_registry.register('pdf_marks_total', file_types=['pdf'], signature=requires_all('total', 'marks', 'groups'))
+def pdf_marks_total(question, file_info):
+    df = file_info.get('data')
+    total = re.search(r'total (\w+) marks', question, re.IGNORECASE)
+    groups = re.search(r'groups?\s+(\d+)\s*(?:-|–|to)\s*(\d+)', question, re.IGNORECASE)
+    if df is None or total is None or groups is None:
+        return None
+    
+    columns = {str(column).lower(): column for column in df.columns}
+    subject = columns.get(total.group(1).lower())
+    if subject is None:
+        return None
+    mask = df['group'].between(int(groups.group(1)), int(groups.group(2)))
+    condition = re.search(r'scored (\d+) or more marks in (\w+)', question, re.IGNORECASE)
+    if condition is not None:
+        filtered = columns.get(condition.group(2).lower())
+        if filtered is None:
+            return None
+        mask &= df[filtered] >= int(condition.group(1))
+    return str(int(df.loc[mask, subject].sum()))
+
+
+# PDF to Markdown (GA4 Q10)
+@solver_registry.register('pdf_to_markdown', file_types=['pdf'], signature=requires_all('pdf to markdown'))
+def pdf_to_markdown(question, file_info):
+    return file_info.get('content') or None
+
+
+# Image lightness (GA2 Q5)
+@solver_registry.register('image_light_pixels', file_types=['image'], signature=requires_all('lightness'))
+def image_light_pixels(question, file_info):
+    pixels = file_info.get('data')
+    threshold = re.search(r'lightness\s*>\s*([\d.]+)', question)
+    if pixels is None or threshold is None:
+        return None
+    # The whole image at once instead of colorsys per pixel
+    return str(int((lightness(pixels) > float(threshold.group(1))).sum()))
+
+
+# Lossless image compression (GA2 Q2)
+@solver_registry.register('image_lossless_compression', file_types=['image'], signature=requires_all('compress', 'losslessly'))
+def image_lossless_compression(question, file_info):
+    pixels = file_info.get('data')
+    if pixels is None:
+        return None
+    encoded, image_format = compress_lossless(pixels)
+    if encoded is None:
+        return None
+    return to_data_uri(encoded, image_format)
+
+
+# Scrambled image reconstruction (GA5 Q10)
+@solver_registry.register('image_reconstruct', file_types=['image'], signature=requires_all('reconstruct', 'scrambled'))
+def image_reconstruct(question, file_info):
+    pixels = file_info.get('data')
+    # Mapping rows: original row, original column, scrambled row, scrambled column
+    moves = [tuple(map(int, row)) for row in re.findall(r'^\s*(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s*$', question, re.MULTILINE)]
+    if pixels is None or not moves:
+        return None
+    size = max(max(move) for move in moves) + 1
+    restored = rearrange_tiles(pixels, moves, (size, size))
+    encoded, image_format = compress_lossless(restored)
+    if encoded is None:
+        return None
+    return to_data_uri(encoded, image_format)
+
+
+# Spellings of the countries in the sales data, by lowercased name without trailing dots
+COUNTRY_CODES = {
+    'us': 'US', 'usa': 'US', 'u.s': 'US', 'u.s.a': 'US', 'united states': 'US', 'united states of america': 'US',
+    'uk': 'UK', 'u.k': 'UK', 'gb': 'UK', 'united kingdom': 'UK', 'great britain': 'UK',
+    'fr': 'FR', 'fra': 'FR', 'france': 'FR',
+    'de': 'DE', 'ger': 'DE', 'germany': 'DE',
+    'in': 'IN', 'ind': 'IN', 'india': 'IN',
+    'br': 'BR', 'bra': 'BR', 'brazil': 'BR',
+    'ae': 'AE', 'uae': 'AE', 'u.a.e': 'AE', 'united arab emirates': 'AE',
+}
+
+
+def find_column(df, *terms):
+    """First column whose lowercased name contains any of terms."""
+    for column in df.columns:
+        if any(term in str(column).lower() for term in terms):
+            return column
+    return None
+
+
+def clean_sales(df):
+    """
+    Standardize sales data: country codes, parsed dates, product names before
+    the slash, numeric sales and cost (missing cost is half the sales).
+    
+    Returns:
+        DataFrame or None: Columns country, date, product, sales and cost,
+            or None if the sheet does not have them
+    """
+    columns = {
+        'country': find_column(df, 'country'),
+        'date': find_column(df, 'date'),
+        'product': find_column(df, 'product'),
+        'sales': find_column(df, 'sales'),
+        'cost': find_column(df, 'cost'),
+    }
+    if any(column is None for column in columns.values()):
+        return None
+    
+    country = df[columns['country']].astype(str).str.strip()
+    key = country.str.lower().str.rstrip('.')
+    # Vectorized over the column; unknown spellings are kept, upper-cased
+    country = key.map(COUNTRY_CODES).fillna(country.str.upper())
+    
+    def amount(column):
+        text = df[column].astype(str).str.replace(r'[^\d.\-]', '', regex=True)
+        return pd.to_numeric(text, errors='coerce')
+    
+    sales = amount(columns['sales'])
+    cost = amount(columns['cost'])
+    return pd.DataFrame({
+        'country': country,
+        'date': pd.to_datetime(df[columns['date']], format='mixed', errors='coerce'),
+        'product': df[columns['product']].astype(str).str.split('/').str[0].str.strip(),
+        'sales': sales,
+        'cost': cost.fillna(sales * 0.5),
+    })
+
+
+# Excel sales margin (GA5 Q1)
+@solver_registry.register('excel_sales_margin', file_types=['excel'], signature=requires_all('total margin', 'sold in'))
+def excel_sales_margin(question, file_info):
+    df = file_info.get('data')
+    target = re.search(r'for (\S+) sold in (\S+?)\b', question)
+    # JavaScript Date.toString(), e.g. "Mon Dec 19 2022 06:38:52 GMT+0530"; the offset is ignored
+    until = re.search(r'\w{3} (\w{3} \d{1,2} \d{4} \d{2}:\d{2}:\d{2})', question)
+    if df is None or target is None or until is None:
+        return None
+    
+    sales = clean_sales(df)
+    if sales is None:
+        return None
+    product, country = target.groups()
+    mask = (
+        (sales['date'] <= pd.to_datetime(until.group(1), format='%b %d %Y %H:%M:%S'))
+        & (sales['product'].str.lower() == product.lower())
+        & (sales['country'] == COUNTRY_CODES.get(country.lower().rstrip('.'), country.upper()))
+    )
+    total_sales = sales.loc[mask, 'sales'].sum()
+    if not total_sales:
+        return None
+    margin = (total_sales - sales.loc[mask, 'cost'].sum()) / total_sales
+    return str(round(margin, 4))
+
+
+# File replacement (Q14)
+@solver_registry.register('replace_iitm_sha256', file_types=['zip', 'multi'], signature=requires_all('replace', 'iitm', 'sha256sum'))
+def replace_iitm_sha256(question, file_info):
+    # Process files and replace IITM with IIT Madras
+    return process_file_replacement(file_info)
+
+
+def format_markdown(content):
+    """Simple markdown formatter to simulate prettier"""
+    lines = content.splitlines()
+    formatted = []
+    
+    for line in lines:
+        # Heading formatting
+        if re.match(r'^#+\s+', line):
+            heading = re.match(r'^(#+)\s+(.+)', line)
+            if heading:
+                formatted.append(f"{heading.group(1)} {heading.group(2).strip()}")
+                continue
+        
+        # List item formatting
+        if re.match(r'^\s*[\*\-]\s+', line):
+            indent = len(re.match(r'^\s*', line).group(0))
+            list_match = re.match(r'^\s*([\*\-])\s+(.+)', line)
+            if list_match:
+                formatted.append(f"{' ' * indent}{list_match.group(1)} {list_match.group(2).strip()}")
+                continue
+        
+        # Blockquote formatting
+        if re.match(r'^\s*>\s*', line):
+            quote_match = re.match(r'^\s*>\s*(.+)', line)
+            if quote_match:
+                formatted.append(f"> {quote_match.group(1).strip()}")
+                continue
+        
+        # Regular text (collapse multiple spaces)
+        formatted.append(re.sub(r'\s+', ' ', line).strip())
+    
+    return '\n'.join(formatted)
+
+
+def process_file_replacement(file_info):
+    """Process files for IITM replacement and calculate hash, or None if no file mentions IITM"""
+    result = []
+    replacements = 0
+    
+    members = file_info.get('extracted_content', {})
+    for name in members:
+        if detect_type(name) not in ['text', 'markdown']:
+            continue
+        file_data = members[name]
+        if file_data.get('type') in ['text', 'markdown']:
+            content = file_data.get('content', '')
+            # Replace IITM with IIT Madras (case insensitive)
+            replaced, count = re.subn(r'(?i)IITM', 'IIT Madras', content)
+            replacements += count
+            result.append(replaced)
+    
+    if not replacements:
+        return None
+    
+    # Simulate cat * | sha256sum
+    combined = '\n'.join(result)
+    return hashlib.sha256(combined.encode('utf-8')).hexdigest()
@@ -0,0 +1,184 @@
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+
+from ..processors.csv_reader import project_columns
+
+logger = logging.getLogger(__name__)
+
+# File type key for solvers that apply to every file type
+ANY_FILE_TYPE = '*'
+
+
+class LocalSolver:
+    """
+    A deterministic solver that answers one question family without the LLM.
+    
+    Args:
+        name (str): Unique solver name, used for stats
+        func (callable): func(question, file_info) -> str or None
+        file_types (iterable): file_info['type'] values the solver handles,
+            or None for every file type
+        signature (str): Regex matched against the lowercased question
+        columns (iterable, optional): The only CSV columns the solver reads;
+            its file_info['data'] then holds just these columns
+    """
+    def __init__(self, name, func, file_types, signature, columns=None):
+        self.name = name
+        self.func = func
+        self.file_types = tuple(file_types) if file_types else (ANY_FILE_TYPE,)
+        self.signature = re.compile(signature, re.DOTALL)
+        self.columns = tuple(columns) if columns else None
+    
+    def matches(self, question_lower):
+        return self.signature.search(question_lower) is not None
+    
+    def __repr__(self):
+        return f"LocalSolver({self.name!r}, file_types={self.file_types})"
+
+
+def requires_all(*terms):
+    """Build a signature that matches only when every term appears in the question."""
+    # Anchored, so a miss is given up after one pass instead of retrying at every position
+    return r"\A" + ''.join(f"(?=.*{re.escape(term)})" for term in terms)
+
+
+class SolverRegistry:
+    """
+    Registry of local solvers with a file-type index built once on first use.
+    """
+    def __init__(self):
+        self._solvers = []
+        self._index = None
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"attempts": 0, "hits": 0, "errors": 0, "total_ms": 0.0})
+    
+    def register(self, name, file_types=None, signature='', columns=None):
+        """
+        Decorator registering func(question, file_info) as a local solver.
+        
+        Solvers are tried in registration order.
+        """
+        def decorator(func):
+            self.add(LocalSolver(name, func, file_types, signature, columns))
+            return func
+        return decorator
+    
+    def add(self, solver):
+        with self._lock:
+            if any(existing.name == solver.name for existing in self._solvers):
+                raise ValueError(f"Solver already registered: {solver.name}")
+            self._solvers.append(solver)
+            self._index = None
+    
+    def _get_index(self):
+        index = self._index
+        if index is None:
+            with self._lock:
+                index = defaultdict(list)
+                for solver in self._solvers:
+                    for file_type in solver.file_types:
+                        index[file_type].append(solver)
+                wildcard = index.get(ANY_FILE_TYPE, [])
+                # Keep registration order when merging wildcard solvers into each type
+                order = {solver.name: position for position, solver in enumerate(self._solvers)}
+                index = {
+                    file_type: sorted(set(solvers + wildcard), key=lambda s: order[s.name])
+                    for file_type, solvers in index.items()
+                }
+                self._index = index
+        return index
+    
+    def candidates(self, file_type):
+        """Solvers registered for a file type (including wildcard solvers)."""
+        index = self._get_index()
+        return index.get(file_type) or index.get(ANY_FILE_TYPE, [])
+    
+    def solve(self, question, file_info, only=None, deadline=None):
+        """
+        Answer a question with the first matching local solver.
+        
+        For a multi-file upload, solvers registered for 'multi' see the combined
+        file_info first; then each uploaded file is tried on its own.
+        
+        Args:
+            question (str): The question text
+            file_info (dict): Information extracted from the file
+            only (set, optional): Restrict dispatch to these solver names
+            deadline (Deadline, optional): No further solvers are tried once
+                local time runs out
+        
+        Returns:
+            str or None: The answer, or None if no solver could answer
+        """
+        question_lower = question.lower()
+        for solver in self.candidates(file_info.get('type')):
+            if only is not None and solver.name not in only:
+                continue
+            if not solver.matches(question_lower):
+                continue
+            if deadline is not None and deadline.local_expired():
+                logger.warning(f"Out of time before local solver {solver.name}")
+                return None
+            
+            start = time.perf_counter()
+            error = False
+            try:
+                # Solvers that declare their columns never parse the rest of a CSV
+                solver_info = project_columns(file_info, solver.columns) if solver.columns else file_info
+                answer = solver.func(question, solver_info)
+            except Exception as e:
+                logger.warning(f"Local solver {solver.name} failed: {str(e)}")
+                answer = None
+                error = True
+            self._record(solver.name, time.perf_counter() - start, answer is not None, error)
+            
+            if answer is not None:
+                logger.info(f"Answered locally by solver {solver.name}")
+                return answer
+        
+        if file_info.get('type') == 'multi':
+            for member in file_info.get('extracted_content', {}).values():
+                answer = self.solve(question, member, only, deadline)
+                if answer is not None:
+                    return answer
+        return None
+    
+    def _record(self, name, elapsed, hit, error):
+        with self._lock:
+            stats = self._stats[name]
+            stats["attempts"] += 1
+            stats["hits"] += int(hit)
+            stats["errors"] += int(error)
+            stats["total_ms"] += elapsed * 1000
+    
+    def get_stats(self):
+        """Per-solver attempt, hit and error counts with mean timing."""
+        with self._lock:
+            return {
+                name: {
+                    **stats,
+                    "total_ms": round(stats["total_ms"], 3),
+                    "mean_ms": round(stats["total_ms"] / stats["attempts"], 3) if stats["attempts"] else 0.0,
+                }
+                for name, stats in self._stats.items()
+            }
+    
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+    
+    def __iter__(self):
+        return iter(list(self._solvers))
+
+
+# Shared registry; solvers register themselves when their module is imported
+solver_registry = SolverRegistry()
+
+
+def get_solver_registry():
+    """Return the shared registry with the built-in solvers loaded."""
+    from . import file_solvers  # noqa: F401  (registers the built-in solvers)
+    return solver_registry
@@ -0,0 +1,98 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .solvers.registry import get_solver_registry
+
+_executor = None
+_match_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Shared pool for work that runs alongside the request thread."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'SPECULATIVE_LLM_WORKERS', 8),
+                thread_name_prefix='speculative',
+            )
+        return _executor
+
+
+def get_match_executor():
+    """Pool for repository matching, apart from the speculative LLM calls."""
+    global _match_executor
+    with _executor_lock:
+        if _match_executor is None:
+            _match_executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'REPOSITORY_MATCH_WORKERS', 4),
+                thread_name_prefix='match',
+            )
+        return _match_executor
+
+
+class SpeculationPolicy:
+    """
+    Decides when to start the LLM call before the local stages have finished.
+    
+    A speculative call is wasted when the repository or a local solver answers
+    first. Speculation is skipped when a local solver signature already matches
+    the question, and paused (with an occasional probe) while the recent waste
+    rate is above max_waste_rate.
+    """
+    def __init__(self, enabled=None, max_waste_rate=None, window=50, probe_every=10):
+        self.enabled = getattr(settings, 'SPECULATIVE_LLM', False) if enabled is None else enabled
+        self.max_waste_rate = (
+            getattr(settings, 'SPECULATIVE_LLM_MAX_WASTE_RATE', 0.3) if max_waste_rate is None else max_waste_rate
+        )
+        self.probe_every = probe_every
+        self._outcomes = deque(maxlen=window)
+        self._skipped = 0
+        self._lock = threading.Lock()
+    
+    def should_speculate(self, question, file_info=None):
+        if not self.enabled:
+            return False
+        
+        if file_info is not None:
+            # The local solver stage will very likely answer this one
+            question_lower = question.lower()
+            for solver in get_solver_registry().candidates(file_info.get('type')):
+                if solver.matches(question_lower):
+                    return False
+        
+        with self._lock:
+            enough_samples = len(self._outcomes) >= self._outcomes.maxlen // 2
+            if enough_samples and self._waste_rate() > self.max_waste_rate:
+                self._skipped += 1
+                # Probe now and then so the policy notices when the mix changes
+                return self._skipped % self.probe_every == 0
+        return True
+    
+    def record(self, wasted):
+        with self._lock:
+            self._outcomes.append(bool(wasted))
+    
+    def reset(self):
+        with self._lock:
+            self._outcomes.clear()
+            self._skipped = 0
+    
+    def _waste_rate(self):
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+    
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "recent_calls": len(self._outcomes),
+                "recent_waste_rate": round(self._waste_rate(), 4),
+            }
+
+
+# Shared by all RequestHandler instances in this process
+speculation_policy = SpeculationPolicy()
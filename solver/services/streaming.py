@@ -0,0 +1,132 @@
+import json
+import re
+
+
+class StreamingAnswerCleaner:
+    """
+    Incremental counterpart of RequestHandler._ensure_string_answer.
+    
+    Deltas from the upstream are cleaned as they arrive: an opening code fence
+    is dropped, inline backticks are removed, and anything that might still turn
+    into a closing fence or an unmatched backtick is held back until more text
+    (or the end of the stream) arrives.
+    """
+    def __init__(self):
+        self._buffer = ""
+        self._raw = []
+        self._started = False
+        self._fenced = False
+    
+    @property
+    def raw_text(self):
+        """The full, uncleaned text received so far."""
+        return "".join(self._raw)
+    
+    def feed(self, delta):
+        """
+        Add an upstream delta and return the cleaned text that is safe to emit.
+        
+        Args:
+            delta (str): Text received from the upstream
+        
+        Returns:
+            str: Cleaned text (possibly empty)
+        """
+        if not delta:
+            return ""
+        self._raw.append(delta)
+        self._buffer += delta
+        
+        if not self._started:
+            stripped = self._buffer.lstrip()
+            # Wait until we know whether the answer opens with a code fence
+            if len(stripped) < 3 and "\n" not in stripped:
+                return ""
+            if stripped.startswith("```"):
+                if "\n" not in stripped:
+                    return ""
+                # Drop the opening fence line and its language identifier
+                self._fenced = True
+                stripped = stripped.split("\n", 1)[1]
+            self._buffer = stripped
+            self._started = True
+        
+        return self._drain()
+    
+    def finish(self):
+        """
+        Flush whatever is still held back once the upstream is done.
+        
+        Returns:
+            str: Remaining cleaned text
+        """
+        text = self._buffer
+        self._buffer = ""
+        if not self._started:
+            text = text.lstrip()
+        if self._fenced and text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+        return self._strip_inline(text).rstrip()
+    
+    def _drain(self):
+        text = self._buffer
+        head, sep, tail = text.rpartition("\n")
+        # The last line may still become a closing fence; keep it with its newline
+        if sep and (not tail.strip() or tail.lstrip().startswith("`")):
+            emit, held = head, sep + tail
+        elif not sep and tail.lstrip().startswith("`"):
+            emit, held = "", tail
+        else:
+            emit, held = text, ""
+        
+        # Trailing whitespace might be stripped from the final answer
+        trimmed = emit.rstrip()
+        held = emit[len(trimmed):] + held
+        emit = trimmed
+        
+        # Never split a pair of inline backticks across two emissions
+        if emit.count("`") % 2:
+            cut = emit.rfind("`")
+            emit, held = emit[:cut], emit[cut:] + held
+        
+        self._buffer = held
+        return self._strip_inline(emit)
+    
+    @staticmethod
+    def _strip_inline(text):
+        return re.sub(r'`([^`]+)`', r'\1', text)
+
+
+def iter_sse_deltas(response, finish_reasons=None):
+    """
+    Yield content deltas from an OpenAI-compatible streaming response.
+    
+    Args:
+        response (requests.Response): Response opened with stream=True
+        finish_reasons (list, optional): Receives the finish_reason of each
+            choice that reports one
+    
+    Yields:
+        str: Content delta for each upstream chunk
+    """
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        try:
+            chunk = json.loads(data)
+        except json.JSONDecodeError:
+            continue
+        for choice in chunk.get("choices", []):
+            content = (choice.get("delta") or {}).get("content")
+            if content:
+                yield content
+            if finish_reasons is not None and choice.get("finish_reason"):
+                finish_reasons.append(choice["finish_reason"])
+
+
+def format_sse(event, data):
+    """Format a single Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,172 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Parts of a question that change between students but not between templates
+_TEMPLATE_PATTERNS = [
+    (re.compile(r'https?://\S+'), '<url>'),
+    (re.compile(r'[\w.+-]+@[\w-]+(\.[\w-]+)+'), '<email>'),
+    (re.compile(r'\b[0-9a-f]{16,}\b', re.IGNORECASE), '<hex>'),
+    (re.compile(r'"[^"]*"'), '<str>'),
+    (re.compile(r'\d+(\.\d+)?'), '<num>'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalize_template(question):
+    """Question text with student-specific values replaced by placeholders."""
+    text = question.strip().lower()
+    for pattern, placeholder in _TEMPLATE_PATTERNS:
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+def template_hash(question):
+    return hashlib.sha256(normalize_template(question).encode('utf-8')).hexdigest()[:16]
+
+
+class UsageAccountant:
+    """
+    Aggregates AI Proxy call usage in memory and appends it to a JSONL store.
+    
+    Calls are grouped by question template, file type and route. Each flush
+    appends one line per group with the totals since the previous flush, so
+    several worker processes can share the same store; the llm_usage_report
+    command adds the lines up.
+    """
+    def __init__(self, path=None, flush_interval=None, flush_every=100):
+        self.path = path or getattr(settings, 'LLM_USAGE_PATH', None)
+        self.flush_interval = (
+            getattr(settings, 'LLM_USAGE_FLUSH_INTERVAL', 60) if flush_interval is None else flush_interval
+        )
+        self.flush_every = flush_every
+        self._groups = {}
+        self._pending_calls = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._totals = {"calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    
+    def record(self, question, file_type, route, status, seconds, usage=None):
+        """
+        Record one upstream call.
+        
+        Args:
+            question (str): The question text
+            file_type (str or None): Type of the uploaded file, if any
+            route (str): Name of the route used
+            status (int or str): HTTP status, or "error" when no response arrived
+            seconds (float): Call latency
+            usage (dict, optional): The usage block of the response
+        """
+        usage = usage or {}
+        prompt_tokens = usage.get('prompt_tokens', 0)
+        completion_tokens = usage.get('completion_tokens', 0)
+        ok = status == 200
+        key = (template_hash(question), file_type or 'none', route)
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = {
+                    "template": normalize_template(question)[:200],
+                    "calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                    "total_ms": 0.0, "max_ms": 0.0, "statuses": {},
+                }
+            group["calls"] += 1
+            group["errors"] += 0 if ok else 1
+            group["prompt_tokens"] += prompt_tokens
+            group["completion_tokens"] += completion_tokens
+            group["total_ms"] += seconds * 1000
+            group["max_ms"] = max(group["max_ms"], seconds * 1000)
+            group["statuses"][str(status)] = group["statuses"].get(str(status), 0) + 1
+            
+            self._totals["calls"] += 1
+            self._totals["errors"] += 0 if ok else 1
+            self._totals["prompt_tokens"] += prompt_tokens
+            self._totals["completion_tokens"] += completion_tokens
+            self._pending_calls += 1
+            due = (self._pending_calls >= self.flush_every
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+    
+    def flush(self):
+        """Append the groups recorded since the last flush to the store."""
+        with self._lock:
+            groups, self._groups = self._groups, {}
+            self._pending_calls = 0
+            self._last_flush = time.monotonic()
+        if not groups or not self.path:
+            return 0
+        
+        flushed_at = time.time()
+        lines = []
+        for (digest, file_type, route), group in groups.items():
+            lines.append(json.dumps({
+                "flushed_at": flushed_at,
+                "template_hash": digest,
+                "file_type": file_type,
+                "route": route,
+                **group,
+                "total_ms": round(group["total_ms"], 3),
+                "max_ms": round(group["max_ms"], 3),
+            }) + "\n")
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # One write per flush keeps lines from different workers intact
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(lines))
+        except OSError as e:
+            logger.error(f"Could not write LLM usage to {self.path}: {str(e)}")
+            return 0
+        return len(lines)
+    
+    def stats(self):
+        with self._lock:
+            return {**self._totals, "unflushed_groups": len(self._groups)}
+    
+    def reset(self):
+        with self._lock:
+            self._groups = {}
+            self._pending_calls = 0
+            self._totals = {"calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+
+def read_usage(path):
+    """
+    Add up the flushed groups in a usage store.
+    
+    Returns:
+        dict: (template_hash, file_type, route) -> totals
+    """
+    groups = {}
+    if not os.path.exists(path):
+        return groups
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            key = (entry["template_hash"], entry["file_type"], entry["route"])
+            group = groups.setdefault(key, {
+                "template": entry["template"],
+                "calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "total_ms": 0.0, "max_ms": 0.0,
+            })
+            for field in ("calls", "errors", "prompt_tokens", "completion_tokens", "total_ms"):
+                group[field] += entry[field]
+            group["max_ms"] = max(group["max_ms"], entry["max_ms"])
+    return groups
+
+
+# Shared by all RequestHandler instances in this process
+usage_accountant = UsageAccountant()
+atexit.register(usage_accountant.flush)
@@ -0,0 +1,67 @@
+import io
+import os
+import tempfile
+import zipfile
+
+import django
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+# The offline unit tests import services that read Django settings
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+# Keep usage records from test runs out of the real store
+os.environ.setdefault('LLM_USAGE_PATH', os.path.join(tempfile.gettempdir(), 'test_llm_usage.jsonl'))
+# and parsed uploads out of the real parse cache
+os.environ.setdefault('PARSE_CACHE_DIR', tempfile.mkdtemp(prefix='test-parse-cache-'))
+django.setup()
+
+
+@pytest.fixture
+def make_zip():
+    """
+    Factory for an in-memory zip upload.
+    
+    Returns:
+        callable: make_zip(members, name="data.zip") with members mapping each
+            member name to its str or bytes content
+    """
+    def make(members, name="data.zip"):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            for member, content in members.items():
+                zf.writestr(member, content)
+        return SimpleUploadedFile(name, buffer.getvalue())
+    return make
+
+
+@pytest.fixture
+def no_template_match(monkeypatch):
+    """No question matches a stored template, so every request goes through the pipeline."""
+    from solver.services.request_handler import QuestionMatcher
+    
+    monkeypatch.setattr(QuestionMatcher, "match_question", lambda self, question: (False, None))
+
+
+@pytest.fixture
+def make_handler(monkeypatch, no_template_match):
+    """
+    Factory for a RequestHandler that never calls the AI Proxy.
+    
+    Returns:
+        callable: make_handler(llm=None); llm replaces query_aiproxy, and by
+            default it answers "llm" and appends (file_info, deadline) to
+            the handler's llm_calls
+    """
+    from solver.services.request_handler import RequestHandler
+    
+    def make(llm=None):
+        handler = RequestHandler()
+        handler.llm_calls = []
+        
+        def fake_llm(question, file_info=None, deadline=None):
+            handler.llm_calls.append((file_info, deadline))
+            return {"answer": "llm"}
+        
+        monkeypatch.setattr(handler, "query_aiproxy", llm or fake_llm)
+        return handler
+    return make
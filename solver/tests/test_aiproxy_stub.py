@@ -0,0 +1,54 @@
+"""
+Offline tests for the local AI Proxy stand-in and load-test helpers.
+"""
+
+from solver.perf.aiproxy_stub import LatencyModel, StubServer
+from solver.perf.load_test import latency_summary, percentile
+from solver.services.answer_cache import llm_answer_cache
+from solver.services.request_handler import RequestHandler
+
+
+def stub_handler(url):
+    handler = RequestHandler()
+    handler.aiproxy_token = "test-token"
+    handler.aiproxy_url = url
+    return handler
+
+
+def test_query_and_stream_against_stub():
+    llm_answer_cache.clear()
+    server = StubServer(answer="forty two", latency=LatencyModel("fixed:0.01")).start()
+    try:
+        handler = stub_handler(server.url)
+        assert handler.query_aiproxy("What is six times seven?") == {"answer": "forty two"}
+        events = list(handler.stream_aiproxy("What is six times nine?"))
+        assert events[-1] == ("done", {"answer": "forty two"})
+        assert server.stats["requests"] == 2
+    finally:
+        server.stop()
+
+
+def test_stub_injects_errors():
+    llm_answer_cache.clear()
+    server = StubServer(error_rate=1.0).start()
+    try:
+        answer = stub_handler(server.url).query_aiproxy("Anything")["answer"]
+        assert answer.startswith("Error:")
+        assert server.stats["errors"] == 1
+    finally:
+        server.stop()
+
+
+def test_latency_model_is_seeded():
+    first = [LatencyModel("lognormal:0.5,0.4", seed=3).sample() for _ in range(3)]
+    second = [LatencyModel("lognormal:0.5,0.4", seed=3).sample() for _ in range(3)]
+    assert first == second
+    slow = LatencyModel("fixed:0.1", slow_rate=1.0, slow_latency=2.0)
+    assert slow.sample() == 2.1
+
+
+def test_percentiles():
+    values = [i / 100 for i in range(1, 101)]
+    assert percentile(values, 50) == 0.5
+    assert percentile(values, 99) == 0.99
+    assert latency_summary(values)["p90_ms"] == 900.0
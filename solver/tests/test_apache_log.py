@@ -0,0 +1,71 @@
+"""
+Offline tests for the gzip Apache log engine and its solvers.
+"""
+
+import gzip
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from solver.services.processors import apache_log
+from solver.services.processors.apache_log import ApacheLog
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.solvers.registry import get_solver_registry
+
+LINES = [
+    # 2024-05-05 was a Sunday
+    '10.0.0.1 - - [05/May/2024:12:00:00 -0500] "GET /telugu/a.mp3 HTTP/1.1" 200 100 "-" "Mozilla/5.0" s-anand.net 1.1.1.1',
+    '10.0.0.2 - - [05/May/2024:20:59:59 -0500] "GET /telugu/b.mp3 HTTP/1.1" 206 200 "-" "agent \\"quoted\\"" s-anand.net 1.1.1.1',
+    '10.0.0.1 - - [05/May/2024:21:00:00 -0500] "GET /telugu/a.mp3 HTTP/1.1" 200 100 "-" "-"',
+    '10.0.0.1 - - [05/May/2024:13:00:00 -0500] "POST /telugu/a.mp3 HTTP/1.1" 200 100 "-" "-"',
+    '10.0.0.1 - - [05/May/2024:13:00:00 -0500] "GET /telugu/a.mp3 HTTP/1.1" 404 - "-" "-"',
+    '10.0.0.1 - - [05/May/2024:13:00:00 -0500] "GET /telugupics/a.jpg HTTP/1.1" 200 100 "-" "-"',
+    '10.0.0.1 - - [04/May/2024:13:00:00 -0500] "GET /telugu/a.mp3 HTTP/1.1" 200 100 "-" "-"',
+    '10.0.0.3 - - [04/May/2024:01:00:00 -0500] "GET /kannada/x.mp3 HTTP/1.1" 200 5000 "-" "-"',
+    '10.0.0.4 - - [04/May/2024:02:00:00 -0500] "GET /kannada/y.mp3 HTTP/1.1" 200 3000 "-" "-"',
+    '10.0.0.4 - - [04/May/2024:23:00:00 -0500] "GET /kannada/z.mp3 HTTP/1.1" 200 3000 "-" "-"',
+    '10.0.0.3 - - [03/May/2024:23:00:00 -0500] "GET /kannada/x.mp3 HTTP/1.1" 200 9000 "-" "-"',
+    'not a log line',
+]
+
+
+def make_log():
+    return gzip.compress(("\n".join(LINES) + "\n").encode("utf-8"))
+
+
+def test_parse_into_columns(monkeypatch):
+    # Several chunks, so the vocabularies are shared across them
+    monkeypatch.setattr(apache_log, "CHUNK_LINES", 1)
+    log = ApacheLog.parse(make_log())
+    assert len(log) == len(LINES) - 1
+    assert log.skipped == 1
+    assert str(log.timestamp[0]) == "2024-05-05T12:00:00"
+    assert log.methods.values[log.method[3]] == "POST"
+    assert log.paths.values[log.path[1]] == "/telugu/b.mp3"
+    assert list(log.bytes[:5]) == [100, 200, 100, 100, 0]
+    
+    mask = log.where(method="GET", status_range=(200, 300), path_prefix="/telugu/", weekday=6, hours=(12, 21))
+    assert int(mask.sum()) == 2
+    totals = log.total_by("ip", "bytes", log.where(path_prefix="/kannada/", date="2024-05-04"))
+    assert totals == {"10.0.0.4": 6000, "10.0.0.3": 5000}
+
+
+def test_log_questions_are_answered_locally():
+    info = FileProcessor().extract_file_info(SimpleUploadedFile("s-anand.net-May-2024.gz", make_log()))
+    assert info["type"] == "apache_log"
+    assert not info.loaded("data")
+    assert "telugu/a.mp3" in info["content"]
+    
+    registry = get_solver_registry()
+    question = ("What is the number of successful GET requests for pages under /telugu/ "
+                "from 12:00 until before 21:00 on Sundays?")
+    assert registry.solve(question, info) == "2"
+    question = ("Across all requests under kannada/ on 2024-05-04, how many bytes did the "
+                "top IP address (by volume of downloads) download?")
+    assert registry.solve(question, info) == "6000"
+
+
+def test_other_gzip_files_are_unpacked():
+    info = FileProcessor().extract_file_info(SimpleUploadedFile("data.csv.gz", gzip.compress(b"a,answer\n1,x\n")))
+    assert info["name"] == "data.csv"
+    assert info["type"] == "csv"
+    assert info["data"]["answer"].iloc[0] == "x"
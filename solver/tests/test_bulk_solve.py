@@ -0,0 +1,64 @@
+"""
+Offline tests for the bulk_solve management command.
+"""
+
+import io
+import json
+
+from django.core.management import call_command
+
+from solver.management.commands import bulk_solve
+from solver.services import request_handler
+from solver.services.usage import usage_accountant
+
+
+def write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+
+def fake_pipeline(monkeypatch, answers):
+    def process_request(self, question, file=None, deadline=None):
+        answer = answers[question]
+        if not answer.startswith("Error"):
+            usage_accountant.record(question, None, "lookup", 200, 0.01, {"prompt_tokens": 30, "completion_tokens": 2})
+        return {"answer": answer}
+    
+    monkeypatch.setattr(request_handler.RequestHandler, "process_request", process_request)
+
+
+def test_checkpoint_resumes_and_retries_errors(tmp_path, monkeypatch):
+    questions = tmp_path / "ga.jsonl"
+    write_jsonl(questions, [{"id": "q1", "question": "One?"}, {"id": "q2", "question": "Two?"}])
+    fake_pipeline(monkeypatch, {"One?": "1", "Two?": "Error: upstream failed"})
+    
+    out = io.StringIO()
+    call_command("bulk_solve", str(questions), "--target", "none", "--workers", "2", stdout=out, stderr=io.StringIO())
+    checkpoint = tmp_path / "ga.jsonl.checkpoint.jsonl"
+    assert [json.loads(line)["id"] for line in checkpoint.read_text().splitlines()] == ["q1"]
+    assert "prompt tokens: 30, completion tokens: 2, total tokens: 32" in out.getvalue()
+    
+    # The rerun skips the solved question and retries the failed one
+    fake_pipeline(monkeypatch, {"Two?": "2"})
+    out = io.StringIO()
+    call_command("bulk_solve", str(questions), "--target", "none", stdout=out)
+    assert "1 already solved, 1 to solve" in out.getvalue()
+    assert [json.loads(line)["answer"] for line in checkpoint.read_text().splitlines()] == ["1", "2"]
+
+
+def test_repository_target_updates_and_adds_questions(tmp_path, monkeypatch):
+    repository = tmp_path / "questions.json"
+    repository.write_text(json.dumps([
+        {"assignment_number": 1, "question_number": 2, "question_text": "Old?", "answer_text": "old", "keywords": []},
+    ]))
+    monkeypatch.setattr(bulk_solve, "QUESTIONS_JSON_PATH", str(repository))
+    questions = tmp_path / "ga.jsonl"
+    write_jsonl(questions, [
+        {"question": "Old?", "assignment_number": 1, "question_number": 2},
+        {"question": "New?", "assignment_number": 1, "question_number": 1},
+        {"question": "Unnumbered?"},
+    ])
+    fake_pipeline(monkeypatch, {"Old?": "new", "New?": "added", "Unnumbered?": "x"})
+    
+    call_command("bulk_solve", str(questions), "--target", "repository", stdout=io.StringIO())
+    stored = json.loads(repository.read_text())
+    assert [(q["question_number"], q["answer_text"]) for q in stored] == [(1, "added"), (2, "new")]
@@ -0,0 +1,55 @@
+"""
+Offline tests for chunked, column-projected CSV reads.
+"""
+
+import io
+
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from solver.services.processors.csv_reader import CsvSource, read_columns
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.solvers.registry import SolverRegistry, requires_all
+
+
+def make_csv(rows):
+    return ("id,category,value,answer\n" + "".join(
+        f"{i},cat-{i % 3},{i * 0.5},ans-{i}\n" for i in range(rows)
+    )).encode("utf-8")
+
+
+def test_chunked_read_matches_a_single_read():
+    raw = make_csv(1000)
+    chunked = CsvSource(raw, chunk_bytes=0, chunk_rows=64, sample_rows=100).read()
+    pd.testing.assert_frame_equal(chunked, pd.read_csv(io.BytesIO(raw)))
+    
+    projected = CsvSource(raw, chunk_bytes=0, chunk_rows=64).read(usecols=["answer", "missing"])
+    assert list(projected.columns) == ["answer"]
+    assert len(projected) == 1000
+
+
+def test_chunked_read_falls_back_when_the_sample_dtypes_do_not_fit():
+    raw = b"id,value\n" + b"".join(f"{i},{i}\n".encode() for i in range(50)) + b"50,\n"
+    df = CsvSource(raw, chunk_bytes=0, chunk_rows=10, sample_rows=20).read()
+    # The sample says int64, but the last row has no value
+    assert df["value"].dtype == "float64"
+    assert df["value"].isna().sum() == 1
+
+
+def test_solvers_that_declare_columns_only_read_those():
+    registry = SolverRegistry()
+    seen = []
+    
+    @registry.register("answer_only", file_types=["csv"], signature=requires_all("answer"), columns=["answer"])
+    def answer_only(question, file_info):
+        seen.append(list(file_info["data"].columns))
+        return str(file_info["data"]["answer"].iloc[0])
+    
+    info = FileProcessor().extract_file_info(SimpleUploadedFile("data.csv", make_csv(10)))
+    assert registry.solve("What is in the answer column?", info) == "ans-0"
+    assert seen == [["answer"]]
+    assert not info.loaded("data")
+    
+    # Once the whole file is loaded, projections reuse it
+    assert info["data"].shape == (10, 4)
+    assert list(read_columns(info, ["id"]).columns) == ["id"]
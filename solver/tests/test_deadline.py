@@ -0,0 +1,55 @@
+"""
+Offline tests for per-request deadline propagation.
+"""
+
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from solver.services.deadline import Deadline
+from solver.services.metrics import pipeline_metrics
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.prompt_builder import PromptBuilder
+
+
+def test_deadline_budgets():
+    unlimited = Deadline()
+    assert not unlimited.expired()
+    assert unlimited.timeout() is None
+    
+    deadline = Deadline(0.05, llm_reserve=0.04)
+    time.sleep(0.02)
+    assert deadline.local_expired()
+    assert not deadline.expired()
+    assert deadline.timeout(minimum=1.0) == 1.0
+
+
+def test_zip_extraction_stops_at_local_deadline(make_zip):
+    archive = make_zip({"a.txt": "hello", "b.txt": "hello", "c.txt": "hello"})
+    
+    # No local time left: members looked up are not parsed, and the summary says so
+    deadline = Deadline(60, llm_reserve=60)
+    file_info = FileProcessor().extract_file_info(archive, deadline=deadline)
+    members = file_info["extracted_content"]
+    assert all(member["error"] == "not read before the deadline" for member in members.values())
+    assert file_info["partial"] == "3 of 3 files not read before the deadline"
+    
+    context, _ = PromptBuilder().build_file_context(file_info)
+    assert "Partial content: 3 of 3 files" in context
+
+
+def test_out_of_time_request_skips_local_work_and_still_asks_llm(make_handler):
+    pipeline_metrics.reset()
+    handler = make_handler()
+    
+    html = '<div class="foo" data-value="4"></div>'
+    upload = SimpleUploadedFile("page.html", html.encode("utf-8"))
+    question = "Find all <div>s having a foo class. What's the sum of their data-value attributes?"
+    deadline = Deadline(60, llm_reserve=60)
+    assert handler.process_request(question, upload, deadline) == {"answer": "llm"}
+    
+    # There was no time to read the upload, so the LLM got the question only
+    assert handler.llm_calls == [(None, deadline)]
+    counters = pipeline_metrics.snapshot()["counters"]
+    assert counters["deadline.over_budget.match"] == 1
+    assert [name for name, _, _ in deadline.stages] == ["match"]
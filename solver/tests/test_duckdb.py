@@ -0,0 +1,106 @@
+"""
+Offline tests for SQL over uploaded CSV, JSON, NDJSON and Parquet files with DuckDB.
+"""
+
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+
+from solver.services.processors.file_processor import FileProcessor, SpillDirectory
+from solver.services.processors.sql_engine import QueryTimeout, SqlTable
+from solver.services.solvers.registry import get_solver_registry
+
+duckdb = pytest.importorskip("duckdb")
+
+POSTS = [
+    {"post_id": 3, "timestamp": "2025-02-01T00:00:00.000Z", "comments": [{"text": "a", "stars": {"useful": 5}}]},
+    {"post_id": 1, "timestamp": "2025-02-03T00:00:00.000Z",
+     "comments": [{"text": "b", "stars": {"useful": 4}}, {"text": "c", "stars": {"useful": 2}}]},
+    {"post_id": 2, "timestamp": "2024-01-01T00:00:00.000Z", "comments": [{"text": "d", "stars": {"useful": 5}}]},
+    {"post_id": 4, "timestamp": "2025-02-05T00:00:00.000Z", "comments": []},
+]
+
+
+def test_csv_is_queried_in_place_and_isolated(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text("city,units\nDelhi,3\nPune,4\nDelhi,5\n")
+    table = SqlTable(str(path), 'csv')
+    assert table.columns()[0] == ('city', 'VARCHAR')
+    assert table.scalar("SELECT SUM(units) FROM data WHERE city = ?", ["Delhi"]) == 8
+    result = table.query("SELECT city FROM data", max_rows=2)
+    assert len(result["rows"]) == 2 and result["truncated"]
+    
+    # No other file can be read from the connection
+    with pytest.raises(duckdb.Error):
+        table.query("SELECT * FROM read_csv('/etc/hostname')")
+    with pytest.raises(QueryTimeout):
+        table.query("SELECT COUNT(*) FROM range(100000000000) a, data", timeout=0.2)
+
+
+def test_uploads_get_a_sql_table_and_spill_only_when_queried(tmp_path):
+    records = b'{"units": 2}\n{"units": 5.5}\n'
+    with SpillDirectory() as spill_dir:
+        info = FileProcessor().extract_file_info(SimpleUploadedFile("rows.ndjson", records), spill_dir=spill_dir)
+        assert info['type'] == 'ndjson'
+        assert spill_dir._path is None
+        assert info['data'] == [{"units": 2}, {"units": 5.5}]
+        assert info['sql'].scalar("SELECT MAX(units) FROM data") == 5.5
+        assert spill_dir._path is not None
+    
+    parquet = tmp_path / "rows.parquet"
+    conn = duckdb.connect()
+    conn.execute(f"COPY (SELECT range AS n FROM range(10)) TO '{parquet}' (FORMAT parquet)")
+    conn.close()
+    info = FileProcessor().extract_file_info(str(parquet))
+    assert info['columns'] == ['n']
+    assert len(info['data']) == 10
+    assert get_solver_registry().solve("What is the sum of the n column?", info) == "45"
+
+
+def test_column_aggregate_question():
+    upload = SimpleUploadedFile("marks.csv", b"name,Marks\nA,10\nB,20\nC,45\n")
+    info = FileProcessor().extract_file_info(upload)
+    registry = get_solver_registry()
+    assert registry.solve("What is the average of the marks column?", info, only={'column_aggregate'}) == "25"
+    assert registry.solve("What is the maximum of the 'Marks' column?", info, only={'column_aggregate'}) == "45"
+    assert registry.solve("What is the sum of the marks column where name is A?", info, only={'column_aggregate'}) is None
+    assert registry.solve("What is the sum of the height column?", info, only={'column_aggregate'}) is None
+
+
+def test_social_media_question():
+    question = (
+        "1. Filter Posts by Date: Consider only posts with a timestamp greater than or equal to 2025-01-31T02:00:05.191Z.\n"
+        "2. Evaluate Comment Quality: identify posts where at least one comment has received more than 4 useful stars.\n"
+        "Write a DuckDB SQL query to find all posts IDs after 2025-01-31T02:00:05.191Z with at least 1 comment "
+        "with 4 useful stars, sorted."
+    )
+    upload = SimpleUploadedFile("social_media.json", json.dumps(POSTS).encode())
+    with SpillDirectory() as spill_dir:
+        info = FileProcessor().extract_file_info(upload, spill_dir=spill_dir)
+        answer = get_solver_registry().solve(question, info)
+        assert "'2025-01-31T02:00:05.191Z'" in answer and "useful > 4" in answer
+        assert info['sql'].query(answer, table='social_media')['rows'] == [(3,)]
+        
+        at_least = question.split("Write ")[1]
+        answer = get_solver_registry().solve(at_least, info)
+        assert info['sql'].query(answer, table='social_media')['rows'] == [(1,), (3,)]
+
+
+def test_frame_has_the_query_limits(tmp_path):
+    parquet = tmp_path / "rows.parquet"
+    conn = duckdb.connect()
+    conn.execute(f"COPY (SELECT range AS n FROM range(10)) TO '{parquet}' (FORMAT parquet)")
+    conn.close()
+    table = SqlTable(str(parquet), 'parquet')
+    df = table.frame(max_rows=4)
+    assert list(df["n"]) == [0, 1, 2, 3] and df.attrs["truncated"]
+    assert not table.frame().attrs["truncated"]
+    with pytest.raises(QueryTimeout):
+        table.frame("SELECT COUNT(*) FROM range(100000000000) a, data", timeout=0.2)
+    
+    with override_settings(DUCKDB_MAX_ROWS=4):
+        info = FileProcessor().extract_file_info(str(parquet))
+        assert len(info["data"]) == 4
+        assert info["partial"] == "only the first 4 rows were loaded"
@@ -0,0 +1,47 @@
+"""
+Offline tests for upload encoding detection.
+"""
+
+from solver.services.processors.encoding import detect_encoding, encoding_cache
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.solvers.registry import get_solver_registry
+
+ROWS = "symbol,value\n" + "".join(f"{symbol},{i}\n" for i, symbol in enumerate(["›", "œ", "—", "a"] * 5))
+
+
+def test_bom_and_strict_utf8_decide_first():
+    assert detect_encoding(ROWS.encode("utf-16")) == "utf-16"
+    assert detect_encoding(ROWS.encode("utf-32")) == "utf-32"
+    assert detect_encoding(ROWS.encode("utf-8-sig")) == "utf-8-sig"
+    assert detect_encoding(ROWS.encode("utf-8")) == "utf-8"
+
+
+def test_single_byte_code_pages_are_detected():
+    assert detect_encoding(ROWS.encode("cp1252")) == "cp1252"
+    # Valid UTF-8 at the start does not hide a later cp1252 byte
+    assert detect_encoding(("x" * 200000 + "café\n").encode("cp1252")) == "cp1252"
+    assert detect_encoding(("Это пример текста на русском языке. " * 5).encode("cp1251")) == "cp1251"
+
+
+def test_detection_is_cached_by_content():
+    raw = ("Le café coûte 10 € à Paris. " * 20).encode("cp1252")
+    encoding_cache.clear()
+    assert detect_encoding(raw) == "cp1252"
+    assert detect_encoding(raw) == "cp1252"
+    assert encoding_cache.stats()["hits"] == 1
+
+
+def test_mixed_encoding_archive_is_summed(make_zip):
+    upload = make_zip({
+        "data1.csv": ROWS.encode("cp1252"),
+        "data2.csv": ROWS.encode("utf-8"),
+        "data3.txt": ROWS.replace(",", "\t").encode("utf-16"),
+    }, name="q-unicode-data.zip")
+    info = FileProcessor().extract_file_info(upload)
+    
+    assert info["extracted_content"]["data3.txt"]["encoding"] == "utf-16"
+    assert info["extracted_content"]["data3.txt"]["data"].startswith("symbol\tvalue")
+    question = "Process the files which contain different encodings. What is the sum of all values?"
+    # Rows 0-2 of every group of 4 have a special symbol, in both CSV files
+    expected = 2 * sum(i for i in range(20) if i % 4 != 3)
+    assert get_solver_registry().solve(question, info) == str(expected)
@@ -0,0 +1,69 @@
+"""
+Offline tests for Excel ingestion and the sales margin solver.
+"""
+
+import io
+from datetime import datetime
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from solver.services.processors import excel_reader
+from solver.services.processors.excel_reader import ExcelSource
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.solvers.registry import get_solver_registry
+
+openpyxl = pytest.importorskip("openpyxl")
+
+SALES = [
+    ("Customer Name", "Country", "Date", "Product/Code", "Sales", "Cost"),
+    ("Acme", " France", datetime(2022, 3, 1), "Alpha/AB12", "USD 100 ", "60 USD"),
+    ("Bolt", "Fra", "2022/06/15", " Alpha/CD34", 200, None),
+    ("Core", "FR", "12-19-2022", "Alpha/EF56", 100, 90),
+    ("Dyno", "fr.", "12-20-2022", "Alpha/GH78", 1000, 0),
+    ("Echo", "U.S.A", "2022-01-01", "Alpha/IJ90", 500, 100),
+    ("Flux", "France", "2022-01-01", "Beta/KL12", 500, 100),
+]
+
+
+def make_workbook(sheets):
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        sheet = workbook.create_sheet(name)
+        for row in rows:
+            sheet.append(row)
+    out = io.BytesIO()
+    workbook.save(out)
+    return out.getvalue()
+
+
+def test_sheets_are_read_lazily_and_typed(monkeypatch):
+    raw = make_workbook({
+        "numbers": [("id", "value", "when")] + [(i, i * 0.5, datetime(2024, 1, 1 + i)) for i in range(5)],
+        "other": [("a",), ("x",)],
+    })
+    # Several chunks per sheet
+    monkeypatch.setattr(excel_reader, "EXCEL_CHUNK_ROWS", 2)
+    assert ExcelSource(raw, "book.xlsx").read_sheet("numbers", nrows=3).shape == (3, 3)
+    
+    info = FileProcessor().extract_file_info(SimpleUploadedFile("book.xlsx", raw))
+    assert info["type"] == "excel"
+    assert list(info["sheets"]) == ["numbers", "other"]
+    assert info["sheets"].loaded() == []
+    
+    df = info["data"]
+    assert list(info["columns"]) == ["id", "value", "when"]
+    assert len(df) == 5
+    assert str(df["id"].dtype) == "int64"
+    assert str(df["value"].dtype) == "float64"
+    assert str(df["when"].dtype).startswith("datetime64")
+    assert info["sheets"].loaded() == ["numbers"]
+
+
+def test_sales_margin_after_cleaning():
+    info = FileProcessor().extract_file_info(SimpleUploadedFile("q-clean-up-excel-sales-data.xlsx", make_workbook({"Sheet1": SALES})))
+    question = ("What is the total margin for transactions before Mon Dec 19 2022 06:38:52 GMT+0530 "
+                "(India Standard Time) for Alpha sold in FR (which may be spelt in different ways)?")
+    # Acme, Bolt (cost is half the sales) and Core: (400 - 250) / 400
+    assert get_solver_registry().solve(question, info) == "0.375"
@@ -0,0 +1,143 @@
+"""
+Offline tests for FileProcessor.extract_file_info on in-memory uploads.
+"""
+
+import io
+import os
+import sqlite3
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from solver.services.processors.file_info import LazyFileInfo
+from solver.services.processors.file_processor import FileProcessor, SpillDirectory, ZipMembers
+from solver.services.routing import model_router
+from solver.services.solvers.registry import get_solver_registry
+
+
+def test_sources_give_the_same_file_info(tmp_path):
+    raw = b"id,answer\n1,first\n2,second\n"
+    path = tmp_path / "data.csv"
+    path.write_bytes(raw)
+    processor = FileProcessor()
+    
+    infos = [
+        processor.extract_file_info(str(path)),
+        processor.extract_file_info(raw, name="data.csv"),
+        processor.extract_file_info(io.BytesIO(raw), name="data.csv"),
+        processor.extract_file_info(SimpleUploadedFile("data.csv", raw)),
+    ]
+    for info in infos:
+        assert info["type"] == "csv"
+        assert info["name"] == "data.csv"
+        assert info["columns"] == ["id", "answer"]
+        assert info["data"]["answer"].tolist() == ["first", "second"]
+    assert infos[0]["path"] == str(path)
+    assert infos[1]["path"] is None
+
+
+def test_lazy_file_info_runs_each_loader_once():
+    calls = []
+    
+    def parse():
+        calls.append(1)
+        return {"data": [1, 2], "content": "1, 2"}
+    
+    info = LazyFileInfo({"name": "x.json", "type": "json"})
+    info.lazy(("data", "content", "error"), parse)
+    assert calls == []
+    assert "<not loaded>" in repr(info)
+    # Truth testing, as in `if file_info:` or routing, parses nothing
+    assert info
+    assert model_router.classify("What is the total?", info) == "file"
+    assert calls == []
+    
+    assert info["data"] == [1, 2]
+    assert info.get("content") == "1, 2"
+    # Keys the loader left out are absent, as in a plain dict
+    assert "error" not in info
+    assert info.get("error") is None
+    assert calls == [1]
+    assert dict(info) == {"name": "x.json", "type": "json", "data": [1, 2], "content": "1, 2"}
+
+
+def test_uploads_are_parsed_on_first_access():
+    info = FileProcessor().extract_file_info(SimpleUploadedFile("data.csv", b"id,answer\n1,first\n"))
+    assert info["type"] == "csv"
+    assert not info.loaded("data")
+    
+    # The header alone gives the columns
+    assert info["columns"] == ["id", "answer"]
+    assert not info.loaded("data")
+    assert info["data"]["answer"].tolist() == ["first"]
+    
+    broken = FileProcessor().extract_file_info(SimpleUploadedFile("broken.json", b"{not json"))
+    assert broken["data"] is None
+    assert "Expecting property name" in broken["error"]
+
+
+def test_text_is_decoded_with_universal_newlines():
+    info = FileProcessor().extract_file_info(SimpleUploadedFile("notes.txt", b"a\r\nb\rc\n"))
+    assert info["data"] == "a\nb\nc\n"
+
+
+def test_zip_members_are_read_from_memory(make_zip):
+    upload = make_zip({"a.txt": "one", "nested/": "", "nested/b.json": '{"x": 1}'})
+    info = FileProcessor().extract_file_info(upload)
+    assert info["extracted_files"] == ["a.txt", "nested/b.json"]
+    assert info["extracted_content"]["a.txt"]["data"] == "one"
+    assert info["extracted_content"]["nested/b.json"]["data"] == {"x": 1}
+
+
+def test_zip_members_are_parsed_only_when_looked_up(make_zip):
+    upload = make_zip({
+        "extract.csv": "answer\nabc123\n",
+        "notes.txt": "not needed",
+        "broken.json": "{not json",
+    }, name="q-extract-csv-zip.zip")
+    info = FileProcessor().extract_file_info(upload)
+    members = info["extracted_content"]
+    assert isinstance(members, ZipMembers)
+    assert members.loaded() == []
+    assert "extract.csv (" in info["content"]
+    
+    question = "Download and unzip file. What is the value in the answer column of the CSV file?"
+    assert get_solver_registry().solve(question, info) == "abc123"
+    assert members.loaded() == ["extract.csv"]
+    
+    with members.open("notes.txt") as stream:
+        assert stream.read() == b"not needed"
+    assert members.loaded() == ["extract.csv"]
+
+
+def test_zip_members_over_the_size_caps_are_not_read(make_zip):
+    upload = make_zip({"big.txt": "x" * 5000, "a.txt": "a" * 600, "b.txt": "b" * 600})
+    info = FileProcessor().extract_file_info(upload)
+    members = info["extracted_content"]
+    members.max_member_size = 1000
+    members.max_total_size = 1000
+    
+    assert "over the limit of 1000 bytes per file" in members["big.txt"]["error"]
+    assert members["big.txt"]["type"] == "text"
+    assert members["a.txt"]["data"] == "a" * 600
+    # a.txt fits on its own, but not together with the 600 bytes already read
+    assert "600 already read" in members["b.txt"]["error"]
+    assert members.decompressed_size == 600
+
+
+def test_only_sqlite_spills_to_disk(tmp_path):
+    db_path = tmp_path / "source.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE tickets (type TEXT, units INTEGER)")
+    conn.execute("INSERT INTO tickets VALUES ('Gold', 3)")
+    conn.commit()
+    conn.close()
+    processor = FileProcessor()
+    
+    with SpillDirectory() as spill_dir:
+        processor.extract_file_info(SimpleUploadedFile("data.csv", b"x\n1\n"), spill_dir=spill_dir)
+        assert spill_dir._path is None
+        
+        info = processor.extract_file_info(SimpleUploadedFile("tickets.db", db_path.read_bytes()), spill_dir=spill_dir)
+        assert info["data"]["tickets"]["sample"] == [("Gold", 3)]
+        assert os.path.dirname(info["path"]) == spill_dir.path
+    assert not os.path.exists(info["path"])
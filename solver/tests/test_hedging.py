@@ -0,0 +1,114 @@
+"""
+Offline tests for hedged AI Proxy requests against the local stand-in.
+"""
+
+import threading
+import time
+
+from solver.perf.aiproxy_stub import LatencyModel, StubServer
+from solver.services import request_handler
+from solver.services.answer_cache import llm_answer_cache
+from solver.services.hedging import HedgePolicy
+from solver.services.request_handler import RequestHandler
+
+
+def warm_policy(**kwargs):
+    # A p90 of 50ms, well above a fast stub response
+    policy = HedgePolicy(enabled=True, min_delay=0.0, min_samples=5, **kwargs)
+    for _ in range(100):
+        policy.observe(0.05)
+    return policy
+
+
+def test_stalled_request_is_hedged(monkeypatch):
+    llm_answer_cache.clear()
+    policy = warm_policy(max_rate=0.5)
+    monkeypatch.setattr(request_handler, "aiproxy_hedge", policy)
+    # Every third upstream request stalls for a second
+    latency = LatencyModel("fixed:0.01", slow_latency=1.0, slow_every=3)
+    server = StubServer(answer="42", latency=latency).start()
+    try:
+        handler = RequestHandler()
+        handler.aiproxy_token = "test-token"
+        handler.aiproxy_url = server.url
+        
+        elapsed = []
+        for i in range(3):
+            start = time.perf_counter()
+            assert handler.query_aiproxy(f"Question {i}") == {"answer": "42"}
+            elapsed.append(time.perf_counter() - start)
+        
+        # The third call stalled upstream, but the hedge answered it quickly
+        assert max(elapsed) < 0.5
+        stats = policy.stats()
+        assert stats["calls"] == 3
+        assert stats["hedged"] == 1
+        assert stats["hedge_wins"] == 1
+        assert server.stats["requests"] == 4
+    finally:
+        server.stop()
+
+
+def test_hedge_rate_is_capped():
+    policy = warm_policy(max_rate=0.2)
+    
+    def slow_send():
+        time.sleep(0.1)
+        return "response"
+    
+    for _ in range(10):
+        assert policy.call(slow_send) == "response"
+    
+    stats = policy.stats()
+    assert 0 < stats["hedged"] <= 2
+    assert stats["hedge_rate"] <= 0.2
+
+
+def test_no_hedging_until_enough_samples():
+    policy = HedgePolicy(enabled=True, min_samples=5)
+    assert policy.delay() is None
+    assert policy.call(lambda: "response") == "response"
+    assert policy.stats()["hedged"] == 0
+
+
+def test_only_successful_latencies_set_the_delay():
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+    
+    policy = HedgePolicy(enabled=False, min_samples=1)
+    for status in (500, 429, 503):
+        policy.call(lambda: Response(status))
+    assert policy.delay() is None
+    policy.call(lambda: Response(200))
+    assert policy.delay() is not None
+
+
+def test_error_responses_do_not_win_and_only_hedges_use_the_pool():
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+            self.thread = threading.current_thread().name
+        
+        def close(self):
+            pass
+    
+    policy = warm_policy(max_rate=1.0)
+    calls = []
+    
+    def send():
+        calls.append(None)
+        if len(calls) == 1:
+            # The primary stalls, then fails
+            time.sleep(0.1)
+            return Response(500)
+        time.sleep(0.2)
+        return Response(200)
+    
+    response = policy.call(send)
+    assert response.status_code == 200
+    assert response.thread.startswith("aiproxy-hedge")
+    
+    calls.clear()
+    response = policy.call(lambda: Response(200))
+    assert response.thread == "aiproxy-primary"
@@ -0,0 +1,68 @@
+"""
+Offline tests for the vectorized image solvers.
+"""
+
+import base64
+import colorsys
+import io
+
+import numpy as np
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.processors.image_reader import decode_image, lightness, rearrange_tiles
+from solver.services.solvers.registry import get_solver_registry
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def encode(pixels, image_format="PNG"):
+    out = io.BytesIO()
+    Image.fromarray(pixels).save(out, image_format)
+    return out.getvalue()
+
+
+def answer_pixels(answer):
+    return decode_image(base64.b64decode(answer.split(",", 1)[1]))["data"]
+
+
+def test_lightness_matches_colorsys():
+    pixels = np.random.default_rng(1).integers(0, 256, size=(20, 30, 3), dtype=np.uint8)
+    expected = np.apply_along_axis(lambda x: colorsys.rgb_to_hls(*x)[1], 2, pixels / 255.0)
+    assert np.array_equal(lightness(pixels), expected)
+    
+    info = FileProcessor().extract_file_info(SimpleUploadedFile("brightness_test.png", encode(pixels)))
+    question = "light_pixels = np.sum(lightness > 0.481)\nWhat is the result? (It should be a number)"
+    assert get_solver_registry().solve(question, info) == str(int((expected > 0.481).sum()))
+
+
+def test_lossless_compression_keeps_every_pixel():
+    # Few colors and large flat areas, like the steps visualization
+    pixels = np.zeros((200, 300, 3), dtype=np.uint8)
+    for step in range(6):
+        pixels[step * 30:, step * 50:(step + 1) * 50] = (40 * step, 255 - 40 * step, 128)
+    info = FileProcessor().extract_file_info(SimpleUploadedFile("steps.png", encode(pixels, "BMP")))
+    question = "Download the image and compress it losslessly to an image that is less than 1,500 bytes."
+    answer = get_solver_registry().solve(question, info)
+    assert len(base64.b64decode(answer.split(",", 1)[1])) < 1500
+    assert np.array_equal(answer_pixels(answer), pixels)
+
+
+def test_tiles_are_moved_back():
+    original = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+    tiles = [(r, c) for r in range(2) for c in range(2)]
+    # Piece at original (r, c) was put at scrambled position swap[(r, c)]
+    swap = {(0, 0): (1, 1), (0, 1): (1, 0), (1, 0): (0, 0), (1, 1): (0, 1)}
+    scrambled = np.empty_like(original)
+    for r, c in tiles:
+        sr, sc = swap[(r, c)]
+        scrambled[sr * 2:(sr + 1) * 2, sc * 3:(sc + 1) * 3] = original[r * 2:(r + 1) * 2, c * 3:(c + 1) * 3]
+    moves = [(r, c, *swap[(r, c)]) for r, c in tiles]
+    assert np.array_equal(rearrange_tiles(scrambled, moves, (2, 2)), original)
+    
+    info = FileProcessor().extract_file_info(SimpleUploadedFile("scrambled_image.png", encode(scrambled)))
+    question = ("Reconstruct the original image from its scrambled pieces.\n"
+                "Original Row\tOriginal Column\tScrambled Row\tScrambled Column\n"
+                + "\n".join("\t".join(map(str, move)) for move in moves))
+    assert np.array_equal(answer_pixels(get_solver_registry().solve(question, info)), original)
@@ -0,0 +1,81 @@
+"""
+Offline tests for questions that come with several uploaded files.
+"""
+
+import threading
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+
+from solver.services import request_handler
+from solver.services.deadline import Deadline
+
+
+def test_multiple_files_are_combined_for_local_solvers(make_handler):
+    handler = make_handler()
+    files = [
+        SimpleUploadedFile("a.txt", b"one\ntwo\nthree"),
+        SimpleUploadedFile("b.txt", b"one\n2\nthree"),
+    ]
+    question = "Download and extract the files. How many lines are different between a.txt and b.txt?"
+    assert handler.process_request(question, files) == {"answer": "1"}
+    assert handler.llm_calls == []
+
+
+def test_combined_file_info_reaches_the_llm(make_handler):
+    handler = make_handler()
+    files = [
+        SimpleUploadedFile("data.csv", b"x,y\n1,2\n3,4\n"),
+        SimpleUploadedFile("schema.json", b'{"x": "int", "y": "int"}'),
+        SimpleUploadedFile("data.csv", b"x,y\n5,6\n"),
+    ]
+    assert handler.process_request("What is the total of y?", files) == {"answer": "llm"}
+    
+    file_info, _ = handler.llm_calls[0]
+    assert file_info["type"] == "multi"
+    assert list(file_info["extracted_content"]) == ["data.csv", "schema.json", "_data.csv"]
+    assert file_info["extracted_content"]["schema.json"]["type"] == "json"
+    assert set(file_info["timings_ms"]) == {"data.csv", "schema.json", "_data.csv"}
+    
+    context, _ = handler.prompt_builder.build_file_context(file_info)
+    assert context.startswith("File: data.csv, schema.json, data.csv (type: multi)\nUpload with 3 files:")
+
+
+def test_files_are_extracted_on_their_own_pool(monkeypatch, make_handler):
+    handler = make_handler()
+    threads = []
+    extract = handler.file_processor.extract_file_info
+    
+    def record_thread(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return extract(*args, **kwargs)
+    
+    monkeypatch.setattr(handler.file_processor, "extract_file_info", record_thread)
+    handler.process_request("What is in them?", [SimpleUploadedFile("a.txt", b"a"), SimpleUploadedFile("b.txt", b"b")])
+    # Not the pool the speculative LLM calls run on
+    assert len(threads) == 2 and all(name.startswith("extract") for name in threads)
+
+
+def test_endpoint_accepts_repeated_file_parts(monkeypatch):
+    received = []
+    
+    def fake_process(self, question, file=None, deadline=None):
+        received.append(file)
+        return {"answer": "ok"}
+    
+    monkeypatch.setattr(request_handler.RequestHandler, "process_request", fake_process)
+    response = Client().post("/api/", {
+        "question": "Compare these",
+        "file": [SimpleUploadedFile("a.txt", b"a"), SimpleUploadedFile("b.txt", b"b")],
+    })
+    assert response.json() == {"answer": "ok"}
+    assert [upload.name for upload in received[0]] == ["a.txt", "b.txt"]
+
+
+def test_uploads_dropped_for_lack_of_time_are_counted(make_handler):
+    handler = make_handler()
+    files = [SimpleUploadedFile(f"{name}.txt", b"data") for name in "abc"]
+    # No local time at all, so every file is dropped
+    assert handler.process_request("What is in them?", files, Deadline(60, llm_reserve=60)) == {"answer": "llm"}
+    assert handler.dropped_uploads == 3
+    assert handler.answered_partially()
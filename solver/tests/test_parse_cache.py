@@ -0,0 +1,80 @@
+"""
+Offline tests for the content-addressed cache of parsed uploads.
+"""
+
+import os
+import sqlite3
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from solver.services.parse_cache import ParseCache, content_digest
+from solver.services.processors import file_processor
+from solver.services.processors.file_processor import FileProcessor, SpillDirectory
+
+
+def test_repeat_upload_skips_parsing(tmp_path, monkeypatch):
+    cache = ParseCache(str(tmp_path), min_bytes=0, enabled=True)
+    monkeypatch.setattr(file_processor, "parse_cache", cache)
+    calls = []
+    parse_csv = FileProcessor._parse_csv
+    
+    def counting_parse(self, csv_source):
+        calls.append(csv_source)
+        return parse_csv(self, csv_source)
+    
+    monkeypatch.setattr(FileProcessor, "_parse_csv", counting_parse)
+    raw = b"id,answer\n1,first\n2,second\n"
+    
+    first = FileProcessor().extract_file_info(SimpleUploadedFile("a.csv", raw))
+    second = FileProcessor().extract_file_info(SimpleUploadedFile("renamed.csv", raw))
+    assert first["data"].equals(second["data"])
+    assert second["columns"] == ["id", "answer"]
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["stores"] == 1
+
+
+def test_small_files_and_partial_parses_are_not_stored(tmp_path):
+    cache = ParseCache(str(tmp_path), min_bytes=10, enabled=True)
+    assert cache.get_or_parse(b"tiny", "text", lambda raw: {"data": raw}) == {"data": b"tiny"}
+    cache.get_or_parse(b"x" * 20, "sqlite", lambda raw: {"partial": "1 of 2 tables not read"})
+    assert cache.stats()["stores"] == 0
+    assert not any(files for _, _, files in os.walk(tmp_path))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ParseCache(str(tmp_path), max_bytes=10 ** 6, min_bytes=0, enabled=True)
+    digests = [content_digest(bytes([i])) for i in range(3)]
+    for age, digest in enumerate(digests):
+        cache.put(digest, "text", {"data": "x" * 1000})
+        # Oldest first, without relying on the file system's mtime resolution
+        os.utime(cache._path(digest, "text"), (1000 + age, 1000 + age))
+    
+    # Reading the oldest entry makes it the most recently used
+    assert cache.get(digests[0], "text") == {"data": "x" * 1000}
+    size = os.path.getsize(cache._path(digests[0], "text"))
+    cache.max_bytes = 2 * size
+    assert cache.evict() == 1
+    assert cache.get(digests[1], "text") is None
+    assert cache.get(digests[0], "text") is not None
+    assert cache.get(digests[2], "text") is not None
+
+
+def test_cached_sqlite_schema_does_not_spill(tmp_path, monkeypatch):
+    cache = ParseCache(str(tmp_path / "cache"), min_bytes=0, enabled=True)
+    monkeypatch.setattr(file_processor, "parse_cache", cache)
+    db_path = tmp_path / "tickets.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE tickets (type TEXT, units INTEGER)")
+    conn.execute("INSERT INTO tickets VALUES ('Gold', 3)")
+    conn.commit()
+    conn.close()
+    raw = db_path.read_bytes()
+    
+    with SpillDirectory() as spill_dir:
+        assert FileProcessor().extract_file_info(SimpleUploadedFile("a.db", raw), spill_dir=spill_dir)["data"]
+    with SpillDirectory() as spill_dir:
+        info = FileProcessor().extract_file_info(SimpleUploadedFile("b.db", raw), spill_dir=spill_dir)
+        assert info["data"]["tickets"]["sample"] == [("Gold", 3)]
+        assert spill_dir._path is None
+        # The path is still there for solvers that query the database
+        assert os.path.exists(info["path"])
@@ -0,0 +1,103 @@
+"""
+Offline tests for PDF table and text extraction.
+"""
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.processors.pdf_reader import extract_pdf
+from solver.services.solvers.registry import get_solver_registry
+
+pytest.importorskip("pdfplumber")
+
+SUBJECTS = ["Maths", "Physics", "English", "Economics", "Biology"]
+
+
+def pdf_document(pages):
+    """Minimal PDF with Helvetica text and stroked rectangles; pages are lists of drawing ops."""
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for ops in pages:
+        stream = []
+        for op in ops:
+            if op[0] == "text":
+                _, x, y, size, text = op
+                stream.append(f"BT /F1 {size} Tf {x} {y} Td ({text}) Tj ET")
+            else:
+                _, x, y, w, h = op
+                stream.append(f"{x} {y} {w} {h} re S")
+        data = "\n".join(stream).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>".encode()
+        )
+        kids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{kid} 0 R' for kid in kids)}] /Count {len(kids)} >>".encode()
+    
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def table(x, y, rows, width=80, height=20):
+    ops = []
+    for r, row in enumerate(rows):
+        for c, cell in enumerate(row):
+            left, bottom = x + c * width, y - (r + 1) * height
+            ops.append(("rect", left, bottom, width, height))
+            ops.append(("text", left + 4, bottom + 6, 10, str(cell)))
+    return ops
+
+
+def marks_pdf():
+    pages = []
+    for group, rows in [(76, [[90, 1, 1, 1, 1]]), (77, [[20, 30, 40, 50, 60], [25, 31, 41, 51, 61]]), (78, [[30, 1, 2, 3, 4]])]:
+        pages.append([("text", 72, 740, 16, f"Student marks - Group {group}")] + table(72, 720, [SUBJECTS] + rows))
+    return pdf_document(pages)
+
+
+def test_tables_get_a_group_key_in_and_out_of_process():
+    raw = marks_pdf()
+    parsed = extract_pdf(raw)
+    df = parsed["data"]
+    assert list(df.columns) == SUBJECTS + ["page", "group"]
+    assert list(df["group"]) == [76, 77, 77, 78]
+    assert str(df["Maths"].dtype) == "int64"
+    assert "| Maths | Physics | English | Economics | Biology |" in parsed["content"]
+    
+    parallel = extract_pdf(raw, workers=2, parallel_min_pages=1)
+    assert parallel["data"].equals(df)
+    assert parallel["content"] == parsed["content"]
+
+
+def test_marks_question_is_answered_locally():
+    info = FileProcessor().extract_file_info(SimpleUploadedFile("student_marks.pdf", marks_pdf()))
+    assert info["type"] == "pdf"
+    question = ("Calculate the total Maths marks of students who scored 21 or more marks in Maths "
+                "in groups 77-100 (including both groups).")
+    # 25 in group 77 and 30 in group 78; 20 is below the cut and group 76 is outside
+    assert get_solver_registry().solve(question, info) == "55"
+
+
+def test_text_becomes_markdown():
+    raw = pdf_document([[
+        ("text", 72, 740, 22, "Sample Document"),
+        ("text", 72, 710, 11, "This is the first line of a"),
+        ("text", 72, 696, 11, "paragraph that wraps."),
+        ("text", 72, 660, 16, "Features"),
+        ("text", 72, 640, 11, "- fast"),
+        ("text", 72, 626, 11, "- small"),
+    ]])
+    assert extract_pdf(raw)["content"] == (
+        "# Sample Document\n\nThis is the first line of a paragraph that wraps.\n\n## Features\n\n- fast\n- small\n"
+    )
@@ -0,0 +1,106 @@
+"""
+Offline tests for the request pipeline stages.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from solver.services.metrics import pipeline_metrics
+from solver.services.request_handler import get_pipeline_stats
+
+
+def test_local_solver_stage_answers_before_llm(make_handler):
+    pipeline_metrics.reset()
+
+    def fail_llm(question, file_info=None, deadline=None):
+        raise AssertionError("LLM should not be called")
+
+    handler = make_handler(fail_llm)
+
+    html = '<div class="foo" data-value="4"></div><div class="foo bar" data-value="6"></div><div data-value="9"></div>'
+    upload = SimpleUploadedFile("page.html", html.encode("utf-8"))
+    question = "Find all <div>s having a foo class. What's the sum of their data-value attributes?"
+    assert handler.process_request(question, upload) == {"answer": "10"}
+
+    stats = get_pipeline_stats()
+    assert stats["counters"]["file_requests"] == 1
+    assert stats["counters"]["answered.local_solver"] == 1
+    assert stats["local_solver_rate"] == 1.0
+    assert stats["solvers"]["css_foo_data_value"]["hits"] >= 1
+
+
+def test_speculative_pipeline_uses_llm_only_when_local_stages_miss(monkeypatch, make_handler):
+    from solver.services.speculation import speculation_policy
+    
+    pipeline_metrics.reset()
+    monkeypatch.setattr(speculation_policy, "enabled", True)
+    speculation_policy.reset()
+    handler = make_handler()
+    
+    upload = SimpleUploadedFile("notes.txt", b"nothing to solve here")
+    assert handler.process_request("What does the file say?", upload) == {"answer": "llm"}
+    
+    html = '<div class="foo" data-value="4"></div>'
+    upload = SimpleUploadedFile("page.html", html.encode("utf-8"))
+    question = "Find all <div>s having a foo class. What's the sum of their data-value attributes?"
+    assert handler.process_request(question, upload) == {"answer": "4"}
+    
+    counters = get_pipeline_stats()["counters"]
+    # The second question matched a solver signature, so no LLM call was started for it
+    assert counters["speculation.started"] == 1
+    assert counters.get("speculation.wasted", 0) == 0
+    assert counters["answered.llm"] == 1
+    assert counters["answered.local_solver"] == 1
+    speculation_policy.reset()
+
+
+def test_speculative_pipeline_keeps_repository_priority(monkeypatch, make_handler, tmp_path):
+    from solver.services.speculation import speculation_policy
+    
+    monkeypatch.setattr(speculation_policy, "enabled", True)
+    speculation_policy.reset()
+    llm_started = threading.Event()
+    release_llm = threading.Event()
+    seen = []
+    
+    def slow_llm(question, file_info=None, deadline=None):
+        llm_started.set()
+        release_llm.wait(5)
+        seen.append(os.path.exists(file_info["path"]))
+        return {"answer": "llm"}
+    
+    def match(question):
+        seen.append(threading.current_thread().name)
+        llm_started.wait(5)
+        return True, "repository"
+    
+    handler = make_handler(slow_llm)
+    monkeypatch.setattr(handler.question_matcher, "match_question", match)
+    
+    # A local solver would answer this one too, but the repository comes first
+    html = '<div class="foo" data-value="4"></div>'
+    upload = SimpleUploadedFile("page.html", html.encode("utf-8"))
+    question = "Find all <div>s having a foo class. What's the sum of their data-value attributes?"
+    llm_started.set()
+    assert handler.process_request(question, upload) == {"answer": "repository"}
+    assert seen.pop().startswith("match")
+    
+    # The wasted LLM call is still reading the upload when the answer is returned
+    path = tmp_path / "tickets.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE speculation (x INTEGER)")
+    conn.close()
+    llm_started.clear()
+    upload = SimpleUploadedFile("tickets.db", path.read_bytes())
+    assert handler.process_request("How many rows are there?", upload) == {"answer": "repository"}
+    release_llm.set()
+    for _ in range(100):
+        if len(seen) == 2:
+            break
+        time.sleep(0.05)
+    assert seen[1] is True
+    speculation_policy.reset()
@@ -0,0 +1,50 @@
+"""
+Offline tests for the token-budgeted prompt builder.
+"""
+
+import pandas as pd
+
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.prompt_builder import PromptBuilder, estimate_tokens, truncate_to_tokens
+
+
+def make_archive(make_zip):
+    frame = pd.DataFrame({"id": range(2000), "answer": [f"value-{i}" for i in range(2000)]})
+    return make_zip({"data.csv": frame.to_csv(index=False), "notes.txt": "line\n" * 5000}, name="archive.zip")
+
+
+def test_truncate_is_deterministic_and_line_aligned():
+    text = "\n".join(f"row {i}" for i in range(1000))
+    first = truncate_to_tokens(text, 50)
+    assert first == truncate_to_tokens(text, 50)
+    assert first.splitlines()[-2].startswith("row ")
+    assert "[truncated" in first
+    assert truncate_to_tokens("short", 50) == "short"
+
+
+def test_zip_summary_respects_budget(make_zip):
+    file_info = FileProcessor().extract_file_info(make_archive(make_zip))
+    context, stats = PromptBuilder(token_budget=500).build_file_context(file_info)
+
+    assert estimate_tokens(context) <= 500 + 20
+    assert "data.csv (csv)" in context
+    assert "answer: object" in context
+    assert "id: sum=1999000" in context
+    assert stats["tokens_saved"] == stats["raw_tokens"] - stats["prompt_tokens"]
+    assert stats["tokens_saved"] > 0
+
+
+def test_raw_tokens_of_an_archive_parse_no_member(make_zip):
+    file_info = FileProcessor().extract_file_info(make_zip({"a.txt": "a" * 400, "b.csv": "x\n" * 200}))
+    assert PromptBuilder()._raw_tokens(file_info) == 200
+    assert file_info["extracted_content"].loaded() == []
+
+
+def test_aggregates_of_missing_values():
+    df = pd.DataFrame({
+        "empty": pd.array([None, None], dtype="Int64"),
+        "some": pd.array([1.5, None], dtype="Float64"),
+    })
+    context, _ = PromptBuilder().build_file_context({"name": "na.csv", "type": "csv", "data": df})
+    assert "empty: sum=0 min=NA max=NA mean=NA" in context
+    assert "some: sum=1.5 min=1.5 max=1.5 mean=1.5" in context
@@ -0,0 +1,84 @@
+"""
+Offline tests for the end-to-end response cache.
+"""
+
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, override_settings
+
+from solver.services import request_handler
+from solver.services.answer_cache import AnswerCache
+from solver.services.metrics import pipeline_metrics
+from solver.services.response_cache import make_response_key, response_cache
+
+
+def test_identical_requests_skip_the_pipeline(monkeypatch):
+    response_cache.clear()
+    pipeline_metrics.reset()
+    calls = []
+    
+    def fake_process(self, question, file=None, deadline=None):
+        calls.append(question)
+        return {"answer": "42"}
+    
+    monkeypatch.setattr(request_handler.RequestHandler, "process_request", fake_process)
+    client = Client()
+    for question in ("What is the  total?", "What is the total? "):
+        response = client.post("/api/", {"question": question, "file": SimpleUploadedFile("data.csv", b"x\n42\n")})
+        assert response.json() == {"answer": "42"}
+    
+    # Whitespace differences normalize to the same key
+    assert len(calls) == 1
+    counters = pipeline_metrics.snapshot()["counters"]
+    assert counters["response_cache.hits"] == 1
+    assert counters["response_cache.misses"] == 1
+    
+    # Different file content is a different request
+    client.post("/api/", {"question": "What is the total?", "file": SimpleUploadedFile("data.csv", b"x\n7\n")})
+    assert len(calls) == 2
+
+
+def test_errors_are_not_cached(monkeypatch):
+    response_cache.clear()
+    monkeypatch.setattr(
+        request_handler.RequestHandler, "process_request",
+        lambda self, question, file=None, deadline=None: {"answer": "Error: upstream failed"},
+    )
+    Client().post("/api/", {"question": "Anything"})
+    assert response_cache.stats()["size"] == 0
+
+
+def test_answers_without_the_whole_upload_are_not_cached(monkeypatch, no_template_match):
+    response_cache.clear()
+    monkeypatch.setattr(
+        request_handler.RequestHandler, "query_aiproxy",
+        lambda self, question, file_info=None, deadline=None: {"answer": "42"},
+    )
+    client = Client()
+    
+    # No local time at all: the file is dropped and the LLM answers the question alone
+    with override_settings(REQUEST_DEADLINE=10, REQUEST_DEADLINE_LLM_RESERVE=10):
+        response = client.post("/api/", {"question": "What is in d.txt?", "file": SimpleUploadedFile("d.txt", b"data")})
+    assert response.json() == {"answer": "42"}
+    assert response_cache.stats()["size"] == 0
+    
+    client.post("/api/", {"question": "What is in d.txt?", "file": SimpleUploadedFile("d.txt", b"data")})
+    assert response_cache.stats()["size"] == 1
+
+
+def test_streamed_digest_matches_file_digest():
+    upload = SimpleUploadedFile("a.txt", b"hello")
+    # b"hello" hashed while streaming gives the same key as hashing the file afterwards
+    digest = "2cf24dba5fb0a30e26e83b2ac5b9e29e1b161e5c1fa7425e73043362938b9824"
+    assert make_response_key("q", [upload], [digest]) == make_response_key("q", [upload])
+
+
+def test_answer_cache_ttl():
+    cache = AnswerCache(limit=2, ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,118 @@
+"""
+Offline tests for latency-aware model routing.
+"""
+
+from django.test import override_settings
+
+from solver.perf.aiproxy_stub import LatencyModel, StubServer
+from solver.services import request_handler
+from solver.services.answer_cache import llm_answer_cache
+from solver.services.request_handler import RequestHandler
+from solver.services.routing import ModelRouter, Route, default_routes
+
+
+def make_router(**kwargs):
+    routes = [
+        Route("lookup", "fast-model", 256, fallback="fallback"),
+        Route("file", "fast-model", 512, fallback="fallback"),
+        Route("code", "fast-model", 1024, "code", fallback="fallback"),
+        Route("long", "fast-model", 1024, fallback="fallback"),
+        Route("fallback", "backup-model", 1024),
+    ]
+    return ModelRouter(routes=routes, min_samples=3, probe_every=5, **kwargs)
+
+
+def test_classify_uses_cheap_features():
+    router = make_router()
+    assert router.classify("What is 2 + 2?") == "lookup"
+    assert router.classify("Explain this. " * 100) == "long"
+    assert router.classify("What is the total?", {"type": "csv"}) == "file"
+    assert router.classify("Write a Python script that prints the date") == "code"
+    assert router.classify("Write a DuckDB SQL query to find all post IDs, sorted.") == "code"
+    # Questions about the output of a command want the value, not the command
+    assert router.classify("What is the output of the command npx -y prettier@3.4.2 README.md | sha256sum?") == "lookup"
+    assert router.classify("Create and deploy a Python app to Vercel. What is the Vercel URL?") == "lookup"
+
+
+def test_degraded_route_falls_back_and_is_probed():
+    router = make_router(max_error_rate=0.5)
+    lookup = router.routes["lookup"]
+    for _ in range(3):
+        router.record(lookup, 0.1, ok=False)
+    
+    chosen = [router.choose("What is 2 + 2?").name for _ in range(5)]
+    assert chosen == ["fallback"] * 4 + ["lookup"]
+    assert router.stats()["lookup"]["degraded"]
+    
+    for _ in range(3):
+        router.record(lookup, 0.1, ok=True)
+    router.record(lookup, 0.1, ok=True)
+    assert router.choose("What is 2 + 2?").name == "lookup"
+
+
+def test_slow_route_is_degraded():
+    router = make_router(max_p90=1.0)
+    code = router.routes["code"]
+    for _ in range(3):
+        router.record(code, 5.0, ok=True)
+    assert router.choose("Write a bash command to list files").name == "fallback"
+
+
+def test_query_records_route_latency_and_usage(monkeypatch):
+    llm_answer_cache.clear()
+    router = make_router()
+    monkeypatch.setattr(request_handler, "model_router", router)
+    server = StubServer(answer="4", latency=LatencyModel("fixed:0.01")).start()
+    try:
+        handler = RequestHandler()
+        handler.aiproxy_token = "test-token"
+        handler.aiproxy_url = server.url
+        payload = handler._build_payload("What is 2 + 2?", route=router.choose("What is 2 + 2?"))
+        assert payload["model"] == "fast-model"
+        assert payload["max_tokens"] == 256
+        
+        assert handler.query_aiproxy("What is 2 + 2?") == {"answer": "4"}
+        stats = router.stats()["lookup"]
+        assert stats["calls"] == 1
+        assert stats["errors"] == 0
+        assert stats["p50_ms"] > 0
+        assert stats["prompt_tokens"] > 0
+        assert stats["completion_tokens"] == 1
+    finally:
+        server.stop()
+
+
+def test_default_routes_leave_the_token_limit_to_the_model():
+    payload = RequestHandler()._build_payload("What is 2 + 2?", route=ModelRouter().choose("What is 2 + 2?"))
+    assert "max_tokens" not in payload
+
+
+def test_answer_cut_off_at_the_token_limit_is_an_error_and_not_cached(monkeypatch):
+    llm_answer_cache.clear()
+    monkeypatch.setattr(request_handler, "model_router", make_router())
+    server = StubServer(answer="# Heading", finish_reason="length").start()
+    try:
+        handler = RequestHandler()
+        handler.aiproxy_token = "test-token"
+        handler.aiproxy_url = server.url
+        assert handler.query_aiproxy("Write Markdown").get("answer").startswith("Error")
+        events = list(handler.stream_aiproxy("Write Markdown"))
+        assert events[-1][1]["answer"].startswith("Error")
+        assert len(llm_answer_cache) == 0
+    finally:
+        server.stop()
+
+
+def test_routes_come_from_settings_and_fall_back_only_to_another_model():
+    routes = {route.name: route for route in default_routes()}
+    assert {route.model for route in routes.values()} == {"gpt-4o-mini"}
+    assert all(route.fallback is None for route in routes.values())
+    
+    with override_settings(
+        AIPROXY_ROUTES={"code": {"model": "code-model", "max_tokens": 2048}},
+        AIPROXY_FALLBACK_MODEL="backup-model",
+    ):
+        routes = {route.name: route for route in default_routes()}
+    assert (routes["code"].model, routes["code"].max_tokens) == ("code-model", 2048)
+    assert (routes["lookup"].model, routes["lookup"].max_tokens) == ("gpt-4o-mini", None)
+    assert routes["lookup"].fallback == "fallback" and routes["fallback"].model == "backup-model"
@@ -0,0 +1,97 @@
+"""
+Offline tests for the local solver registry.
+"""
+
+import hashlib
+import time
+
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.solvers.registry import SolverRegistry, get_solver_registry, requires_all
+
+
+def test_dispatch_only_evaluates_solvers_for_file_type():
+    registry = SolverRegistry()
+    calls = []
+
+    @registry.register("csv_one", file_types=["csv"], signature=requires_all("alpha"))
+    def csv_one(question, file_info):
+        calls.append("csv_one")
+        return "csv"
+
+    @registry.register("zip_one", file_types=["zip"], signature=requires_all("alpha"))
+    def zip_one(question, file_info):
+        calls.append("zip_one")
+        return "zip"
+
+    @registry.register("fallback", signature=requires_all("beta"))
+    def fallback(question, file_info):
+        calls.append("fallback")
+        return None
+
+    assert registry.solve("ALPHA and beta", {"type": "zip"}) == "zip"
+    assert calls == ["zip_one"]
+    assert [s.name for s in registry.candidates("csv")] == ["csv_one", "fallback"]
+    assert [s.name for s in registry.candidates("pdf")] == ["fallback"]
+
+    assert registry.solve("beta", {"type": "csv"}) is None
+    stats = registry.get_stats()
+    assert stats["zip_one"]["hits"] == 1
+    assert stats["fallback"] == {**stats["fallback"], "attempts": 1, "hits": 0}
+    assert "csv_one" not in stats
+
+
+def test_failing_solver_is_recorded_and_skipped():
+    registry = SolverRegistry()
+
+    @registry.register("broken", file_types=["csv"], signature="")
+    def broken(question, file_info):
+        raise ValueError("boom")
+
+    @registry.register("working", file_types=["csv"], signature="")
+    def working(question, file_info):
+        return "ok"
+
+    assert registry.solve("anything", {"type": "csv"}) == "ok"
+    assert registry.get_stats()["broken"]["errors"] == 1
+
+
+def test_file_processor_uses_registered_solvers(make_zip):
+    registry = get_solver_registry()
+    registry.reset_stats()
+
+    upload = make_zip({
+        "a.txt": "one\ntwo\nthree\n",
+        "b.txt": "one\nTWO\nthree\n",
+    }, name="q-compare-files.zip")
+    question = "It has 2 nearly identical files, a.txt and b.txt. How many lines are different between a.txt and b.txt?"
+    assert FileProcessor().process(question, upload) == {"answer": "1"}
+
+    upload = make_zip({"extract.csv": "answer\nabc123\n"}, name="q-extract-csv-zip.zip")
+    question = "Download and unzip file. What is the value in the answer column of the CSV file?"
+    assert FileProcessor().process(question, upload) == {"answer": "abc123"}
+
+    stats = registry.get_stats()
+    assert stats["compare_files"]["hits"] == 1
+    assert stats["zip_answer_column"]["hits"] == 1
+
+
+def test_signatures_give_up_quickly_on_long_questions():
+    question = "lorem ipsum dolor sit amet " * 400
+    start = time.perf_counter()
+    assert not any(solver.matches(question) for solver in get_solver_registry()._solvers)
+    # Unanchored lookaheads took over a second here, retried at each of the 10,800 positions
+    assert time.perf_counter() - start < 0.1
+
+
+def test_solvers_that_match_nothing_leave_the_question_to_the_llm(make_zip):
+    registry = get_solver_registry()
+    upload = make_zip({"data1.csv": "symbol,value\na,1\n", "notes.txt": "nothing special"})
+    info = FileProcessor().extract_file_info(upload)
+    question = "Process the files which contain different encodings. What is the sum of all values?"
+    assert registry.solve(question, info, only={'encoding_symbol_sum'}) is None
+    question = "Replace all IITM with IIT Madras. What does running cat * | sha256sum in that folder show?"
+    assert registry.solve(question, info, only={'replace_iitm_sha256'}) is None
+    
+    upload = make_zip({"notes.txt": "IITM"})
+    info = FileProcessor().extract_file_info(upload)
+    assert registry.solve(question, info, only={'replace_iitm_sha256'}) == hashlib.sha256(b"IIT Madras").hexdigest()
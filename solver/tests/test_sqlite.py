@@ -0,0 +1,77 @@
+"""
+Offline tests for the read-only, time-bounded SQLite engine.
+"""
+
+import sqlite3
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from solver.services.processors import sqlite_reader
+from solver.services.processors.file_processor import FileProcessor, SpillDirectory
+from solver.services.processors.sqlite_reader import QueryTimeout, read_schema, run_query
+from solver.services.solvers.registry import get_solver_registry
+
+
+@pytest.fixture
+def tickets_db(tmp_path):
+    path = tmp_path / "tickets.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE tickets (type TEXT, units INTEGER, price REAL)")
+    conn.executemany("INSERT INTO tickets VALUES (?, ?, ?)", [
+        ("Gold", 2, 10.0), (" gold ", 1, 5.5), ("GOLD", 3, 1.0), ("Silver", 10, 1.0),
+    ])
+    conn.execute('CREATE TABLE "odd ""name""" (x INTEGER)')
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_schema_and_counts_in_one_pass(tickets_db):
+    parsed = read_schema(str(tickets_db))
+    tickets = parsed["data"]["tickets"]
+    assert tickets["columns"] == ["type", "units", "price"]
+    assert tickets["types"] == ["TEXT", "INTEGER", "REAL"]
+    assert tickets["rows"] == 4
+    assert len(tickets["sample"]) == 4
+    assert parsed["data"]['odd "name"']["rows"] == 0
+
+
+def test_schema_is_kept_when_counting_times_out(tickets_db, monkeypatch):
+    def slow_counts(conn, sql, *args, **kwargs):
+        if "UNION ALL" in sql or "COUNT(*)" in sql:
+            raise QueryTimeout("Query interrupted after 5.0 s")
+        return run_query(conn, sql, *args, **kwargs)
+    
+    monkeypatch.setattr(sqlite_reader, "run_query", slow_counts)
+    parsed = read_schema(str(tickets_db))
+    assert parsed["data"]["tickets"]["columns"] == ["type", "units", "price"]
+    assert parsed["data"]["tickets"]["rows"] is None
+    assert len(parsed["data"]["tickets"]["sample"]) == 4
+    assert "row counts" in parsed["partial"]
+
+
+def test_queries_are_read_only_capped_and_time_bounded(tickets_db):
+    result = run_query(str(tickets_db), "SELECT type FROM tickets", max_rows=2)
+    assert len(result["rows"]) == 2 and result["truncated"]
+    
+    for sql in ("DELETE FROM tickets", "ATTACH DATABASE ':memory:' AS other", "PRAGMA writable_schema = 1"):
+        with pytest.raises(sqlite3.DatabaseError):
+            run_query(str(tickets_db), sql)
+    assert run_query(str(tickets_db), "SELECT COUNT(*) FROM tickets")["rows"] == [(4,)]
+    
+    runaway = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+    with pytest.raises(QueryTimeout):
+        run_query(str(tickets_db), runaway, timeout=0.2)
+
+
+def test_ticket_sales_question(tickets_db):
+    question = ('There is a tickets table in a SQLite database. What is the total sales of all the items in the '
+                '"Gold" ticket type? Write SQL to calculate it.')
+    with SpillDirectory() as spill_dir:
+        info = FileProcessor().extract_file_info(SimpleUploadedFile("tickets.db", tickets_db.read_bytes()), spill_dir=spill_dir)
+        answer = get_solver_registry().solve(question, info)
+        assert answer == (
+            'SELECT SUM("units" * "price") AS total_sales FROM "tickets" WHERE LOWER(TRIM("type")) = \'gold\';'
+        )
+        assert run_query(info["path"], answer)["rows"] == [(28.5,)]
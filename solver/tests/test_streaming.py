@@ -0,0 +1,109 @@
+"""
+Offline tests for the streaming answer mode.
+"""
+
+import json
+import os
+import sqlite3
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from solver.services import request_handler
+from solver.services.answer_cache import llm_answer_cache
+from solver.services.request_handler import RequestHandler
+from solver.services.streaming import StreamingAnswerCleaner, format_sse
+
+
+def clean_in_chunks(text, size):
+    cleaner = StreamingAnswerCleaner()
+    pieces = [cleaner.feed(text[i:i + size]) for i in range(0, len(text), size)]
+    return "".join(pieces) + cleaner.finish()
+
+
+class FakeStreamResponse:
+    status_code = 200
+
+    def __init__(self, deltas):
+        self.lines = [
+            "data: " + json.dumps({"choices": [{"delta": {"content": d}}]}) for d in deltas
+        ] + ["data: [DONE]"]
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_cleaner_matches_batch_cleanup():
+    handler = RequestHandler()
+    samples = [
+        "```python\nprint(1)\nx = `y`\n```",
+        "The answer is `42` and nothing else",
+        "  plain text answer  ",
+    ]
+    for text in samples:
+        expected = handler._ensure_string_answer(text)
+        for size in (1, 3, 7, len(text)):
+            assert clean_in_chunks(text, size) == expected
+
+
+def test_cleaner_never_emits_closing_fence():
+    cleaner = StreamingAnswerCleaner()
+    emitted = [cleaner.feed(d) for d in ["```\n", "line one\n", "``", "`"]]
+    emitted.append(cleaner.finish())
+    assert "`" not in "".join(emitted)
+    assert "".join(emitted) == "line one"
+
+
+def test_stream_aiproxy_yields_deltas_and_caches(monkeypatch):
+    llm_answer_cache.clear()
+    calls = []
+
+    def fake_post(url, headers=None, json=None, stream=False, timeout=None):
+        calls.append(json)
+        return FakeStreamResponse(["```\n", "hello ", "world", "\n```"])
+
+    monkeypatch.setattr(request_handler.requests, "post", fake_post)
+    handler = RequestHandler()
+    handler.aiproxy_token = "test-token"
+
+    events = list(handler.stream_aiproxy("Say hello"))
+    assert events[-1] == ("done", {"answer": "hello world"})
+    assert "".join(data["delta"] for event, data in events if event == "delta") == "hello world"
+    assert calls[0]["stream"] is True
+
+    # The assembled answer is cached for both streaming and regular calls
+    assert list(handler.stream_aiproxy("Say hello")) == [("done", {"answer": "hello world"})]
+    assert handler.query_aiproxy("Say hello") == {"answer": "hello world"}
+    assert len(calls) == 1
+
+
+def test_format_sse():
+    assert format_sse("done", {"answer": "1"}) == 'event: done\ndata: {"answer": "1"}\n\n'
+
+
+def test_streamed_answer_can_still_read_a_spilled_upload(tmp_path, no_template_match):
+    path = tmp_path / "streamed.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE streamed (answer TEXT)")
+    conn.commit()
+    conn.close()
+    seen = []
+    
+    def fake_stream(question, file_info=None, deadline=None):
+        # Like stream_aiproxy, the upload is only read once the stream is consumed
+        seen.append((os.path.exists(file_info["path"]), file_info.get("error")))
+        yield "done", {"answer": "llm"}
+    
+    handler = RequestHandler()
+    handler.stream_aiproxy = fake_stream
+    upload = SimpleUploadedFile("streamed.db", path.read_bytes())
+    assert list(handler.stream_request("What tables are there?", upload)) == [("done", {"answer": "llm"})]
+    assert seen == [(True, None)]
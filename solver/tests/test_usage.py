@@ -0,0 +1,66 @@
+"""
+Offline tests for LLM token and latency accounting.
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+
+from solver.perf.aiproxy_stub import LatencyModel, StubServer
+from solver.services import request_handler
+from solver.services.answer_cache import llm_answer_cache
+from solver.services.request_handler import RequestHandler
+from solver.services.usage import UsageAccountant, read_usage, template_hash
+
+
+def test_template_hash_ignores_student_values():
+    first = 'Send a request with email "23f1000001@ds.study.iitm.ac.in" and sum the first 12 rows'
+    second = 'Send a request with email "23f2000002@ds.study.iitm.ac.in" and sum the first 40 rows'
+    assert template_hash(first) == template_hash(second)
+    assert template_hash(first) != template_hash("What is the capital of France?")
+
+
+def test_flush_appends_groups_and_read_usage_adds_them(tmp_path):
+    path = str(tmp_path / "usage.jsonl")
+    accountant = UsageAccountant(path=path, flush_interval=3600)
+    usage = {"prompt_tokens": 100, "completion_tokens": 5}
+    accountant.record("Sum the first 12 rows", "csv", "file", 200, 0.5, usage)
+    accountant.record("Sum the first 40 rows", "csv", "file", 200, 1.5, usage)
+    assert accountant.flush() == 1
+    accountant.record("Sum the first 7 rows", "csv", "file", 500, 0.1)
+    assert accountant.flush() == 1
+    
+    groups = read_usage(path)
+    assert len(groups) == 1
+    group = next(iter(groups.values()))
+    assert group["calls"] == 3
+    assert group["errors"] == 1
+    assert group["prompt_tokens"] == 200
+    assert group["max_ms"] == 1500.0
+
+
+def test_query_records_usage_and_report(monkeypatch, tmp_path):
+    llm_answer_cache.clear()
+    path = str(tmp_path / "usage.jsonl")
+    accountant = UsageAccountant(path=path, flush_interval=3600)
+    monkeypatch.setattr(request_handler, "usage_accountant", accountant)
+    monkeypatch.setattr("solver.management.commands.llm_usage_report.usage_accountant", accountant)
+    server = StubServer(answer="4", latency=LatencyModel("fixed:0.01")).start()
+    try:
+        handler = RequestHandler()
+        handler.aiproxy_token = "test-token"
+        handler.aiproxy_url = server.url
+        assert handler.query_aiproxy("What is 2 + 2?") == {"answer": "4"}
+        stats = accountant.stats()
+        assert stats["calls"] == 1
+        assert stats["prompt_tokens"] > 0
+        assert stats["completion_tokens"] == 1
+    finally:
+        server.stop()
+    
+    out = StringIO()
+    call_command("llm_usage_report", path=path, stdout=out)
+    report = out.getvalue()
+    assert "1 LLM calls" in report
+    assert "what is <num> + <num>?" in report
+    assert "saved if answered locally" in report
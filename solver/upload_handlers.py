@@ -0,0 +1,28 @@
+import hashlib
+
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Computes the SHA-256 of each uploaded file while it streams in.
+    
+    Chunks are passed on unchanged to the next handler, which stores the
+    file as usual. Digests are collected in request.upload_digests, keyed by
+    field name in upload order, so the response cache can be checked without
+    reading the files again.
+    """
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._sha256 = hashlib.sha256()
+    
+    def receive_data_chunk(self, raw_data, start):
+        self._sha256.update(raw_data)
+        return raw_data
+    
+    def file_complete(self, file_size):
+        if not hasattr(self.request, 'upload_digests'):
+            self.request.upload_digests = {}
+        self.request.upload_digests.setdefault(self.field_name, []).append(self._sha256.hexdigest())
+        # Let the next handler return the stored file
+        return None
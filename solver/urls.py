@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('api/', views.api_endpoint, name='api_endpoint'),
+    path('api/metrics/', views.metrics_endpoint, name='metrics_endpoint'),
 ]
\ No newline at end of file
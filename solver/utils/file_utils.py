@@ -1,8 +1,34 @@
 import os
-import zipfile
 
-def extract_zip(zip_path, extract_to):
-    """Extract a ZIP file to a directory"""
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(extract_to)
-    return extract_to
\ No newline at end of file
+# File type for each supported extension
+FILE_TYPES = {
+    '.zip': 'zip',
+    '.gz': 'gzip',
+    '.csv': 'csv',
+    '.json': 'json',
+    '.jsonl': 'ndjson',
+    '.ndjson': 'ndjson',
+    '.parquet': 'parquet',
+    '.xlsx': 'excel',
+    '.xlsm': 'excel',
+    '.xls': 'excel',
+    '.txt': 'text',
+    '.log': 'text',
+    '.html': 'html',
+    '.htm': 'html',
+    '.pdf': 'pdf',
+    '.png': 'image',
+    '.jpg': 'image',
+    '.jpeg': 'image',
+    '.webp': 'image',
+    '.md': 'markdown',
+    '.markdown': 'markdown',
+    '.db': 'sqlite',
+    '.sqlite': 'sqlite',
+    '.sqlite3': 'sqlite',
+}
+
+
+def detect_type(name):
+    """File type for a file name, from its extension ('unknown' if unsupported)."""
+    return FILE_TYPES.get(os.path.splitext(name)[1], 'unknown')
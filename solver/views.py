@@ -1,7 +1,13 @@
-from django.http import JsonResponse
+import json
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
 from rest_framework.decorators import api_view, parser_classes
 from rest_framework.parsers import MultiPartParser
-from .services.request_handler import RequestHandler
+from .services.request_handler import RequestHandler, get_pipeline_stats
+from .services.deadline import Deadline
+from .services.metrics import pipeline_metrics
+from .services.response_cache import make_response_key, response_cache
+from .services.streaming import format_sse
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,23 +17,117 @@ logger = logging.getLogger(__name__)
 def api_endpoint(request):
     """
     Main API endpoint to handle assignment questions.
+    
+    Several "file" parts can be sent with one question; they are extracted
+    concurrently and answered together.
+    
+    Set the "stream" form field to "sse" (or send "Accept: text/event-stream")
+    to receive LLM answers as Server-Sent Events, or to "chunked" to receive
+    them as newline-delimited JSON.
     """
+    # Start the clock before parsing the upload so the budget covers the whole request
+    deadline = Deadline(settings.REQUEST_DEADLINE, llm_reserve=settings.REQUEST_DEADLINE_LLM_RESERVE)
     try:
         question = request.POST.get('question')
-        file = request.FILES.get('file')
+        # Clients may repeat "file" or use "files" for the extra parts
+        files = request.FILES.getlist('file') + request.FILES.getlist('files')
+        file = files if len(files) > 1 else (files[0] if files else None)
         
         if not question:
             return JsonResponse({"error": "No question provided"}, status=400)
         
         logger.info(f"Received question: {question}")
-        if file:
-            logger.info(f"Received file: {file.name}, size: {file.size} bytes")
+        for upload in files:
+            logger.info(f"Received file: {upload.name}, size: {upload.size} bytes")
+        
+        # Identical question and files: answer before anything is written to disk
+        digests = getattr(request, 'upload_digests', {})
+        cache_key = make_response_key(question, files, digests.get('file', []) + digests.get('files', []))
+        cached = response_cache.get(cache_key)
+        stream_mode = _get_stream_mode(request)
+        if cached is not None:
+            pipeline_metrics.increment("response_cache.hits")
+            if stream_mode:
+                return _streaming_response(iter([("done", cached)]), stream_mode)
+            return JsonResponse(cached)
+        pipeline_metrics.increment("response_cache.misses")
         
         handler = RequestHandler()
-        result = handler.process_request(question, file)
+        
+        if stream_mode:
+            events = _cache_final_answer(handler.stream_request(question, file, deadline), cache_key, handler)
+            return _streaming_response(events, stream_mode)
+        
+        result = handler.process_request(question, file, deadline)
+        _cache_response(cache_key, result, handler)
         
         return JsonResponse(result)
     
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}")
-        return JsonResponse({"error": f"An error occurred: {str(e)}"}, status=500)
\ No newline at end of file
+        return JsonResponse({"error": f"An error occurred: {str(e)}"}, status=500)
+
+
+@api_view(['GET'])
+def metrics_endpoint(request):
+    """
+    Pipeline and local solver metrics for this worker process.
+    """
+    return JsonResponse(get_pipeline_stats())
+
+
+def _cache_response(cache_key, result, handler=None):
+    """
+    Cache a successful response. Errors, and answers given without all of the
+    upload because time ran out, are retried on the next request.
+    """
+    if str(result.get('answer', '')).startswith('Error'):
+        return
+    if handler is not None and handler.answered_partially():
+        pipeline_metrics.increment("response_cache.skipped_partial")
+        return
+    response_cache.set(cache_key, result)
+
+
+def _cache_final_answer(events, cache_key, handler=None):
+    """Pass stream events through, caching the final "done" response."""
+    for event, data in events:
+        if event == "done":
+            _cache_response(cache_key, data, handler)
+        yield event, data
+
+
+def _get_stream_mode(request):
+    """Return "sse", "chunked" or None depending on what the client asked for."""
+    mode = (request.POST.get('stream') or '').strip().lower()
+    if mode in ('1', 'true', 'yes', 'sse'):
+        return 'sse'
+    if mode == 'chunked':
+        return 'chunked'
+    if 'text/event-stream' in request.headers.get('Accept', ''):
+        return 'sse'
+    return None
+
+
+def _streaming_response(events, stream_mode):
+    """Wrap (event, data) pairs from RequestHandler.stream_request in a response."""
+    def body():
+        try:
+            for event, data in events:
+                if stream_mode == 'sse':
+                    yield format_sse(event, data)
+                else:
+                    yield json.dumps(data) + "\n"
+        except Exception as e:
+            logger.error(f"Error while streaming response: {str(e)}")
+            error = {"error": f"An error occurred: {str(e)}"}
+            yield format_sse("error", error) if stream_mode == 'sse' else json.dumps(error) + "\n"
+    
+    if stream_mode == 'sse':
+        response = StreamingHttpResponse(body(), content_type='text/event-stream')
+    else:
+        response = StreamingHttpResponse(body(), content_type='application/x-ndjson')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response